@@ -0,0 +1,163 @@
+"""Measures the memory used by and the time taken to parse Bfres files.
+
+    python bench.py [--label NAME] [--time | --decode] [FILE.bfres ...]
+
+Each file is parsed with tracemalloc running, and the bytes still allocated
+afterwards (without the copy of the file data kept by the ResFile) and the
+peak during parsing are reported. Without files, the size of single
+instances of the classes created most often is measured instead.
+
+With --time, the time to parse each section dictionary of the files (like
+models or skeletal_anims) is reported instead, as the best of several runs.
+With --decode, the textures of the files (which may also be .bntx files)
+are decoded, and the throughput of each in megatexels per second is
+reported, again as the best of several runs.
+
+Results are also appended to bench_output.txt under the label, so runs
+before and after a change can be compared.
+"""
+import argparse
+import gc
+import io
+import os
+import time
+import tracemalloc
+
+from bfrespy import ResFile, common, skeletal_anim
+from bfrespy.models import material, shape, skeleton, vertex_buffer_attrib
+from bfrespy.switch.bntx import BntxFile
+from bfrespy.switch.res_file_parser import ResFileParser
+
+INSTANCE_CLASSES = [
+    skeleton.Bone, shape.Mesh, shape.SubMesh, shape.BoundingNode,
+    vertex_buffer_attrib.VertexAttrib, material.ShaderParam,
+    material.RenderInfo, material.Sampler, common.UserData,
+    common.AnimCurve, skeletal_anim.BoneAnim,
+]
+
+
+def measure_file(path):
+    """Returns the retained and peak bytes of parsing the file."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    gc.collect()
+    tracemalloc.start()
+    res_file = ResFile(io.BytesIO(data))
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # The ResFile keeps its own copy of the file data.
+    retained -= len(res_file._data)
+    return retained, peak
+
+
+def time_sections(path, repeat=5):
+    """Returns the best time in seconds to parse each section dictionary of
+    the file, keyed by section name, and to parse the whole file.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    times = {}
+    # The whole file is parsed first, as this also reads the buffer info
+    # which the vertex and index buffers of the models are located by.
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ResFile(io.BytesIO(data))
+        best = min(best, time.perf_counter() - start)
+    times['file'] = best
+    res_file = ResFile(io.BytesIO(data), lazy=True)
+    new = res_file.version_major2 >= 9
+    for section, (typ, header_offs, _) in ResFileParser._SECTIONS.items():
+        best = float('inf')
+        for _ in range(repeat):
+            with res_file._open_loader() as loader:
+                loader.seek(header_offs[new], io.SEEK_SET)
+                start = time.perf_counter()
+                loader.load_dict_values(typ)
+                best = min(best, time.perf_counter() - start)
+        times[section] = best
+    return times
+
+
+def decode_textures(path, repeat=3):
+    """Returns the format and the best decoding throughput in megatexels per
+    second of the base level of each texture of the file, keyed by texture
+    name. Textures in unsupported formats are left out.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if (path.endswith('.bntx')):
+        textures = BntxFile(data).textures
+    else:
+        textures = ResFile(io.BytesIO(data)).textures
+    results = {}
+    for node in textures:
+        texture = node.value
+        best = float('inf')
+        try:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                texture.get_decoded_data()
+                best = min(best, time.perf_counter() - start)
+        except NotImplementedError:
+            continue
+        results[node.key] = (
+            f"{texture.format_type.name}_{texture.format_variant.name}",
+            texture.width * texture.height / best / 1e6)
+    return results
+
+
+def measure_instances(cls, count=10000):
+    """Returns the bytes allocated per instance of the class."""
+    gc.collect()
+    tracemalloc.start()
+    instances = [cls() for _ in range(count)]
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del instances
+    return retained / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--label', default='current')
+    parser.add_argument('--time', action='store_true',
+                        help="time the parsing of each section")
+    parser.add_argument('--decode', action='store_true',
+                        help="measure the texture decoding throughput")
+    parser.add_argument('files', nargs='*')
+    args = parser.parse_args()
+
+    lines = []
+    if (args.time):
+        for path in args.files:
+            for section, seconds in time_sections(path).items():
+                lines.append(f"{os.path.basename(path)} {section}: "
+                             f"{seconds * 1000:.2f} ms")
+    elif (args.decode):
+        for path in args.files:
+            for name, (fmt, speed) in decode_textures(path).items():
+                lines.append(f"{os.path.basename(path)} {name} ({fmt}): "
+                             f"{speed:.1f} MT/s")
+    elif (args.files):
+        for path in args.files:
+            retained, peak = measure_file(path)
+            lines.append(f"{os.path.basename(path)}: {retained} bytes "
+                         f"retained, {peak} bytes peak, "
+                         f"{os.path.getsize(path)} bytes on disk")
+    else:
+        for cls in INSTANCE_CLASSES:
+            lines.append(f"{cls.__qualname__}: "
+                         f"{measure_instances(cls):.0f} bytes per instance")
+
+    with open(os.path.join(os.path.dirname(__file__) or '.',
+                           'bench_output.txt'), 'a') as out:
+        out.write(f"[{args.label}]\n")
+        for line in lines:
+            print(line)
+            out.write(line + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+"""Blends and layers skeletal animations as batched array operations.
+
+Poses are float32 arrays of shape (..., bones, 10) in the channel layout of
+SkeletonAnim.bake() (scale XYZ, rotation XYZW, translation XYZ), with the
+bones in the order of a Skeleton and rotations stored as quaternions. Use
+to_skeleton() to bring the bake of any SkeletonAnim into this form.
+"""
+from __future__ import annotations
+import weakref
+from collections.abc import Iterable, Sequence
+import numpy
+from . import rotations
+
+from typing import TYPE_CHECKING
+if (TYPE_CHECKING):
+    from .models import Skeleton
+    from .skeletal_anim import SkeletonAnim
+
+_SCALE = slice(0, 3)
+_ROTATE = slice(3, 7)
+_TRANSLATE = slice(7, 10)
+
+
+def rest_pose(skeleton: Skeleton) -> numpy.ndarray:
+    """Returns the rest pose of the skeleton's bones as a (bones, 10)
+    array.
+    """
+    bones = list(skeleton.bones.values())
+    pose = numpy.empty((len(bones), 10), dtype=numpy.float32)
+    if (len(bones) == 0):
+        return pose
+    pose[:, _SCALE] = [bone.scale for bone in bones]
+    pose[:, _ROTATE] = skeleton.get_rotations(rotations.QUATERNION)
+    pose[:, _TRANSLATE] = [bone.position for bone in bones]
+    return pose
+
+
+class AnimBinding:
+    """Maps the BoneAnims of a SkeletonAnim onto the bones of a Skeleton,
+    which may come from another ResFile.
+
+    Use AnimBinding.get() to share bindings. It caches them per animation
+    and skeleton, and indexes the bone names of each skeleton only once.
+    """
+
+    def __init__(self, anim: SkeletonAnim, skeleton: Skeleton,
+                 lookup: dict[str, int] | None = None,
+                 rest: numpy.ndarray | None = None):
+        names = list(skeleton.bones.keys())
+        if (lookup is None):
+            lookup = {name: i for i, name in enumerate(names)}
+        self.skeleton = skeleton
+        self.rest = rest_pose(skeleton) if rest is None else rest
+        """The (bones, 10) rest pose of the skeleton."""
+        self.bone_idxs = numpy.full(len(anim.bone_anims), -1,
+                                    dtype=numpy.int32)
+        """The index of the skeleton bone each BoneAnim targets, or -1."""
+        bind_idxs = anim.bind_idxs
+        for i, bone_anim in enumerate(anim.bone_anims):
+            # Trust bind_idxs only where they point at a bone of the same
+            # name, so animations can be retargeted to other skeletons.
+            if (i < len(bind_idxs) and 0 <= bind_idxs[i] < len(names)
+                    and names[bind_idxs[i]] == bone_anim.name):
+                self.bone_idxs[i] = bind_idxs[i]
+            else:
+                self.bone_idxs[i] = lookup.get(bone_anim.name, -1)
+        self.matched = self.bone_idxs >= 0
+        """Whether each BoneAnim targets a bone of the skeleton."""
+        self.unmatched_names = [
+            bone_anim.name for bone_anim, matched
+            in zip(anim.bone_anims, self.matched) if (not matched)]
+        """The names of the BoneAnims the skeleton has no bone for."""
+        self.bound = numpy.zeros(len(names), dtype=numpy.bool_)
+        """Whether each skeleton bone is driven by the animation."""
+        self.bound[self.bone_idxs[self.matched]] = True
+
+    def __repr__(self):
+        return (f"AnimBinding[{int(self.matched.sum())} bound, "
+                f"{len(self.unmatched_names)} unmatched]")
+
+    @classmethod
+    def get(cls, anim: SkeletonAnim, skeleton: Skeleton) -> AnimBinding:
+        """Returns the cached binding of the animation to the skeleton,
+        creating it on first use. Call clear_cache() after changing the bones
+        of a skeleton or the BoneAnims of an animation.
+        """
+        cache = _binding_cache.get(skeleton)
+        if (cache is None):
+            cache = _binding_cache[skeleton] = _SkeletonBindings(skeleton)
+        binding = cache.bindings.get(anim)
+        if (binding is None):
+            binding = cache.bindings[anim] = cls(anim, skeleton, cache.lookup,
+                                                 cache.rest)
+        return binding
+
+    @staticmethod
+    def clear_cache(skeleton: Skeleton | None = None):
+        """Drops the cached bindings of the skeleton, or of all skeletons."""
+        if (skeleton is None):
+            _binding_cache.clear()
+        else:
+            _binding_cache.pop(skeleton, None)
+
+    def apply(self, baked: numpy.ndarray,
+              rest: numpy.ndarray | None = None) -> numpy.ndarray:
+        """Scatters a quaternion bake of shape (frames, bone_anims, 10) into
+        a (frames, bones, 10) pose tensor in skeleton bone order. Bones the
+        animation does not drive are held in the rest pose (the skeleton's
+        by default).
+        """
+        if (rest is None):
+            rest = self.rest
+        poses = numpy.empty((len(baked),) + rest.shape, dtype=numpy.float32)
+        poses[:] = rest
+        poses[:, self.bone_idxs[self.matched]] = baked[:, self.matched]
+        return poses
+
+
+class _SkeletonBindings:
+    def __init__(self, skeleton: Skeleton):
+        self.lookup = {name: i for i, name in enumerate(skeleton.bones.keys())}
+        self.rest = rest_pose(skeleton)
+        self.bindings: weakref.WeakKeyDictionary[SkeletonAnim,
+                                                 AnimBinding] = \
+            weakref.WeakKeyDictionary()
+
+
+_binding_cache: weakref.WeakKeyDictionary[Skeleton, _SkeletonBindings] = \
+    weakref.WeakKeyDictionary()
+
+
+def to_skeleton(anim: SkeletonAnim, skeleton: Skeleton, frames=None,
+                baked: numpy.ndarray | None = None) -> numpy.ndarray:
+    """Returns the animation as a (frames, bones, 10) pose tensor in the
+    order of the skeleton's bones, with bones the animation does not target
+    held in their rest pose. See AnimBinding.
+
+    The animation is baked at frames (its baked_frames by default) unless the
+    result of bake() with quaternion rotations is passed as baked.
+    """
+    if (baked is None):
+        baked = anim.bake(frames, rotation_mode=rotations.QUATERNION)
+    return AnimBinding.get(anim, skeleton).apply(baked)
+
+
+def bone_mask(skeleton: Skeleton, names: Iterable[str], weight=1.0,
+              descendants=True) -> numpy.ndarray:
+    """Returns a (bones,) float32 mask which is weight for the named bones
+    and, if descendants is set, all bones below them, and 0 elsewhere.
+    """
+    bones = list(skeleton.bones.values())
+    lookup = {bone.name: i for i, bone in enumerate(bones)}
+    selected = numpy.zeros(len(bones), dtype=numpy.bool_)
+    selected[[lookup[name] for name in names]] = True
+    if (descendants):
+        parents = numpy.array([bone.parent_idx for bone in bones],
+                              dtype=numpy.int64)
+        has_parent = (parents >= 0) & (parents < len(bones))
+        # Each pass extends the selection one level further down the tree.
+        for _ in range(len(bones)):
+            grown = selected.copy()
+            grown[has_parent] |= selected[parents[has_parent]]
+            if ((grown == selected).all()):
+                break
+            selected = grown
+    return numpy.where(selected, numpy.float32(weight), numpy.float32(0))
+
+
+def blend(poses: Sequence[numpy.ndarray] | numpy.ndarray, weights,
+          masks=None) -> numpy.ndarray:
+    """Blends several (frames, bones, 10) poses into one, lerping scale and
+    translation and nlerping rotations.
+
+    weights holds one weight per pose, either constant (poses,) or per frame
+    (poses, frames). masks optionally scales the weights per bone with a
+    (poses, bones) array, see bone_mask(). The weights of each bone and
+    frame are normalized to sum up to 1. Where all of them are 0, the first
+    pose is used.
+    """
+    poses = numpy.asarray(poses, dtype=numpy.float32)
+    layers, frame_cnt, bone_cnt = poses.shape[:3]
+    weights = numpy.asarray(weights, dtype=numpy.float64)
+    weights = numpy.broadcast_to(weights.reshape(layers, -1, 1),
+                                 (layers, frame_cnt, bone_cnt))
+    if (masks is not None):
+        masks = numpy.asarray(masks, dtype=numpy.float64)
+        weights = weights * masks.reshape(layers, 1, bone_cnt)
+    total = weights.sum(axis=0)
+    weights = numpy.where(total > 0, weights, numpy.arange(layers)
+                          .reshape(layers, 1, 1) == 0)
+    weights = weights / numpy.where(total > 0, total, 1)
+
+    result = numpy.empty(poses.shape[1:], dtype=numpy.float32)
+    result[..., _SCALE] = numpy.einsum(
+        'lfb,lfbc->fbc', weights, poses[..., _SCALE])
+    result[..., _TRANSLATE] = numpy.einsum(
+        'lfb,lfbc->fbc', weights, poses[..., _TRANSLATE])
+    # Flip quaternions into the hemisphere of the first pose so opposite
+    # representations of the same rotation don't cancel out.
+    quats = poses[..., _ROTATE].astype(numpy.float64)
+    dots = numpy.sum(quats * quats[:1], axis=-1)
+    weights = numpy.where(dots < 0, -weights, weights)
+    result[..., _ROTATE] = rotations.normalize_quats(
+        numpy.einsum('lfb,lfbc->fbc', weights, quats))
+    return result
+
+
+def make_additive(poses: numpy.ndarray,
+                  reference: numpy.ndarray) -> numpy.ndarray:
+    """Returns the difference of the poses to the reference pose, which is
+    either a single (bones, 10) pose like the first frame of the animation or
+    one per frame. Scales are stored as ratios, rotations as the rotation
+    from the reference, and translations as offsets.
+    """
+    poses = numpy.asarray(poses, dtype=numpy.float32)
+    reference = numpy.asarray(reference, dtype=numpy.float32)
+    additive = numpy.empty(numpy.broadcast_shapes(poses.shape,
+                                                  reference.shape),
+                           dtype=numpy.float32)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        ratio = poses[..., _SCALE] / reference[..., _SCALE]
+    additive[..., _SCALE] = numpy.where(numpy.isfinite(ratio), ratio, 1)
+    additive[..., _ROTATE] = rotations.quat_multiply(
+        rotations.quat_conjugate(rotations.normalize_quats(
+            reference[..., _ROTATE])),
+        poses[..., _ROTATE])
+    additive[..., _TRANSLATE] = (poses[..., _TRANSLATE]
+                                 - reference[..., _TRANSLATE])
+    return additive
+
+
+def apply_additive(base: numpy.ndarray, additive: numpy.ndarray, weight=1.0,
+                   mask=None) -> numpy.ndarray:
+    """Layers an additive pose from make_additive() on top of the
+    (frames, bones, 10) base poses.
+
+    weight is either constant or one value per frame, and mask optionally
+    scales it per bone with a (bones,) array.
+    """
+    base = numpy.asarray(base, dtype=numpy.float32)
+    additive = numpy.asarray(additive, dtype=numpy.float32)
+    weight = numpy.asarray(weight, dtype=numpy.float64)
+    weight = weight.reshape(weight.shape + (1,) * (2 - weight.ndim))
+    if (mask is not None):
+        weight = weight * numpy.asarray(mask, dtype=numpy.float64)
+    weight = numpy.broadcast_to(weight, base.shape[:-1])
+
+    result = numpy.empty(numpy.broadcast_shapes(base.shape, additive.shape),
+                         dtype=numpy.float32)
+    weight3 = weight[..., None]
+    result[..., _SCALE] = base[..., _SCALE] * (
+        1 + (additive[..., _SCALE] - 1) * weight3)
+    identity = numpy.zeros(additive.shape[:-1] + (4,))
+    identity[..., 3] = 1
+    result[..., _ROTATE] = rotations.normalize_quats(rotations.quat_multiply(
+        base[..., _ROTATE],
+        rotations.nlerp(identity, additive[..., _ROTATE], weight)))
+    result[..., _TRANSLATE] = (base[..., _TRANSLATE]
+                               + additive[..., _TRANSLATE] * weight3)
+    return result
@@ -0,0 +1,587 @@
+"""Decodes ASTC block compressed textures of the LDR profile as batched array
+operations.
+
+Blocks are grouped by their block mode and partition count, which fix the
+weight grid and the size of the weights, and then by their color endpoint
+modes, after which every field is at a fixed position. Each group is
+decoded at once. Like the decoders in bcn, decode_astc takes a
+(rows, columns, 16) uint8 array of blocks, and returns an
+(rows * block_height, columns * block_width, 4) uint8 RGBA image. sRGB
+textures decode to the same values as UNORM ones. Blocks which are invalid
+or use HDR endpoints decode to the error color, magenta.
+"""
+from __future__ import annotations
+import functools
+import numpy
+from .bcn import _gather
+
+_ERROR_COLOR = (255, 0, 255, 255)
+_HDR_CEMS = (2, 3, 7, 11, 14, 15)
+
+# Integer sequences encode values of a range of 2 ** bits, or 3 or 5 times
+# that, as the low bits of each value plus the trits or quints packed into
+# 8 bits per 5 values or 7 bits per 3 values. Ranges are given as
+# (levels, bits) pairs.
+_WEIGHT_RANGES = {
+    2: (1, 1), 3: (3, 0), 4: (1, 2), 5: (5, 0), 6: (3, 1), 7: (1, 3),
+    10: (5, 1), 11: (3, 2), 12: (1, 4), 13: (5, 2), 14: (3, 3), 15: (1, 5),
+}
+"""The range of the weights per weight range field of a block mode."""
+_COLOR_RANGES = (
+    (1, 8), (3, 6), (5, 5), (1, 7), (3, 5), (5, 4), (1, 6), (3, 4), (5, 3),
+    (1, 5), (3, 3), (5, 2), (1, 4), (3, 2), (5, 1), (1, 3), (3, 1),
+)
+"""The ranges of color endpoint values from the largest to the smallest,
+the largest one fitting into the bits left by a block is used.
+"""
+
+
+def _decode_trits(packed) -> tuple[int, ...]:
+    """Returns the 5 trits packed into 8 bits."""
+    if ((packed >> 2 & 7) == 7):
+        c = (packed >> 5 & 7) << 2 | packed & 3
+        t4 = t3 = 2
+    else:
+        c = packed & 0x1F
+        if ((packed >> 5 & 3) == 3):
+            t4 = 2
+            t3 = packed >> 7 & 1
+        else:
+            t4 = packed >> 7 & 1
+            t3 = packed >> 5 & 3
+    if ((c & 3) == 3):
+        t2 = 2
+        t1 = c >> 4 & 1
+        t0 = (c >> 3 & 1) << 1 | (c >> 2 & ~c >> 3 & 1)
+    elif ((c >> 2 & 3) == 3):
+        t2 = t1 = 2
+        t0 = c & 3
+    else:
+        t2 = c >> 4 & 1
+        t1 = c >> 2 & 3
+        t0 = (c >> 1 & 1) << 1 | (c & ~c >> 1 & 1)
+    return t0, t1, t2, t3, t4
+
+
+def _decode_quints(packed) -> tuple[int, ...]:
+    """Returns the 3 quints packed into 7 bits."""
+    if ((packed >> 1 & 3) == 3 and (packed >> 5 & 3) == 0):
+        low = packed & 1
+        q2 = low << 2 | (packed >> 4 & ~low & 1) << 1 | (packed >> 3 & ~low & 1)
+        q1 = q0 = 4
+    else:
+        if ((packed >> 1 & 3) == 3):
+            q2 = 4
+            c = (packed >> 3 & 3) << 3 | (~packed >> 5 & 3) << 1 | packed & 1
+        else:
+            q2 = packed >> 5 & 3
+            c = packed & 0x1F
+        if ((c & 7) == 5):
+            q1 = 4
+            q0 = c >> 3 & 3
+        else:
+            q1 = c >> 3 & 3
+            q0 = c & 7
+    return q0, q1, q2
+
+
+_TRITS = numpy.array([_decode_trits(i) for i in range(256)], dtype=numpy.int32)
+_QUINTS = numpy.array([_decode_quints(i) for i in range(128)],
+                      dtype=numpy.int32)
+
+
+def _ise_size(count, levels, bits) -> int:
+    """Returns the number of bits of an integer sequence of count values."""
+    if (levels == 3):
+        return count * bits + (count * 8 + 4) // 5
+    if (levels == 5):
+        return count * bits + (count * 7 + 2) // 3
+    return count * bits
+
+
+# Data is read in windows of 8 bytes, so blocks are padded to 24 bytes.
+_PADDED_SIZE = 24
+_BIT_REVERSE = numpy.array([int(f"{i:08b}"[::-1], 2) for i in range(256)],
+                           dtype=numpy.uint8)
+
+
+def _pad(blocks: numpy.ndarray, reverse=False) -> numpy.ndarray:
+    """Returns the blocks padded with zeros to _PADDED_SIZE bytes, with the
+    order of their bits reversed if reverse is set.
+    """
+    data = numpy.zeros((len(blocks), _PADDED_SIZE), dtype=numpy.uint8)
+    data[:, :16] = _BIT_REVERSE[blocks[:, ::-1]] if (reverse) else blocks
+    return data
+
+
+def _read_words(data: numpy.ndarray, starts) -> numpy.ndarray:
+    """Returns the (blocks, starts) 57 or more bits from each start bit of
+    the padded blocks as uint64.
+    """
+    starts = numpy.asarray(starts)
+    windows = numpy.ascontiguousarray(
+        data[:, (starts // 8)[..., None] + numpy.arange(8)])
+    return windows.view('<u8')[..., 0] >> (starts % 8).astype(numpy.uint64)
+
+
+def _read(data: numpy.ndarray, start, count) -> numpy.ndarray:
+    """Returns the field of count bits at start of each block as int64."""
+    return (_read_words(data, start) & numpy.uint64((1 << count) - 1)) \
+        .astype(numpy.int64)
+
+
+@functools.lru_cache(maxsize=None)
+def _ise_layout(count, levels, bits):
+    """Returns the number of values and bits per group of an integer
+    sequence, where a group of trits or quints holds 5 or 3 values, and the
+    shift of the low bits of each value in a group.
+    """
+    if (levels == 3):
+        offsets = (0, 2, 4, 5, 7)
+    elif (levels == 5):
+        offsets = (0, 3, 5)
+    else:
+        # Values of bits only are read in groups fitting into a word.
+        offsets = (0,) * max(1, min(count, 56 // max(bits, 1)))
+    per_group = len(offsets)
+    group_size = _ise_size(per_group, levels, bits)
+    shifts = numpy.array(offsets, dtype=numpy.uint64) \
+        + numpy.arange(per_group, dtype=numpy.uint64) * numpy.uint64(bits)
+    return per_group, group_size, shifts
+
+
+def _read_ise(data: numpy.ndarray, start, count, levels,
+              value_bits) -> numpy.ndarray:
+    """Returns the (blocks, count) values of the integer sequence at start,
+    each as its trit or quint above its low bits.
+    """
+    per_group, group_size, shifts = _ise_layout(count, levels, value_bits)
+    size = _ise_size(count, levels, value_bits)
+    group_starts = numpy.arange(0, size, group_size)
+    words = _read_words(data, start + group_starts)
+    # Bits past the end of the sequence read as zero.
+    lengths = numpy.minimum(group_size, size - group_starts)
+    words &= (numpy.uint64(1) << lengths.astype(numpy.uint64)) \
+        - numpy.uint64(1)
+    words = words[..., None]
+    values = (words >> shifts & numpy.uint64((1 << value_bits) - 1)) \
+        .astype(numpy.int32)
+    b = value_bits
+    if (levels == 3):
+        packed = (words >> b & 3 | words >> 2 * b & 0xC | words >> 3 * b & 0x10
+                  | words >> 4 * b & 0x60 | words >> 5 * b & 0x80)
+        values |= _TRITS[packed[..., 0].astype(numpy.intp)] << b
+    elif (levels == 5):
+        packed = words >> b & 7 | words >> 2 * b & 0x18 | words >> 3 * b & 0x60
+        values |= _QUINTS[packed[..., 0].astype(numpy.intp)] << b
+    return values.reshape(len(data), -1)[:, :count]
+
+
+def _replicate(value, bits, size) -> int:
+    """Scales a value of bits to size bits by repeating its bits."""
+    result = 0
+    shift = size
+    while (shift > 0):
+        shift -= bits
+        result |= value << shift if (shift >= 0) else value >> -shift
+    return result
+
+
+@functools.lru_cache(maxsize=None)
+def _color_table(levels, bits) -> numpy.ndarray:
+    """Returns the 8 bit value of each encoded color endpoint value."""
+    table = []
+    for value in range(levels << bits):
+        high, low = value >> bits, value & ((1 << bits) - 1)
+        if (levels == 1):
+            table.append(_replicate(low, bits, 8))
+            continue
+        mask = (low & 1) * 0x1FF
+        x = low >> 1
+        if (levels == 3):
+            scale = (204, 93, 44, 22, 11, 5)[bits - 1]
+            offset = (0, 0b100010110 * x, x << 7 | x << 2 | x, x << 6 | x,
+                      x << 5 | x >> 2, x << 4 | x >> 4)[bits - 1]
+        else:
+            scale = (113, 54, 26, 13, 6)[bits - 1]
+            offset = (0, 0b100001100 * x, x << 7 | x << 1 | x >> 1,
+                      x << 6 | x >> 1, x << 5 | x >> 3)[bits - 1]
+        table.append(mask & 0x80 | ((high * scale + offset) ^ mask) >> 2)
+    return numpy.array(table, dtype=numpy.int32)
+
+
+@functools.lru_cache(maxsize=None)
+def _weight_table(levels, bits) -> numpy.ndarray:
+    """Returns the weight out of 64 of each encoded weight value."""
+    table = []
+    for value in range(levels << bits):
+        high, low = value >> bits, value & ((1 << bits) - 1)
+        if (bits == 0):
+            # Trits or quints alone are spread evenly over [0, 64].
+            table.append(high * 64 // (levels - 1))
+            continue
+        if (levels == 1):
+            weight = _replicate(low, bits, 6)
+        else:
+            mask = (low & 1) * 0x7F
+            if (levels == 3):
+                scale = (50, 23, 11)[bits - 1]
+                offset = (0, (low >> 1) * 0b1000101,
+                          (low << 4 | low >> 1) & 0b1100011)[bits - 1]
+            else:
+                scale = (28, 13)[bits - 1]
+                offset = (0, (low >> 1) * 0b1000010)[bits - 1]
+            weight = mask & 0x20 | ((high * scale + offset) ^ mask) >> 2
+        table.append(weight + 1 if (weight > 32) else weight)
+    return numpy.array(table, dtype=numpy.float32)
+
+
+@functools.lru_cache(maxsize=2048)
+def _block_mode(mode):
+    """Returns the weight grid width and height, whether there are two
+    planes of weights and the weight range of a block mode, or None if it
+    is reserved.
+    """
+    if ((mode & 0xF) == 0):
+        return None
+    a = mode >> 5 & 3
+    b = mode >> 7 & 3
+    precision = mode >> 4 & 1 | (mode >> 9 & 1) << 3
+    dual_plane = bool(mode >> 10 & 1)
+    if (mode & 3):
+        precision |= (mode & 3) << 1
+        layout = mode >> 2 & 3
+        if (layout == 0):
+            width, height = b + 4, a + 2
+        elif (layout == 1):
+            width, height = b + 8, a + 2
+        elif (layout == 2):
+            width, height = a + 2, b + 8
+        elif (mode >> 8 & 1):
+            width, height = (b & 1) + 2, a + 2
+        else:
+            width, height = a + 2, (b & 1) + 6
+    else:
+        precision |= (mode >> 2 & 3) << 1
+        layout = mode >> 7 & 3
+        if (layout == 0):
+            width, height = 12, a + 2
+        elif (layout == 1):
+            width, height = a + 2, 12
+        elif (layout == 2):
+            width, height = a + 6, (mode >> 9 & 3) + 6
+            dual_plane = False
+            precision &= 7
+        elif (mode >> 6 & 1):
+            return None
+        else:
+            width, height = (10, 6) if (mode >> 5 & 1) else (6, 10)
+    weight_range = _WEIGHT_RANGES.get(precision)
+    if (weight_range is None):
+        return None
+    return width, height, dual_plane, weight_range
+
+
+@functools.lru_cache(maxsize=64)
+def _infill_matrix(block_width, block_height, grid_width,
+                   grid_height) -> numpy.ndarray:
+    """Returns the (grid_width * grid_height, texels) factors out of 16 of
+    each weight of the grid to each texel of a block, which bilinearly
+    scale the grid to the block.
+    """
+    def coords(size, grid_size):
+        scale = (1024 + size // 2) // (size - 1)
+        scaled = (scale * numpy.arange(size) * (grid_size - 1) + 32) >> 6
+        return scaled >> 4, scaled & 0xF
+
+    js, fs = coords(block_width, grid_width)
+    jt, ft = coords(block_height, grid_height)
+    js, fs = js[None, :], fs[None, :]
+    jt, ft = jt[:, None], ft[:, None]
+    w11 = (fs * ft + 8) >> 4
+    factors = (16 - fs - ft + w11, fs - w11, ft - w11, w11)
+    size = grid_width * grid_height
+    base = js + jt * grid_width
+    texels = numpy.arange(block_width * block_height).reshape(
+        block_height, block_width)
+    matrix = numpy.zeros((size, block_width * block_height),
+                         dtype=numpy.float32)
+    # Texels on the last row or column use factors of 0 past the grid.
+    for offs, factor in zip((0, 1, grid_width, grid_width + 1), factors):
+        numpy.add.at(matrix, (numpy.minimum(base + offs, size - 1), texels),
+                     numpy.broadcast_to(factor, texels.shape))
+    matrix.setflags(write=False)
+    return matrix
+
+
+def _hash52(values: numpy.ndarray) -> numpy.ndarray:
+    """Returns the 32 bit hash of the partition seeds."""
+    values = values.astype(numpy.uint32)
+    values ^= values >> 15
+    values -= values << 17
+    values += values << 7
+    values += values << 4
+    values ^= values >> 5
+    values += values << 16
+    values ^= values >> 7
+    values ^= values >> 3
+    values ^= values << 6
+    values ^= values >> 17
+    return values
+
+
+@functools.lru_cache(maxsize=32)
+def _partition_table(block_width, block_height,
+                     num_partition) -> numpy.ndarray:
+    """Returns the (1024, texels) partition of each texel of a block per
+    partition index.
+    """
+    seeds = numpy.arange(1024, dtype=numpy.uint32) \
+        + numpy.uint32((num_partition - 1) * 1024)
+    rnum = _hash52(seeds)[:, None].astype(numpy.int64)
+    coefs = (rnum >> (numpy.arange(8) * 4) & 0xF) ** 2
+    # The coefficients are shifted by two amounts, alternating in an order
+    # depending on the seed.
+    shift_a = numpy.where(seeds & 2, 4, 5)[:, None]
+    shift_b = 6 if (num_partition == 3) else 5
+    odd = (seeds & 1 == 1)[:, None]
+    coefs[:, 0::2] >>= numpy.where(odd, shift_a, shift_b)
+    coefs[:, 1::2] >>= numpy.where(odd, shift_b, shift_a)
+    y, x = numpy.divmod(numpy.arange(block_width * block_height),
+                        block_width)
+    if (block_width * block_height < 31):
+        x, y = x << 1, y << 1
+    lines = numpy.stack([
+        (coefs[:, 2 * i, None] * x + coefs[:, 2 * i + 1, None] * y
+         + (rnum >> 14 - 4 * i)) & 0x3F
+        for i in range(4)], axis=1)
+    lines[:, num_partition:] = 0
+    # The first of the largest lines selects the partition.
+    table = numpy.argmax(lines, axis=1).astype(numpy.uint8)
+    table.setflags(write=False)
+    return table
+
+
+def _bit_transfer_signed(a: numpy.ndarray, b: numpy.ndarray):
+    """Moves the top bit of a to b, and returns a as a signed 6 bit offset
+    and b as a base value.
+    """
+    b = b >> 1 | a & 0x80
+    a = (a >> 1 & 0x3F ^ 0x20) - 0x20
+    return a, b
+
+
+def _blue_contract(rgba: numpy.ndarray) -> numpy.ndarray:
+    """Moves red and green halfway towards blue."""
+    contracted = rgba.copy()
+    contracted[..., :2] = (rgba[..., :2] + rgba[..., 2:3]) >> 1
+    return contracted
+
+
+def _decode_endpoints(values: numpy.ndarray, cem) -> numpy.ndarray:
+    """Returns the (blocks, 2, 4) RGBA endpoints of the color endpoint mode
+    from its (blocks, values) 8 bit values. HDR modes decode to the error
+    color.
+    """
+    v = values
+    endpoints = numpy.full((len(v), 2, 4), 255, dtype=numpy.int32)
+    if (cem in _HDR_CEMS):
+        endpoints[...] = _ERROR_COLOR
+    elif (cem == 0 or cem == 4):
+        endpoints[..., :3] = v[:, 0:2, None]
+        if (cem == 4):
+            endpoints[..., 3] = v[:, 2:4]
+    elif (cem == 1):
+        l0 = v[:, 0] >> 2 | v[:, 1] & 0xC0
+        endpoints[:, 0, :3] = l0[:, None]
+        endpoints[:, 1, :3] = numpy.minimum(l0 + (v[:, 1] & 0x3F),
+                                            255)[:, None]
+    elif (cem == 5):
+        offsets, bases = _bit_transfer_signed(v[:, 1::2], v[:, 0::2])
+        endpoints[:, 0, :3] = bases[:, 0:1]
+        endpoints[:, 0, 3] = bases[:, 1]
+        endpoints[:, 1, :3] = (bases[:, 0] + offsets[:, 0])[:, None]
+        endpoints[:, 1, 3] = bases[:, 1] + offsets[:, 1]
+    elif (cem == 6 or cem == 10):
+        endpoints[:, 1, :3] = v[:, :3]
+        endpoints[:, 0, :3] = v[:, :3] * v[:, 3:4] >> 8
+        if (cem == 10):
+            endpoints[..., 3] = v[:, 4:6]
+    elif (cem == 8 or cem == 12):
+        endpoints[..., :3] = v[:, 0:6].reshape(-1, 3, 2).transpose(0, 2, 1)
+        if (cem == 12):
+            endpoints[..., 3] = v[:, 6:8]
+        # Endpoints in decreasing order are swapped and blue contracted.
+        swap = endpoints[:, 1, :3].sum(axis=-1) \
+            < endpoints[:, 0, :3].sum(axis=-1)
+        endpoints[swap] = _blue_contract(endpoints[swap][:, ::-1])
+    elif (cem == 9 or cem == 13):
+        channels = 4 if (cem == 13) else 3
+        offsets, bases = _bit_transfer_signed(v[:, 1::2], v[:, 0::2])
+        endpoints[:, 0, :channels] = bases
+        endpoints[:, 1, :channels] = bases + offsets
+        # Negative offsets are swapped and blue contracted.
+        swap = offsets[:, :3].sum(axis=-1) < 0
+        endpoints[swap] = _blue_contract(endpoints[swap][:, ::-1])
+    return numpy.clip(endpoints, 0, 255, out=endpoints)
+
+
+def _decode_group(data: numpy.ndarray, reversed_data: numpy.ndarray,
+                  block_width, block_height, block_mode, num_partition, cems,
+                  extra_cem_bits) -> numpy.ndarray | None:
+    """Returns the (blocks, texels, 4) uint8 texels of the padded blocks
+    sharing a block mode, partition count and color endpoint modes, or None
+    if they are invalid. extra_cem_bits is the number of bits of the
+    endpoint modes stored below the weights.
+    """
+    grid_width, grid_height, dual_plane, (levels, value_bits) = block_mode
+    num_plane = 2 if (dual_plane) else 1
+    num_weight = grid_width * grid_height * num_plane
+    weight_size = _ise_size(num_weight, levels, value_bits)
+    below_weights = 128 - weight_size - extra_cem_bits
+    color_start = 17 if (num_partition == 1) else 29
+    color_size = below_weights - color_start - (2 if (dual_plane) else 0)
+    num_value = sum(cem // 4 * 2 + 2 for cem in cems)
+    color_range = next((color_range for color_range in _COLOR_RANGES
+                        if (_ise_size(num_value, *color_range)
+                            <= color_size)), None)
+    if (color_range is None or num_value > 18):
+        return None
+
+    # Decode the color endpoints of each partition.
+    values = _color_table(*color_range)[
+        _read_ise(data, color_start, num_value, *color_range)]
+    endpoints = numpy.empty((len(data), num_partition, 2, 4),
+                            dtype=numpy.uint8)
+    pos = 0
+    for i, cem in enumerate(cems):
+        count = cem // 4 * 2 + 2
+        endpoints[:, i] = _decode_endpoints(values[:, pos:pos + count], cem)
+        pos += count
+
+    # Weights are stored from the end of the block with their bits
+    # reversed, and are scaled from the grid to the block.
+    weights = _weight_table(levels, value_bits)[
+        _read_ise(reversed_data, 0, num_weight, levels, value_bits)]
+    weights = weights.reshape(len(data), -1, num_plane).transpose(0, 2, 1) \
+        @ _infill_matrix(block_width, block_height, grid_width, grid_height)
+    weights = (weights.astype(numpy.int16) + 8) >> 4
+    if (dual_plane):
+        # The second plane is used for the channel selected by the 2 bits
+        # below the weights.
+        plane = _read(data, below_weights - 2, 2)
+        second = numpy.arange(4) == plane[:, None, None]
+        weights = numpy.where(second, weights[:, 1, :, None],
+                              weights[:, 0, :, None])
+    else:
+        weights = weights[:, 0, :, None]
+
+    # Select the endpoints of the partition of each texel, both packed into
+    # a single value.
+    endpoints = endpoints.reshape(len(data), -1, 8).view(numpy.uint64)[..., 0]
+    if (num_partition > 1):
+        partitions = _partition_table(block_width, block_height,
+                                      num_partition)[_read(data, 13, 10)]
+        endpoints = _gather(endpoints, partitions)
+    endpoints = endpoints.view(numpy.uint8).reshape(
+        len(data), -1, 2, 4).astype(numpy.int16)
+    # Interpolate between the endpoints expanded to 16 bits and keep the top
+    # 8 bits of the result, which is (t * 257 + 32) >> 14 computed in 16
+    # bits.
+    texels = endpoints[:, :, 0] * (64 - weights) + endpoints[:, :, 1] * weights
+    return ((texels + ((texels + 32) >> 8)) >> 6).astype(numpy.uint8)
+
+
+def _decode_cems(data: numpy.ndarray, num_partition, weight_size):
+    """Returns the (blocks, partitions) color endpoint mode of each partition
+    of the padded blocks, and the number of bits of them stored below the
+    weights.
+    """
+    if (num_partition == 1):
+        return (_read(data, 13, 4)[:, None],
+                numpy.zeros(len(data), dtype=numpy.int64))
+    selector = _read(data, 23, 2)
+    shared = numpy.repeat(_read(data, 25, 4)[:, None], num_partition, axis=1)
+    # Otherwise, the selector is the class of the lowest mode and each
+    # partition adds a class bit and two mode bits.
+    extra_size = 3 * num_partition - 4
+    encoded = _read(data, 25, 4) | _read(
+        data, 128 - weight_size - extra_size, extra_size) << 4
+    classes = encoded[:, None] >> numpy.arange(num_partition) & 1
+    modes = encoded[:, None] >> (num_partition
+                                 + 2 * numpy.arange(num_partition)) & 3
+    separate = ((selector[:, None] - 1 + classes) << 2) | modes
+    mixed = selector != 0
+    return (numpy.where(mixed[:, None], separate, shared),
+            numpy.where(mixed, extra_size, 0))
+
+
+def _valid_void_extents(blocks: numpy.ndarray) -> numpy.ndarray:
+    """Returns whether blocks of a single color are valid LDR blocks, whose
+    color is stored as 16 bit values after the texel coordinates of the area
+    of the same color.
+    """
+    header = blocks[:, :8].copy().view('<u8')[:, 0]
+    coords = [(header >> numpy.uint64(shift) & numpy.uint64(0x1FFF))
+              .astype(numpy.int32) for shift in (12, 25, 38, 51)]
+    all_ones = numpy.logical_and.reduce([coord == 0x1FFF for coord in coords])
+    ordered = (coords[0] < coords[1]) & (coords[2] < coords[3])
+    return ((blocks[:, 1] & 0xE) == 0xC) & (ordered | all_ones)
+
+
+def _groups(keys: numpy.ndarray):
+    """Returns each unique key with the indices of the keys equal to it."""
+    order = numpy.argsort(keys, kind='stable')
+    unique_keys, starts = numpy.unique(keys[order], return_index=True)
+    return zip(unique_keys, numpy.split(order, starts[1:]))
+
+
+def decode_astc(blocks: numpy.ndarray, block_width,
+                block_height) -> numpy.ndarray:
+    """Decodes ASTC blocks of 16 bytes covering block_width by block_height
+    texels to uint8 RGBA.
+    """
+    blocks = numpy.asarray(blocks)
+    flat = blocks.reshape(-1, 16)
+    num_texel = block_width * block_height
+    texels = numpy.empty((len(flat), num_texel, 4), dtype=numpy.uint8)
+    texels[...] = _ERROR_COLOR
+    # The block mode and partition count are the low 13 bits.
+    keys = (flat[:, 0].astype(numpy.int32)
+            | flat[:, 1].astype(numpy.int32) << 8) & 0x1FFF
+    void_extent = keys & 0x1FF == 0x1FC
+    valid = void_extent & _valid_void_extents(flat)
+    texels[valid] = flat[valid, 9:16:2][:, None]
+
+    keys = numpy.where(void_extent, -1, keys)
+    for key, selected in _groups(keys):
+        block_mode = _block_mode(int(key) & 0x7FF) if (key >= 0) else None
+        if (block_mode is None):
+            continue
+        grid_width, grid_height, dual_plane, weight_range = block_mode
+        num_partition = (key >> 11) + 1
+        num_weight = grid_width * grid_height * (2 if (dual_plane) else 1)
+        weight_size = _ise_size(num_weight, *weight_range)
+        if (grid_width > block_width or grid_height > block_height
+                or num_weight > 64 or not 24 <= weight_size <= 96
+                or (dual_plane and num_partition == 4)):
+            continue
+        data = _pad(flat[selected])
+        reversed_data = _pad(flat[selected], reverse=True)
+        cems, extra_sizes = _decode_cems(data, num_partition, weight_size)
+        # Group the blocks again by their color endpoint modes.
+        cem_keys = (cems << numpy.arange(0, 4 * num_partition, 4)).sum(
+            axis=-1) | extra_sizes << 16
+        for cem_key, group in _groups(cem_keys):
+            group_cems = tuple(int(cem_key) >> 4 * i & 0xF
+                               for i in range(num_partition))
+            group_texels = _decode_group(
+                data[group], reversed_data[group], block_width, block_height,
+                block_mode, num_partition, group_cems, int(cem_key) >> 16)
+            if (group_texels is not None):
+                texels[selected[group]] = group_texels
+
+    rows, cols = blocks.shape[:2]
+    return (texels.reshape(rows, cols, block_height, block_width, 4)
+            .transpose(0, 2, 1, 3, 4)
+            .reshape(rows * block_height, cols * block_width, 4))
@@ -0,0 +1,194 @@
+"""Decodes BC1 to BC5 (DXT1 to DXT5, RGTC) block compressed textures as
+batched array operations.
+
+All decoders take a (rows, columns, bytes_per_block) uint8 array of blocks,
+like the result of SwitchTexture.get_deswizzled_data(), and return an
+(rows * 4, columns * 4, 4) RGBA image. Unsigned formats decode to uint8,
+signed ones to float32 in the range [-1, 1]. sRGB formats decode to the
+same values as their UNORM variants, the texels are just not linear.
+Channels a format does not store are 0, and alpha is opaque.
+"""
+from __future__ import annotations
+import functools
+import numpy
+from .gx2 import GX2SurfaceFormat
+
+# The four 2-bit indices stored in each byte value, lowest bits first.
+_INDICES_2BIT = (numpy.arange(256, dtype=numpy.uint8)[:, None]
+                 >> numpy.arange(0, 8, 2, dtype=numpy.uint8) & 3)
+_SHIFTS_3BIT = numpy.arange(0, 24, 3, dtype=numpy.uint32)
+
+
+def _to_image(texels: numpy.ndarray) -> numpy.ndarray:
+    """Rearranges (rows, columns, 16, channels) texels of 4x4 blocks into a
+    (rows * 4, columns * 4, channels) image.
+    """
+    rows, cols, _, channels = texels.shape
+    return (texels.reshape(rows, cols, 4, 4, channels)
+            .transpose(0, 2, 1, 3, 4)
+            .reshape(rows * 4, cols * 4, channels))
+
+
+def _gather(palette: numpy.ndarray, idxs: numpy.ndarray) -> numpy.ndarray:
+    """Returns the entries of the (..., entries) palettes selected by the
+    (..., 16) indices of each block.
+    """
+    entries = palette.shape[-1]
+    offsets = numpy.arange(0, palette.size, entries).reshape(
+        palette.shape[:-1] + (1,))
+    return palette.reshape(-1)[idxs + offsets]
+
+
+def _expand_565(colors: numpy.ndarray) -> numpy.ndarray:
+    """Expands RGB565 colors to (..., 3) int32 RGB888."""
+    r = colors >> 11 & 0x1F
+    g = colors >> 5 & 0x3F
+    b = colors & 0x1F
+    return numpy.stack((r << 3 | r >> 2, g << 2 | g >> 4, b << 3 | b >> 2),
+                       axis=-1)
+
+
+def _decode_colors(blocks: numpy.ndarray, punchthrough) -> numpy.ndarray:
+    """Returns the (rows, columns, 16, 4) uint8 texels of the 8 byte BC1
+    color blocks. Without punchthrough, the four color mode is always used,
+    like in BC2 and BC3.
+    """
+    c0 = blocks[..., 0].astype(numpy.int32) | blocks[..., 1].astype(
+        numpy.int32) << 8
+    c1 = blocks[..., 2].astype(numpy.int32) | blocks[..., 3].astype(
+        numpy.int32) << 8
+    e0 = _expand_565(c0)
+    e1 = _expand_565(c1)
+    palette = numpy.empty(blocks.shape[:-1] + (4, 4), dtype=numpy.uint8)
+    palette[..., 0, :3] = e0
+    palette[..., 1, :3] = e1
+    palette[..., 3] = 255
+    if (punchthrough):
+        four_colors = c0 > c1
+        three_colors = ~four_colors
+        palette[..., 2, :3] = numpy.where(four_colors[..., None],
+                                          (2 * e0 + e1) // 3, (e0 + e1) // 2)
+        palette[..., 3, :3] = (e0 + 2 * e1) // 3
+        palette[three_colors, 3] = 0
+    else:
+        palette[..., 2, :3] = (2 * e0 + e1) // 3
+        palette[..., 3, :3] = (e0 + 2 * e1) // 3
+
+    idxs = _INDICES_2BIT[blocks[..., 4:8]].reshape(blocks.shape[:-1] + (16,))
+    return _gather(palette.view(numpy.uint32)[..., 0], idxs) \
+        .view(numpy.uint8).reshape(blocks.shape[:-1] + (16, 4))
+
+
+@functools.lru_cache(maxsize=2)
+def _alpha_palettes(signed) -> numpy.ndarray:
+    """Returns the 8 entry palettes of all BC4 endpoint pairs, indexed by the
+    first two bytes of a block as a little endian uint16.
+    """
+    a = numpy.arange(256, dtype=numpy.int32)
+    if (signed):
+        a = numpy.maximum(a.astype(numpy.uint8).view(numpy.int8), -127)
+    a0 = numpy.tile(a, 256)[:, None]
+    a1 = numpy.repeat(a, 256)[:, None]
+    # Interpolate with rounding to nearest, away from zero.
+    steps = numpy.arange(2, 8, dtype=numpy.int32)
+    eight = a0 > a1
+    num = numpy.where(eight, a0 * (8 - steps) + a1 * (steps - 1),
+                      a0 * (6 - steps) + a1 * (steps - 1))
+    den = numpy.where(eight, 7, 5)
+    palettes = numpy.empty((65536, 8), dtype=numpy.int32)
+    palettes[:, 0:1] = a0
+    palettes[:, 1:2] = a1
+    palettes[:, 2:] = numpy.where(num < 0, -((den // 2 - num) // den),
+                                  (num + den // 2) // den)
+    six = ~eight[:, 0]
+    palettes[six, 6] = -127 if signed else 0
+    palettes[six, 7] = 127 if signed else 255
+    palettes = palettes.astype(numpy.int8 if signed else numpy.uint8)
+    palettes.setflags(write=False)
+    return palettes
+
+
+def _decode_alphas(blocks: numpy.ndarray, signed) -> numpy.ndarray:
+    """Returns the (rows, columns, 16) texels of the 8 byte BC4 blocks,
+    as uint8 or as int8 in the range [-127, 127] if signed.
+    """
+    keys = (blocks[..., 0].astype(numpy.intp)
+            | blocks[..., 1].astype(numpy.intp) << 8)
+    # Each half of the indices holds 8 indices in 3 bytes.
+    bits = blocks[..., 2:8].astype(numpy.uint32)
+    halves = numpy.stack(
+        (bits[..., 0] | bits[..., 1] << 8 | bits[..., 2] << 16,
+         bits[..., 3] | bits[..., 4] << 8 | bits[..., 5] << 16), axis=-1)
+    idxs = (halves[..., None] >> _SHIFTS_3BIT & 7).reshape(
+        blocks.shape[:-1] + (16,))
+    return _alpha_palettes(signed).reshape(-1)[keys[..., None] * 8 + idxs]
+
+
+def _channels(channels, signed) -> numpy.ndarray:
+    """Returns an RGBA image of the given channels, filling the others with
+    0 and opaque alpha.
+    """
+    shape = channels[0].shape
+    if (signed):
+        image = numpy.zeros(shape + (4,), dtype=numpy.float32)
+        image[..., 3] = 1
+        for i, channel in enumerate(channels):
+            image[..., i] = channel / numpy.float32(127)
+    else:
+        image = numpy.zeros(shape + (4,), dtype=numpy.uint8)
+        image[..., 3] = 255
+        for i, channel in enumerate(channels):
+            image[..., i] = channel
+    return image
+
+
+def decode_bc1(blocks: numpy.ndarray) -> numpy.ndarray:
+    """Decodes BC1 blocks of 8 bytes, with 1-bit alpha."""
+    return _to_image(_decode_colors(numpy.asarray(blocks), True))
+
+
+def decode_bc2(blocks: numpy.ndarray) -> numpy.ndarray:
+    """Decodes BC2 blocks of 16 bytes, with explicit 4-bit alpha."""
+    blocks = numpy.asarray(blocks)
+    texels = _decode_colors(blocks[..., 8:], False)
+    alphas = numpy.stack((blocks[..., :8] & 0xF, blocks[..., :8] >> 4),
+                         axis=-1)
+    texels[..., 3] = alphas.reshape(blocks.shape[:-1] + (16,)) * 17
+    return _to_image(texels)
+
+
+def decode_bc3(blocks: numpy.ndarray) -> numpy.ndarray:
+    """Decodes BC3 blocks of 16 bytes, with interpolated alpha."""
+    blocks = numpy.asarray(blocks)
+    texels = _decode_colors(blocks[..., 8:], False)
+    texels[..., 3] = _decode_alphas(blocks[..., :8], False)
+    return _to_image(texels)
+
+
+def decode_bc4(blocks: numpy.ndarray, signed=False) -> numpy.ndarray:
+    """Decodes BC4 blocks of 8 bytes into the red channel."""
+    red = _decode_alphas(numpy.asarray(blocks), signed)
+    return _to_image(_channels((red,), signed))
+
+
+def decode_bc5(blocks: numpy.ndarray, signed=False) -> numpy.ndarray:
+    """Decodes BC5 blocks of 16 bytes into the red and green channels."""
+    blocks = numpy.asarray(blocks)
+    red = _decode_alphas(blocks[..., :8], signed)
+    green = _decode_alphas(blocks[..., 8:], signed)
+    return _to_image(_channels((red, green), signed))
+
+
+GX2_DECODERS = {
+    GX2SurfaceFormat.T_BC1_UNORM: decode_bc1,
+    GX2SurfaceFormat.T_BC1_SRGB: decode_bc1,
+    GX2SurfaceFormat.T_BC2_UNORM: decode_bc2,
+    GX2SurfaceFormat.T_BC2_SRGB: decode_bc2,
+    GX2SurfaceFormat.T_BC3_UNORM: decode_bc3,
+    GX2SurfaceFormat.T_BC3_SRGB: decode_bc3,
+    GX2SurfaceFormat.T_BC4_UNORM: decode_bc4,
+    GX2SurfaceFormat.T_BC4_SNORM: functools.partial(decode_bc4, signed=True),
+    GX2SurfaceFormat.T_BC5_UNORM: decode_bc5,
+    GX2SurfaceFormat.T_BC5_SNORM: functools.partial(decode_bc5, signed=True),
+}
+"""The decoder of each block compressed GX2SurfaceFormat."""
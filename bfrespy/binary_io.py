@@ -141,6 +141,14 @@ class BinaryReader:
         return struct.unpack(self.endianness + str(int(count)) + 'f',
                              self.stream.read(4 * count))
 
+    def read_array(self, dtype, count) -> numpy.ndarray:
+        """Reads count values of the given NumPy dtype in the current
+        endianness into a read-only array, without unpacking them one by one.
+        """
+        dtype = numpy.dtype(dtype).newbyteorder(self.endianness)
+        return numpy.frombuffer(self.stream.read(dtype.itemsize * count),
+                                dtype=dtype, count=count)
+
     def read_raw_string(self, length, encoding=None) -> str:
         encoding = encoding if encoding is not None else 'utf-8'
         return self.stream.read(length).decode(encoding)
@@ -187,6 +195,57 @@ class BinaryReader:
         return Decimal10x5(self.read_uint16(), raw=True)
 
 
+class MemoryViewStream(io.RawIOBase):
+    """A read-only stream over a bytes-like object. Unlike io.BytesIO, it
+    never copies the underlying buffer, so it can be opened over slices of
+    large files.
+    """
+
+    def __init__(self, buffer):
+        super().__init__()
+        self._view = memoryview(buffer).cast('B').toreadonly()
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if (whence == io.SEEK_SET):
+            pos = offset
+        elif (whence == io.SEEK_CUR):
+            pos = self._pos + offset
+        elif (whence == io.SEEK_END):
+            pos = len(self._view) + offset
+        else:
+            raise ValueError(f"Invalid whence {whence}.")
+        if (pos < 0):
+            raise ValueError(f"Negative seek position {pos}.")
+        self._pos = pos
+        return pos
+
+    def tell(self):
+        return self._pos
+
+    def read(self, size=-1):
+        end = (len(self._view) if size is None or size < 0
+               else min(self._pos + size, len(self._view)))
+        data = self._view[self._pos:end].tobytes()
+        self._pos = max(self._pos, end)
+        return data
+
+    def readinto(self, buffer):
+        data = self.read(len(memoryview(buffer)))
+        memoryview(buffer).cast('B')[:len(data)] = data
+        return len(data)
+
+    def getbuffer(self) -> memoryview:
+        """Returns a read-only view of the whole buffer without copying it."""
+        return self._view
+
+
 class NewSeek:
     """Temporarily move the pointer to a different location and return it
     to the correct position when it's closed
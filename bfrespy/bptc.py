@@ -0,0 +1,443 @@
+"""Decodes BC6H and BC7 (BPTC) block compressed textures as batched array
+operations.
+
+Blocks are grouped by their mode, and each group is decoded at once, as the
+mode fixes the position of every field except the indices, whose positions
+only depend on the partition. Like the decoders in bcn, they take a
+(rows, columns, 16) uint8 array of blocks and return an
+(rows * 4, columns * 4, 4) RGBA image, as uint8 for BC7 and as float32 for
+BC6H.
+"""
+from __future__ import annotations
+import functools
+import re
+import numpy
+from .bcn import _gather, _to_image
+
+# The subset of each texel in the 64 partitions of 2 subsets, one bit each.
+_PARTITIONS2 = (
+    0xCCCC, 0x8888, 0xEEEE, 0xECC8, 0xC880, 0xFEEC, 0xFEC8, 0xEC80,
+    0xC800, 0xFFEC, 0xFE80, 0xE800, 0xFFE8, 0xFF00, 0xFFF0, 0xF000,
+    0xF710, 0x008E, 0x7100, 0x08CE, 0x008C, 0x7310, 0x3100, 0x8CCE,
+    0x088C, 0x3110, 0x6666, 0x366C, 0x17E8, 0x0FF0, 0x718E, 0x399C,
+    0xAAAA, 0xF0F0, 0x5A5A, 0x33CC, 0x3C3C, 0x55AA, 0x9696, 0xA55A,
+    0x73CE, 0x13C8, 0x324C, 0x3BDC, 0x6996, 0xC33C, 0x9966, 0x0660,
+    0x0272, 0x04E4, 0x4E40, 0x2720, 0xC936, 0x936C, 0x39C6, 0x639C,
+    0x9336, 0x9CC6, 0x817E, 0xE718, 0xCCF0, 0x0FCC, 0x7744, 0xEE22,
+)
+# The subset of each texel in the 64 partitions of 3 subsets, two bits each.
+_PARTITIONS3 = (
+    0xAA685050, 0x6A5A5040, 0x5A5A4200, 0x5450A0A8,
+    0xA5A50000, 0xA0A05050, 0x5555A0A0, 0x5A5A5050,
+    0xAA550000, 0xAA555500, 0xAAAA5500, 0x90909090,
+    0x94949494, 0xA4A4A4A4, 0xA9A59450, 0x2A0A4250,
+    0xA5945040, 0x0A425054, 0xA5A5A500, 0x55A0A0A0,
+    0xA8A85454, 0x6A6A4040, 0xA4A45000, 0x1A1A0500,
+    0x0050A4A4, 0xAAA59090, 0x14696914, 0x69691400,
+    0xA08585A0, 0xAA821414, 0x50A4A450, 0x6A5A0200,
+    0xA9A58000, 0x5090A0A8, 0xA8A09050, 0x24242424,
+    0x00AA5500, 0x24924924, 0x24499224, 0x50A50A50,
+    0x500AA550, 0xAAAA4444, 0x66660000, 0xA5A0A5A0,
+    0x50A050A0, 0x69286928, 0x44AAAA44, 0x66666600,
+    0xAA444444, 0x54A854A8, 0x95809580, 0x96969600,
+    0xA85454A8, 0x80959580, 0xAA141414, 0x96960000,
+    0xAAAA1414, 0xA05050A0, 0xA0A5A5A0, 0x96000000,
+    0x40804080, 0xA9A8A9A8, 0xAAAAAA44, 0x2A4A5254,
+)
+# The texel of the second subset whose index has one bit less, per
+# partition of 2 subsets.
+_ANCHORS2 = (
+    15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15,
+    15, 2, 8, 2, 2, 8, 8, 15, 2, 8, 2, 2, 8, 8, 2, 2,
+    15, 15, 6, 8, 2, 8, 15, 15, 2, 8, 2, 2, 2, 15, 15, 6,
+    6, 2, 6, 8, 15, 15, 2, 2, 15, 15, 15, 15, 15, 2, 2, 15,
+)
+# The anchor texels of the second and third subset per partition of 3
+# subsets.
+_ANCHORS3 = (
+    (3, 3, 15, 15, 8, 3, 15, 15, 8, 8, 6, 6, 6, 5, 3, 3,
+     3, 3, 8, 15, 3, 3, 6, 10, 5, 8, 8, 6, 8, 5, 15, 15,
+     8, 15, 3, 5, 6, 10, 8, 15, 15, 3, 15, 5, 15, 15, 15, 15,
+     3, 15, 5, 5, 5, 8, 5, 10, 5, 10, 8, 13, 15, 12, 3, 3),
+    (15, 8, 8, 3, 15, 15, 3, 8, 15, 15, 15, 15, 15, 15, 15, 8,
+     15, 8, 15, 3, 15, 8, 15, 8, 3, 15, 6, 10, 15, 15, 10, 8,
+     15, 3, 15, 10, 10, 8, 9, 10, 6, 15, 8, 15, 3, 6, 6, 8,
+     15, 3, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 3, 15, 15, 8),
+)
+
+
+def _build_partitions():
+    """Returns the (subsets, 64, 16) subset of each texel and whether it is
+    an anchor, indexed by the number of subsets minus one.
+    """
+    texels = numpy.arange(16)
+    subsets = numpy.zeros((3, 64, 16), dtype=numpy.intp)
+    subsets[1] = numpy.array(_PARTITIONS2)[:, None] >> texels & 1
+    subsets[2] = numpy.array(_PARTITIONS3)[:, None] >> (texels * 2) & 3
+    anchors = numpy.zeros((3, 64, 16), dtype=numpy.bool_)
+    anchors[:, :, 0] = True
+    anchors[1, numpy.arange(64), _ANCHORS2] = True
+    anchors[2, numpy.arange(64), _ANCHORS3[0]] = True
+    anchors[2, numpy.arange(64), _ANCHORS3[1]] = True
+    return subsets, anchors
+
+
+_SUBSETS, _ANCHORS = _build_partitions()
+_WEIGHTS = {
+    2: numpy.array([0, 21, 43, 64], dtype=numpy.int32),
+    3: numpy.array([0, 9, 18, 27, 37, 46, 55, 64], dtype=numpy.int32),
+    4: numpy.array([0, 4, 9, 13, 17, 21, 26, 30, 34, 38, 43, 47, 51, 55,
+                    60, 64], dtype=numpy.int32),
+}
+"""The interpolation weights out of 64 per index size in bits."""
+
+
+def _unpack_bits(blocks: numpy.ndarray) -> numpy.ndarray:
+    """Returns the 128 bits of each block as a (blocks, 128) uint8 array,
+    least significant bit first.
+    """
+    return numpy.unpackbits(blocks, axis=-1, bitorder='little')
+
+
+def _read(bits: numpy.ndarray, start, count) -> numpy.ndarray:
+    """Returns the field of count bits at start of each block as int32."""
+    if (count == 0):
+        return numpy.zeros(len(bits), dtype=numpy.int32)
+    return bits[:, start:start + count].astype(numpy.int32) \
+        @ (1 << numpy.arange(count, dtype=numpy.int32))
+
+
+@functools.lru_cache(maxsize=None)
+def _index_positions(num_subset, count) -> numpy.ndarray:
+    """Returns the (64, 16 * count) position of each index bit relative to
+    the first one per partition, as the indices of anchor texels have one
+    bit less. The missing bits point to position -1.
+    """
+    anchors = _ANCHORS[num_subset - 1]
+    counts = count - anchors.astype(numpy.intp)
+    starts = numpy.cumsum(counts, axis=-1) - counts
+    shifts = numpy.arange(count)
+    # The most significant bit is the one anchors leave out.
+    positions = numpy.where(shifts < counts[..., None],
+                            starts[..., None] + shifts, -1)
+    return positions.reshape(64, 16 * count)
+
+
+def _read_indices(bits: numpy.ndarray, start, count, num_subset,
+                  partition: numpy.ndarray) -> numpy.ndarray:
+    """Returns the (blocks, 16) indices of count bits stored from start,
+    where the indices of the anchor texels of the partition have one bit
+    less.
+    """
+    size = 16 * count - num_subset
+    # Append a zero bit for the missing bits of the anchors to read.
+    region = numpy.zeros((len(bits), size + 1), dtype=numpy.uint8)
+    region[:, :size] = bits[:, start:start + size]
+    positions = _index_positions(num_subset, count)[partition]
+    index_bits = numpy.take_along_axis(region, positions, axis=-1)
+    return numpy.packbits(index_bits.reshape(len(bits), 16, count), axis=-1,
+                          bitorder='little')[..., 0].astype(numpy.intp)
+
+
+def _interpolate(e0: numpy.ndarray, e1: numpy.ndarray,
+                 weights: numpy.ndarray) -> numpy.ndarray:
+    return (e0 * (64 - weights) + e1 * weights + 32) >> 6
+
+
+def _select_endpoints(endpoints: numpy.ndarray, subsets: numpy.ndarray):
+    """Returns the first and second (blocks, 16, channels) endpoints of the
+    subset of each texel from the (blocks, subsets * 2, channels) endpoints.
+    """
+    blocks = numpy.arange(len(endpoints))[:, None]
+    return endpoints[blocks, subsets * 2], endpoints[blocks, subsets * 2 + 1]
+
+
+def _lookup_palettes(endpoints: numpy.ndarray, index_bits, subsets,
+                     idxs: numpy.ndarray) -> numpy.ndarray:
+    """Returns the (blocks, 16, 4) uint8 texels selected by the indices from
+    the palettes interpolated between the 8 bit endpoints of each subset.
+    """
+    # The products fit into 16 bits, which halves the memory traffic.
+    endpoints = endpoints.astype(numpy.int16)
+    weights = _WEIGHTS[index_bits][:, None].astype(numpy.int16)
+    palettes = _interpolate(endpoints[:, 0::2, None], endpoints[:, 1::2, None],
+                            weights).astype(numpy.uint8)
+    keys = subsets * len(weights) + idxs
+    return _gather(palettes.view(numpy.uint32).reshape(len(idxs), -1), keys) \
+        .view(numpy.uint8).reshape(idxs.shape + (4,))
+
+
+# Mode: subsets, partition bits, rotation bits, index selection bits, color
+# bits, alpha bits, endpoint p-bits, shared p-bits, index bits, secondary
+# index bits.
+_BC7_MODES = (
+    (3, 4, 0, 0, 4, 0, 1, 0, 3, 0),
+    (2, 6, 0, 0, 6, 0, 0, 1, 3, 0),
+    (3, 6, 0, 0, 5, 0, 0, 0, 2, 0),
+    (2, 6, 0, 0, 7, 0, 1, 0, 2, 0),
+    (1, 0, 2, 1, 5, 6, 0, 0, 2, 3),
+    (1, 0, 2, 0, 7, 8, 0, 0, 2, 2),
+    (1, 0, 0, 0, 7, 7, 1, 0, 4, 0),
+    (2, 6, 0, 0, 5, 5, 1, 0, 2, 0),
+)
+# The channel order of each rotation, which swaps alpha with red, green or
+# blue.
+_BC7_ROTATIONS = numpy.array(
+    [[0, 1, 2, 3], [3, 1, 2, 0], [0, 3, 2, 1], [0, 1, 3, 2]])
+# The mode of a BC7 block is the number of trailing zeros of its first byte,
+# and 8 (reserved) if it is 0.
+_BC7_MODE_OF_BYTE = numpy.array(
+    [8] + [(i & -i).bit_length() - 1 for i in range(1, 256)],
+    dtype=numpy.uint8)
+
+
+def _decode_bc7_mode(bits: numpy.ndarray, mode) -> numpy.ndarray:
+    """Returns the (blocks, 16, 4) texels of the BC7 blocks of the mode."""
+    (num_subset, partition_bits, rotation_bits, selection_bits, color_bits,
+     alpha_bits, endpoint_pbits, shared_pbits, index_bits,
+     index_bits2) = _BC7_MODES[mode]
+    pos = mode + 1
+    partition = _read(bits, pos, partition_bits)
+    pos += partition_bits
+    rotation = _read(bits, pos, rotation_bits)
+    pos += rotation_bits
+    selection = _read(bits, pos, selection_bits)
+    pos += selection_bits
+
+    num_endpoint = num_subset * 2
+    endpoints = numpy.full((len(bits), num_endpoint, 4), 255,
+                           dtype=numpy.int32)
+    channels = 4 if alpha_bits else 3
+    precisions = [color_bits] * 3 + [alpha_bits]
+    for channel in range(channels):
+        for i in range(num_endpoint):
+            endpoints[:, i, channel] = _read(bits, pos, precisions[channel])
+            pos += precisions[channel]
+    if (endpoint_pbits or shared_pbits):
+        if (endpoint_pbits):
+            pbits = bits[:, pos:pos + num_endpoint]
+            pos += num_endpoint
+        else:
+            pbits = numpy.repeat(bits[:, pos:pos + num_subset], 2, axis=-1)
+            pos += num_subset
+        endpoints[..., :channels] = (endpoints[..., :channels] << 1
+                                     | pbits[..., None])
+        precisions = [precision + 1 for precision in precisions]
+    for channel in range(channels):
+        precision = precisions[channel]
+        values = endpoints[..., channel] << (8 - precision)
+        endpoints[..., channel] = values | values >> precision
+
+    # Interpolate the palette of each subset and look the texels up in it.
+    subsets = _SUBSETS[num_subset - 1][partition]
+    idxs = _read_indices(bits, pos, index_bits, num_subset, partition)
+    texels = _lookup_palettes(endpoints, index_bits, subsets, idxs)
+    if (index_bits2):
+        pos += 16 * index_bits - num_subset
+        idxs2 = _read_indices(bits, pos, index_bits2, 1, partition)
+        texels2 = _lookup_palettes(endpoints, index_bits2, subsets, idxs2)
+        # The secondary indices are used for alpha, unless the index
+        # selection bit swaps them with the color indices.
+        swap = (selection == 1)[:, None]
+        alphas = numpy.where(swap, texels[..., 3], texels2[..., 3])
+        texels[..., :3] = numpy.where(swap[..., None], texels2[..., :3],
+                                      texels[..., :3])
+        texels[..., 3] = alphas
+    if (rotation_bits):
+        texels = numpy.take_along_axis(
+            texels, _BC7_ROTATIONS[rotation][:, None], axis=-1)
+    return texels
+
+
+def decode_bc7(blocks: numpy.ndarray) -> numpy.ndarray:
+    """Decodes BC7 blocks of 16 bytes to uint8 RGBA. Blocks of the reserved
+    mode decode to transparent black.
+    """
+    blocks = numpy.asarray(blocks)
+    flat = blocks.reshape(-1, 16)
+    texels = numpy.zeros((len(flat), 16, 4), dtype=numpy.uint8)
+    modes = _BC7_MODE_OF_BYTE[flat[:, 0]]
+    for mode in range(len(_BC7_MODES)):
+        selected = numpy.flatnonzero(modes == mode)
+        if (len(selected)):
+            texels[selected] = _decode_bc7_mode(
+                _unpack_bits(flat[selected]), mode)
+    return _to_image(texels.reshape(blocks.shape[:-1] + (16, 4)))
+
+
+def _parse_layout(layout: str) -> dict[tuple[int, int], tuple]:
+    """Returns the bit positions and shifts of each (endpoint, channel) in a
+    BC6H field layout. The fields are given in the notation of the
+    specification, where rw[9:0] are 10 bits of the first red endpoint and
+    [a:b] reads bits from b to a.
+    """
+    fields = {}
+    pos = 0
+    for channel, endpoint, end, start in re.findall(
+            r'([rgb])([wxyz])\[(\d+)(?::(\d+))?\]', layout):
+        end = int(end)
+        start = end if (start == '') else int(start)
+        step = 1 if (end >= start) else -1
+        key = ('wxyz'.index(endpoint), 'rgb'.index(channel))
+        positions, shifts = fields.setdefault(key, ([], []))
+        for shift in range(start, end + step, step):
+            positions.append(pos)
+            shifts.append(shift)
+            pos += 1
+    return {key: (numpy.array(positions), numpy.array(shifts))
+            for key, (positions, shifts) in fields.items()}
+
+
+# Mode: transformed, subsets, endpoint bits, delta bits of red, green and
+# blue, and the layout of the endpoint fields after the mode bits. Modes are
+# numbered by their 2 or 5 mode bits.
+_BC6H_MODES = {
+    0: (True, 2, 10, (5, 5, 5),
+        "gy[4], by[4], bz[4], rw[9:0], gw[9:0], bw[9:0], rx[4:0], gz[4], "
+        "gy[3:0], gx[4:0], bz[0], gz[3:0], bx[4:0], bz[1], by[3:0], "
+        "ry[4:0], bz[2], rz[4:0], bz[3]"),
+    1: (True, 2, 7, (6, 6, 6),
+        "gy[5], gz[4], gz[5], rw[6:0], bz[0], bz[1], by[4], gw[6:0], "
+        "by[5], bz[2], gy[4], bw[6:0], bz[3], bz[4:5], rx[5:0], gy[3:0], "
+        "gx[5:0], gz[3:0], bx[5:0], by[3:0], ry[5:0], rz[5:0]"),
+    2: (True, 2, 11, (5, 4, 4),
+        "rw[9:0], gw[9:0], bw[9:0], rx[4:0], rw[10], gy[3:0], gx[3:0], "
+        "gw[10], bz[0], gz[3:0], bx[3:0], bw[10], bz[1], by[3:0], ry[4:0], "
+        "bz[2], rz[4:0], bz[3]"),
+    6: (True, 2, 11, (4, 5, 4),
+        "rw[9:0], gw[9:0], bw[9:0], rx[3:0], rw[10], gz[4], gy[3:0], "
+        "gx[4:0], gw[10], gz[3:0], bx[3:0], bw[10], bz[1], by[3:0], "
+        "ry[3:0], bz[0], bz[2], rz[3:0], gy[4], bz[3]"),
+    10: (True, 2, 11, (4, 4, 5),
+         "rw[9:0], gw[9:0], bw[9:0], rx[3:0], rw[10], by[4], gy[3:0], "
+         "gx[3:0], gw[10], bz[0], gz[3:0], bx[4:0], bw[10], by[3:0], "
+         "ry[3:0], bz[1], bz[2], rz[3:0], bz[4], bz[3]"),
+    14: (True, 2, 9, (5, 5, 5),
+         "rw[8:0], by[4], gw[8:0], gy[4], bw[8:0], bz[4], rx[4:0], gz[4], "
+         "gy[3:0], gx[4:0], bz[0], gz[3:0], bx[4:0], bz[1], by[3:0], "
+         "ry[4:0], bz[2], rz[4:0], bz[3]"),
+    18: (True, 2, 8, (6, 5, 5),
+         "rw[7:0], gz[4], by[4], gw[7:0], bz[2], gy[4], bw[7:0], bz[3], "
+         "bz[4], rx[5:0], gy[3:0], gx[4:0], bz[0], gz[3:0], bx[4:0], bz[1], "
+         "by[3:0], ry[5:0], rz[5:0]"),
+    22: (True, 2, 8, (5, 6, 5),
+         "rw[7:0], bz[0], by[4], gw[7:0], gy[5], gy[4], bw[7:0], gz[5], "
+         "bz[4], rx[4:0], gz[4], gy[3:0], gx[5:0], gz[3:0], bx[4:0], bz[1], "
+         "by[3:0], ry[4:0], bz[2], rz[4:0], bz[3]"),
+    26: (True, 2, 8, (5, 5, 6),
+         "rw[7:0], bz[1], by[4], gw[7:0], by[5], gy[4], bw[7:0], bz[5], "
+         "bz[4], rx[4:0], gz[4], gy[3:0], gx[4:0], bz[0], gz[3:0], bx[5:0], "
+         "by[3:0], ry[4:0], bz[2], rz[4:0], bz[3]"),
+    30: (False, 2, 6, (6, 6, 6),
+         "rw[5:0], gz[4], bz[0], bz[1], by[4], gw[5:0], gy[5], by[5], "
+         "bz[2], gy[4], bw[5:0], gz[5], bz[3], bz[5], bz[4], rx[5:0], "
+         "gy[3:0], gx[5:0], gz[3:0], bx[5:0], by[3:0], ry[5:0], rz[5:0]"),
+    3: (False, 1, 10, (10, 10, 10),
+        "rw[9:0], gw[9:0], bw[9:0], rx[9:0], gx[9:0], bx[9:0]"),
+    7: (True, 1, 11, (9, 9, 9),
+        "rw[9:0], gw[9:0], bw[9:0], rx[8:0], rw[10], gx[8:0], gw[10], "
+        "bx[8:0], bw[10]"),
+    11: (True, 1, 12, (8, 8, 8),
+         "rw[9:0], gw[9:0], bw[9:0], rx[7:0], rw[10:11], gx[7:0], "
+         "gw[10:11], bx[7:0], bw[10:11]"),
+    15: (True, 1, 16, (4, 4, 4),
+         "rw[9:0], gw[9:0], bw[9:0], rx[3:0], rw[10:15], gx[3:0], "
+         "gw[10:15], bx[3:0], bw[10:15]"),
+}
+_BC6H_LAYOUTS = {mode: _parse_layout(info[4])
+                 for mode, info in _BC6H_MODES.items()}
+
+
+def _sign_extend(values: numpy.ndarray, bits) -> numpy.ndarray:
+    bits = numpy.asarray(bits)
+    sign = 1 << (bits - 1)
+    return ((values & ((1 << bits) - 1)) ^ sign) - sign
+
+
+def _unquantize(values: numpy.ndarray, bits, signed) -> numpy.ndarray:
+    """Scales endpoints of the given precision to 16 bits."""
+    if (signed):
+        if (bits >= 16):
+            return values
+        magnitudes = numpy.abs(values)
+        scaled = numpy.where(
+            magnitudes >= (1 << bits - 1) - 1, 0x7FFF,
+            ((magnitudes << 15) + 0x4000) >> (bits - 1))
+        scaled = numpy.where(magnitudes == 0, 0, scaled)
+        return numpy.where(values < 0, -scaled, scaled)
+    if (bits >= 15):
+        return values
+    scaled = numpy.where(values == (1 << bits) - 1, 0xFFFF,
+                         ((values << 15) + 0x4000) >> (bits - 1))
+    return numpy.where(values == 0, 0, scaled)
+
+
+def _to_half(values: numpy.ndarray, signed) -> numpy.ndarray:
+    """Scales interpolated 16 bit values to the bits of half floats and
+    returns them as float32.
+    """
+    if (signed):
+        magnitudes = numpy.abs(values) * 31 >> 5
+        halves = numpy.where(values < 0, magnitudes | 0x8000, magnitudes)
+    else:
+        halves = values * 31 >> 6
+    return halves.astype(numpy.uint16).view(numpy.float16) \
+        .astype(numpy.float32)
+
+
+def _decode_bc6h_mode(bits: numpy.ndarray, mode, signed) -> numpy.ndarray:
+    """Returns the (blocks, 16, 3) float32 texels of the BC6H blocks of the
+    mode.
+    """
+    transformed, num_subset, endpoint_bits, delta_bits, _ = _BC6H_MODES[mode]
+    mode_bits = 2 if (mode < 2) else 5
+    endpoints = numpy.zeros((len(bits), num_subset * 2, 3),
+                            dtype=numpy.int32)
+    for (endpoint, channel), (positions, shifts) in \
+            _BC6H_LAYOUTS[mode].items():
+        endpoints[:, endpoint, channel] = (
+            bits[:, mode_bits + positions].astype(numpy.int32)
+            << shifts).sum(axis=-1)
+    pos = mode_bits + sum(len(positions) for positions, _
+                          in _BC6H_LAYOUTS[mode].values())
+
+    if (signed):
+        endpoints[:, 0] = _sign_extend(endpoints[:, 0], endpoint_bits)
+    if (signed or transformed):
+        endpoints[:, 1:] = _sign_extend(endpoints[:, 1:], delta_bits)
+    if (transformed):
+        endpoints[:, 1:] = (endpoints[:, 1:] + endpoints[:, :1]) \
+            & ((1 << endpoint_bits) - 1)
+        if (signed):
+            endpoints[:, 1:] = _sign_extend(endpoints[:, 1:], endpoint_bits)
+    endpoints = _unquantize(endpoints, endpoint_bits, signed)
+
+    if (num_subset == 2):
+        partition = _read(bits, pos, 5)
+        pos += 5
+    else:
+        partition = numpy.zeros(len(bits), dtype=numpy.intp)
+    index_bits = 3 if (num_subset == 2) else 4
+    idxs = _read_indices(bits, pos, index_bits, num_subset, partition)
+    weights = _WEIGHTS[index_bits][idxs]
+    e0, e1 = _select_endpoints(endpoints,
+                               _SUBSETS[num_subset - 1][partition])
+    return _to_half(_interpolate(e0, e1, weights[..., None]), signed)
+
+
+def decode_bc6h(blocks: numpy.ndarray, signed=False) -> numpy.ndarray:
+    """Decodes BC6H blocks of 16 bytes to float32 RGBA, with opaque alpha.
+    Blocks of reserved modes decode to black.
+    """
+    blocks = numpy.asarray(blocks)
+    flat = blocks.reshape(-1, 16)
+    texels = numpy.zeros((len(flat), 16, 4), dtype=numpy.float32)
+    texels[..., 3] = 1
+    modes = flat[:, 0] & 0x1F
+    modes = numpy.where(modes & 2, modes, modes & 3)
+    for mode in _BC6H_MODES:
+        selected = numpy.flatnonzero(modes == mode)
+        if (len(selected)):
+            texels[selected, :, :3] = _decode_bc6h_mode(
+                _unpack_bits(flat[selected]), mode, signed)
+    return _to_image(texels.reshape(blocks.shape[:-1] + (16, 4)))
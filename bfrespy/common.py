@@ -1,19 +1,20 @@
 from __future__ import annotations
 
 import io
+import struct
+from array import array
 from dataclasses import dataclass
 from functools import singledispatchmethod
 from collections.abc import Iterator, Collection
 from typing import TypeVar, Generic, overload, Any
 from enum import IntEnum, IntFlag
 
+import numpy
+
 from . import core, texture
 
 T = TypeVar('T', bound=core.ResData)
 
-stringcache: dict[int, str] = {}
-
-
 class Decimal10x5:
     """Represents a 16-bit fixed-point decimal consisting of 1 sign bit, 10 
     integer bits and 5 fractional bits (denoted as Q10.5). Note that the 
@@ -107,6 +108,10 @@ class AnimCurve(core.ResData):
     _FLAGS_MASK_KEY_TYPE = 0B00000000_00001100
     _FLAGS_MASK_CURVE_TYPE = 0B00000000_01110000
 
+    __slots__ = ('_flags', 'anim_data_offset', 'start_frame', 'end_frame',
+                 'scale', 'offs', 'delta', 'frames', 'keys',
+                 'key_step_bool_data')
+
     def __init__(self):
         self._flags = 0
         self.anim_data_offset = 0
@@ -121,65 +126,69 @@ class AnimCurve(core.ResData):
         """The last frame at which a key is placed."""
         self.scale = 0
         """The scale to multiply values of the curve by."""
-        self.offset = 0
+        self.offs = 0
         """The offset to add to the values of the curve
         (after multiplicating them).
         """
         self.delta = 0
         """The difference between the lowest and highest key value."""
-        self.frames = []
-        self.keys = []
+        self.frames = numpy.empty(0, dtype=numpy.float32)
+        """The frames at which keys are placed, as a float32 array."""
+        self.keys = numpy.empty((0, 1), dtype=numpy.float32)
+        """The key values as an array of shape (keys, elements_per_key), in
+        the data type they are stored with.
+        """
 
     @property
     def frame_type(self) -> AnimCurveFrameType:
         """The data type in which Frames are loaded and saved.
         For simplicity, the class always stores frames as converted Singles.
         """
-        return AnimCurveFrameType(self._flags & self._FLAGS_MASK_FRAME_TYPE)
+        return _FRAME_TYPES[self._flags & self._FLAGS_MASK_FRAME_TYPE]
 
     @frame_type.setter
     def frame_type(self, value: AnimCurveFrameType):
-        self._flags &= ~self._FLAGS_MASK_FRAME_TYPE | value
+        self._flags = self._flags & ~self._FLAGS_MASK_FRAME_TYPE | int(value)
 
     @property
     def key_type(self) -> AnimCurveKeyType:
         """ The data type in which Keys are loaded and saved.
         The class always stores frames as converted Single Instances.
         """
-        return AnimCurveKeyType(self._flags & self._FLAGS_MASK_KEY_TYPE)
+        return _KEY_TYPES[self._flags & self._FLAGS_MASK_KEY_TYPE]
 
     @key_type.setter
     def key_type(self, value: AnimCurveKeyType):
-        self._flags &= ~self._FLAGS_MASK_KEY_TYPE | value
+        self._flags = self._flags & ~self._FLAGS_MASK_KEY_TYPE | int(value)
 
     @property
     def curve_type(self) -> AnimCurveType:
         """The curve type, determining the number of elements stored
         with each key.
         """
-        return AnimCurveType(self._flags & self._FLAGS_MASK_CURVE_TYPE)
+        return _CURVE_TYPES[self._flags & self._FLAGS_MASK_CURVE_TYPE]
 
     @curve_type.setter
     def curve_type(self, value: AnimCurveType):
-        self._flags &= ~self._FLAGS_MASK_CURVE_TYPE | value
+        self._flags = self._flags & ~self._FLAGS_MASK_CURVE_TYPE | int(value)
 
     @property
     def pre_wrap(self) -> WrapMode:
         """The pre wrap mode, determining how to wrap the key data."""
-        return WrapMode(self._flags >> 8 & 3)
+        return _WRAP_MODES[self._flags >> 8 & 3]
 
     @pre_wrap.setter
     def pre_wrap(self, value: WrapMode):
-        self._flags &= ~self._FLAGS_MASK_KEY_TYPE | value
+        self._flags = self._flags & ~(3 << 8) | int(value) << 8
 
     @property
     def post_wrap(self) -> WrapMode:
         """The post wrap mode, determining how to wrap the key data."""
-        return WrapMode(self._flags >> 12 & 3)
+        return _WRAP_MODES[self._flags >> 12 & 3]
 
     @post_wrap.setter
     def post_wrap(self, value: WrapMode):
-        self._flags &= 53247 | value
+        self._flags = self._flags & ~(3 << 12) | int(value) << 12
 
     @property
     def elements_per_key(self) -> int:
@@ -191,6 +200,117 @@ class AnimCurve(core.ResData):
             case _:
                 return 1
 
+    def evaluate(self, frames) -> numpy.ndarray:
+        """Evaluates the curve at each of the given frames and returns the
+        resulting values as a float32 array, with the curve scale and offset
+        already applied. Frames outside of the keyed range are wrapped
+        according to pre_wrap and post_wrap.
+        """
+        frames = numpy.asarray(frames, dtype=numpy.float64)
+        key_frames = self._frame_array()
+        if (len(key_frames) == 0):
+            return numpy.full(frames.shape, self.offs, dtype=numpy.float32)
+        frames = self._wrap_frames(frames, key_frames)
+        if (frames.size == 0):
+            return numpy.empty(frames.shape, dtype=numpy.float32)
+
+        # Search in the dtype of the stored key frames, so they are never
+        # converted as a whole. Frames are float32 in files anyway.
+        search = frames.astype(key_frames.dtype, copy=False)
+
+        # Only the keys of segments the frames fall into are needed, so
+        # slice the window out before converting and indexing any key data.
+        lo = max(int(numpy.searchsorted(key_frames, search.min(),
+                                        side='right')) - 1, 0)
+        hi = int(numpy.searchsorted(key_frames, search.max(),
+                                    side='right')) + 1
+        key_frames = key_frames[lo:hi]
+
+        # Index of the key starting the segment each frame falls into.
+        idxs = numpy.searchsorted(key_frames, search, side='right') - 1
+        numpy.clip(idxs, 0, len(key_frames) - 1, out=idxs)
+
+        curve_type = self.curve_type
+        if (curve_type is AnimCurveType.STEP_BOOL):
+            bools = numpy.asarray(self.key_step_bool_data[lo:hi],
+                                  dtype=numpy.bool_)
+            return bools[idxs].astype(numpy.float32)
+
+        keys = self._key_array(lo, hi)
+        if (curve_type in (AnimCurveType.STEP_INT, AnimCurveType.BAKED_INT,
+                           AnimCurveType.BAKED_BOOL)):
+            return (keys[idxs, 0] + self.offs).astype(numpy.float32)
+
+        if (curve_type in (AnimCurveType.CUBIC, AnimCurveType.LINEAR)):
+            next_idxs = numpy.minimum(idxs + 1, len(key_frames) - 1)
+            start = key_frames[idxs].astype(numpy.float64)
+            duration = key_frames[next_idxs] - start
+            with numpy.errstate(divide='ignore', invalid='ignore'):
+                t = numpy.where(duration > 0, (frames - start) / duration, 0)
+            numpy.clip(t, 0, 1, out=t)
+            coefs = keys[idxs]
+            if (curve_type is AnimCurveType.CUBIC):
+                values = coefs[..., 0] + t * (
+                    coefs[..., 1] + t * (coefs[..., 2] + t * coefs[..., 3]))
+            else:
+                values = coefs[..., 0] + t * coefs[..., 1]
+        else:
+            values = keys[idxs, 0]
+
+        value_scale = self.scale if self.scale > 0 else 1
+        return (values * value_scale + self.offs).astype(numpy.float32)
+
+    def _frame_array(self) -> numpy.ndarray:
+        """Returns the key frames as a float array, converting them only if
+        they are not stored as floats already.
+        """
+        frames = numpy.asarray(self.frames)
+        if (frames.dtype.kind != 'f'):
+            frames = frames.astype(numpy.float64)
+        return frames
+
+    def resample(self, start: float, end: float, fps: float,
+                 source_fps: float = 30.0) -> numpy.ndarray:
+        """Evaluates the curve over the frame window [start, end) at fps
+        samples per second, with the curve frames running at source_fps.
+        Only the keys within the window are read.
+        """
+        return self.evaluate(sample_frames(start, end, fps, source_fps))
+
+    def _key_array(self, start=0, stop=None) -> numpy.ndarray:
+        """Returns the keys from start to stop as a float64 array of shape
+        (keys, elements_per_key).
+        """
+        keys = self.keys[start:stop]
+        return numpy.asarray(keys, dtype=numpy.float64) \
+            .reshape(len(keys), -1)
+
+    def _wrap_frames(self, frames: numpy.ndarray,
+                     key_frames: numpy.ndarray) -> numpy.ndarray:
+        """Maps frames outside of the curve range back into it according to
+        the pre and post wrap modes.
+        """
+        start = float(key_frames[0])
+        end = float(key_frames[-1])
+        span = end - start
+        if (span <= 0):
+            return frames
+
+        def wrap(mode: WrapMode, values):
+            match (mode):
+                case WrapMode.REPEAT:
+                    return start + numpy.mod(values - start, span)
+                case WrapMode.MIRROR:
+                    phase = numpy.mod(values - start, 2 * span)
+                    return start + numpy.where(phase > span,
+                                               2 * span - phase, phase)
+                case _:
+                    return numpy.clip(values, start, end)
+
+        frames = numpy.where(frames < start, wrap(self.pre_wrap, frames),
+                             frames)
+        return numpy.where(frames > end, wrap(self.post_wrap, frames), frames)
+
     def load(self, loader: core.ResFileLoader):
         frame_array_offs = 0
         key_array_offs = 0
@@ -223,62 +343,57 @@ class AnimCurve(core.ResData):
         def loadframes():
             match (self.frame_type):
                 case AnimCurveFrameType.SINGLE:
-                    return loader.read_singles(num_key)
+                    return loader.read_array(numpy.float32, num_key)
                 case AnimCurveFrameType.DECIMAL_10X5:
-                    dec10x5frames: list[float] = [0.0] * num_key
-                    for i in range(num_key):
-                        dec10x5frames[i] = float(loader.read_decimal10x5())
-                    return tuple(dec10x5frames)
+                    raw = loader.read_array(numpy.uint16, num_key)
+                    return raw / numpy.float32(1 << Decimal10x5._N)
                 case AnimCurveFrameType.BYTE:
-                    return loader.read_bytes(num_key)  # maybe
+                    return loader.read_array(numpy.uint8, num_key) \
+                        .astype(numpy.float32)
                 case _:
                     raise TypeError(
                         f"Invalid FrameType {self.frame_type.name}")
-        self.frames = loader.load_custom(tuple, loadframes, frame_array_offs)
+        self.frames = (loader.load_custom(tuple, loadframes, frame_array_offs)
+                       if frame_array_offs != 0
+                       else numpy.empty(0, dtype=numpy.float32))
 
         def loadkeys():
-            elements_per_key = self.elements_per_key
-            keys: list[tuple] = [
-                tuple() * elements_per_key for i in range(num_key)]
+            count = num_key * self.elements_per_key
             match (self.key_type):
                 case AnimCurveKeyType.SINGLE:
-                    for i in range(num_key):
-                        if (self.curve_type is AnimCurveType.STEP_INT or
-                                self.curve_type is AnimCurveType.STEP_BOOL):
-                            keys[i] = loader.read_uint32s(elements_per_key)
-                        else:
-                            keys[i] = loader.read_singles(elements_per_key)
+                    if (self.curve_type is AnimCurveType.STEP_INT or
+                            self.curve_type is AnimCurveType.STEP_BOOL):
+                        keys = loader.read_array(numpy.uint32, count)
+                    else:
+                        keys = loader.read_array(numpy.float32, count)
                 case AnimCurveKeyType.INT16:
-                    for i in range(num_key):
-                        keys[i] = loader.read_int16s(elements_per_key)
+                    keys = loader.read_array(numpy.int16, count)
                 case AnimCurveKeyType.SBYTE:
-                    for i in range(num_key):
-                        keys[i] = loader.read_sbytes(elements_per_key)
+                    keys = loader.read_array(numpy.int8, count)
                 case _:
                     raise TypeError(f"Invalid KeyType {self.key_type.name}")
-            return tuple(keys)  # only makes the outer list a tuple.
-        self.keys = loader.load_custom(tuple, loadkeys, key_array_offs)
+            # One row per key, holding elements_per_key values.
+            return keys.reshape(num_key, self.elements_per_key)
+        self.keys = (loader.load_custom(tuple, loadkeys, key_array_offs)
+                     if key_array_offs != 0
+                     else numpy.empty((0, self.elements_per_key)))
 
         if (self.curve_type is AnimCurveType.STEP_BOOL):
-            key_idx = 0
-
-            self.key_step_bool_data = [False] * num_key
-            for i in range(len(self.keys)):
-                if (num_key <= key_idx):
-                    break
-
-                value = self.keys[i][0]
+            # Each key word holds the states of 32 keys, lowest bit first.
+            words = self.keys[:, 0].astype('<u4')
+            self.key_step_bool_data = numpy.unpackbits(
+                words.view(numpy.uint8), bitorder='little'
+            )[:num_key].astype(numpy.bool_)
 
-                # Bit shift each key value
-                for j in range(32):
-                    if (num_key <= key_idx):
-                        break
 
-                    set_ = bool((value & 0x01) != 0)
-                    value >>= 1
-
-                    self.key_step_bool_data[key_idx] = set_
-                    key_idx += 1
+def sample_frames(start: float, end: float, fps: float,
+                  source_fps: float = 30.0) -> numpy.ndarray:
+    """Returns the frames of the window [start, end) sampled at fps samples
+    per second, for animations running at source_fps frames per second.
+    """
+    if (fps <= 0 or source_fps <= 0):
+        raise ValueError("Frame rates must be positive.")
+    return numpy.arange(start, end, source_fps / fps, dtype=numpy.float64)
 
 
 class AnimCurveFrameType(IntEnum):
@@ -351,6 +466,37 @@ class WrapMode(IntEnum):
     MIRROR = 2
 
 
+_FRAME_TYPES = core.EnumTable(AnimCurveFrameType)
+_KEY_TYPES = core.EnumTable(AnimCurveKeyType)
+_CURVE_TYPES = core.EnumTable(AnimCurveType)
+_WRAP_MODES = core.EnumTable(WrapMode)
+
+
+class AnimConstant(core.ResData):
+    """Represents an animation constant, setting a value which does not
+    change over the whole animation.
+    """
+
+    def __init__(self):
+        self.anim_data_offset = 0
+        """The offset of the animated value in the target's data."""
+        self.value = 0.0
+        """The value, interpreted as a float."""
+        self.int_value = 0
+        """The value, interpreted as a signed integer."""
+
+    def __repr__(self):
+        return "AnimConstant{" + str(self.anim_data_offset) + "}"
+
+    def load(self, loader: core.ResFileLoader):
+        self.anim_data_offset = loader.read_uint32()
+        # The 4 value bytes are either an int or a float, depending on what
+        # is animated, so keep both interpretations.
+        raw = loader.read_bytes(4)
+        self.value = struct.unpack(loader.endianness + 'f', raw)[0]
+        self.int_value = struct.unpack(loader.endianness + 'i', raw)[0]
+
+
 @dataclass
 class Srt2D:
     """Represents a 2D transformation."""
@@ -509,10 +655,11 @@ class UserData(core.ResData):
     """Represents custom user variables which can be attached to many sections
     and subfiles of a ResFile
     """
+    __slots__ = ('_value', '_type', 'name')
 
     def __init__(self):
         self._value: object
-        self.type: UserDataType
+        self._type: int
 
         self.name = ""
         self.set_value([])
@@ -520,6 +667,14 @@ class UserData(core.ResData):
     def __repr__(self):
         return "UserData{" + str(self.name) + "}"
 
+    @property
+    def type(self) -> UserDataType:
+        return _USER_DATA_TYPES[self._type]
+
+    @type.setter
+    def type(self, value: UserDataType):
+        self._type = int(value)
+
     def get_data(self):
         return self._value
 
@@ -554,13 +709,13 @@ class UserData(core.ResData):
 
                 reserved = loader.read_raw_string(8)
                 count = loader.read_uint32()
-                self.type = UserDataType(loader.read_uint32())
+                self._type = loader.read_uint32()
             else:
                 count = loader.read_uint32()
-                self.type = UserDataType(loader.read_byte())
+                self._type = loader.read_byte()
                 reserved = loader.read_raw_string(43)
 
-            match self.type:
+            match self._type:
                 case UserDataType.BYTE:
                     self._value = loader.load_custom(
                         tuple, lambda: loader.read_sbytes(count), data_offs
@@ -586,9 +741,9 @@ class UserData(core.ResData):
         else:
             self.name = loader.load_string()
             count = loader.read_uint16()
-            self.type = UserDataType(loader.read_byte())
+            self._type = loader.read_byte()
             loader.seek(1)
-            match self.type:
+            match self._type:
                 case UserDataType.BYTE:
                     self._value = loader.read_bytes(count)
                 case UserDataType.INT32:
@@ -617,43 +772,77 @@ class UserDataType(IntEnum):
     """The values are a Byte array"""
 
 
+_USER_DATA_TYPES = core.EnumTable(UserDataType)
+
+
 class Node(Generic[T]):
-    """Represents a node forming the Patricia trie of the dictionary."""
-    size_in_bytes = 16
+    """Represents a node forming the Patricia trie of the dictionary.
 
-    def __init__(self, key=None, value=None):
-        self.reference = 0xFFFFFFFF
-        self.idx_left: int
-        self.idx_right: int
-        self.key: str
-        self.value: T
-        if (key):
-            self.key = key
-        if (value):
-            self.value = value
+    Nodes are views onto the columns of their ResDict and are only created
+    when iterating it, so changes to them are stored in the dictionary.
+    """
+    __slots__ = ('_dict', '_idx')
+    size_in_bytes = 16
 
-    def __bool__(self):
-        if (hasattr(self, 'key')):
-            return True
-        return False
+    def __init__(self, res_dict: ResDict[T], idx: int):
+        self._dict = res_dict
+        self._idx = idx
+        """The index of the node in the dictionary, the root node being 0."""
 
     def __repr__(self) -> str:
         return f"ResDictNode('{self.key}': '{self.value}')"
 
+    @property
+    def key(self) -> str:
+        return self._dict._keys[self._idx]
+
+    @key.setter
+    def key(self, value: str):
+        self._dict._set_key(self._idx, value)
+
+    @property
+    def value(self) -> T:
+        return self._dict._values[self._idx]
+
+    @value.setter
+    def value(self, value: T):
+        self._dict._values[self._idx] = value
+
+    @property
+    def reference(self) -> int:
+        return self._dict._references[self._idx]
+
+    @property
+    def idx_left(self) -> int:
+        return self._dict._idx_lefts[self._idx]
+
+    @property
+    def idx_right(self) -> int:
+        return self._dict._idx_rights[self._idx]
+
 
 class ResDict(core.ResData, Collection[Node[T]]):
     """Represents the non-generic base of a dictionary which can quickly
     look up ResData instances via key or index.
+
+    The keys, values and trie links of the nodes are stored in parallel
+    columns rather than one object per node, with the root node at index 0.
     """
 
     def __init__(self):
-        self._nodes: list[Node[T]] = [Node('')]
+        self._keys: list[str] = ['']
+        self._values: list[T | None] = [None]
+        self._references = array('I', [0xFFFFFFFF])
+        self._idx_lefts = array('H', [0])
+        self._idx_rights = array('H', [0])
+        self._index: dict[str, int] = {}
+        """Maps each key to the index of its first occurrence."""
 
     def __len__(self):
-        return len(self._nodes) - 1
+        return len(self._keys) - 1
 
     def __iter__(self):
-        return iter(self._nodes[1:])
+        return (Node(self, i) for i in range(1, len(self._keys)))
 
     def __repr__(self):
         return (
@@ -663,11 +852,9 @@ class ResDict(core.ResData, Collection[Node[T]]):
         )
 
     def __contains__(self, x: object) -> bool:
-        node, index = self.__lookup(x, False)
-        if (node):
-            return True
-        else:
-            return False
+        if (type(x) is str):
+            return x in self._index
+        return self.__lookup(x, False) >= 0
 
     # Operators
 
@@ -680,172 +867,211 @@ class ResDict(core.ResData, Collection[Node[T]]):
         ...
 
     def __getitem__(self, key):
+        if (type(key) is str):
+            return self._values[self.__find(key) + 1]
+
+        # Indices skip the dispatch of __lookup, as sections are loaded and
+        # iterated by index.
+        if (type(key) is int):
+            if (key < 0 or key >= len(self._keys) - 1):
+                raise IndexError(f"{key} out of bounds in {self}.")
+            return self._values[key + 1]
+
         if (isinstance(key, int | str)):
-            node, index = self.__lookup(key)
-            return node.value
+            return self._values[self.__lookup(key) + 1]
 
         if (isinstance(key, core.ResData)):
-            node, index = self.__lookup(key)
-            return node.key
+            return self._keys[self.__lookup(key) + 1]
 
     def __setitem__(self, key, value: T):
+        if (type(key) is int):
+            if (key < 0 or key >= len(self._keys) - 1):
+                raise IndexError(f"{key} out of bounds in {self}.")
+            self._values[key + 1] = value
+            return
+
         if (isinstance(key, int)):
-            node, index = self.__lookup(key)
-            node.value = value
+            self._values[self.__lookup(key) + 1] = value
 
         if (isinstance(key, str)):
-            node, index = self.__lookup(key, False)
-            if (node):
-                node.value = value
+            index = self._index.get(key)
+            if (index is not None):
+                self._values[index + 1] = value
             else:
-                self._nodes.append(Node(key, value))
+                self.append(key, value)
 
         if (isinstance(key, core.ResData)):
             self.__lookup(key)
-            node, index = self.__lookup(value)
-            if (node):
+            if (self.__lookup(value, False) >= 0):
                 raise ValueError(f"Key {value} already exists.")
 
     # Properties
 
     def keys(self) -> Iterator[str]:
         """Gets all keys under which instances are stored."""
-        for node in self._nodes[1:]:
-            yield node.key
+        return iter(self._keys[1:])
 
     def values(self) -> Iterator[T]:
         """Gets all stored instances."""
-        for node in self._nodes[1:]:
-            yield node.value
+        return iter(self._values[1:])
 
     def items(self):
-        for node in self._nodes[1:]:
-            yield (node.key, node.value)
+        return zip(self._keys[1:], self._values[1:])
 
     # Public Methods
 
     def clear(self):
         """Removes all elements from the dictionary"""
-        self._nodes.clear()
-        self._nodes.append(Node(key=''))
+        self.__truncate(1)
+        self._index.clear()
 
     def contains_key(self, key):
         """Determines whether an instance is saved
         under the given key in the dictionary.
         """
-        node, index = self.__lookup(key, False)
-        if (node):
-            return True
-        return False
+        if (type(key) is str):
+            return key in self._index
+        return self.__lookup(key, False) >= 0
 
     def get_key(self, index: int):
         """Returns they key of a given index"""
-        node, idx = self.__lookup(index, True)  # XXX Shouldn't this be false?
-        if (node):
-            return node.key
-        return ""
+        # XXX Shouldn't this be false?
+        return self._keys[self.__lookup(index, True) + 1]
 
     def key_index(self, key: str):
         """Searches for the specified key and returns the zero-based
         index of the first occurrence within the entire dictionary.
         """
-        node, index = self.__lookup(key, False)
-        return (index if node else -1)
+        return self._index.get(key, -1)
 
     def rename(self, key, new_key):
         """Changes the key of the instance currently saved under the
         given key to the new_key
         """
         # Throw if key doesnt exist
-        node, index = self.__lookup(key)
+        index = self.__find(key)
         # Throw if new key already exists
-        existingnode, index = self.__lookup(key, False)
-        if (existingnode):
+        if (new_key in self._index):
             raise ValueError(f'Key "{new_key}" already exists.')
+        self._set_key(index + 1, new_key)
 
     def remove_key(self, key):
         """Removes the first occurrence of the instance with the
         specific key from the dictionary.
         """
-        node, index = self.__lookup(key, False)
-        if (node):
-            self._nodes.remove(node)
-            return True
-        else:
+        index = self._index.get(key)
+        if (index is None):
             return False
+        self.__delete(index)
+        return True
 
     def remove_at(self, index):
         """Removes the instance at the specified index of the dictionary."""
-        node, idx = self.__lookup(index, True)
-        self._nodes.remove(node)
+        self.__delete(self.__lookup(index, True))
 
     def try_get_value(self, key):
-        node, index = self.__lookup(key, False)
-        if (node):
-            return node.value
+        if (type(key) is str):
+            index = self._index.get(key)
         else:
-            return None
+            index = self.__lookup(key, False)
+        return None if index is None or index < 0 \
+            else self._values[index + 1]
 
     # Internal Methods
 
     def append(self, key, value):
         """Adds the given value under the specified key."""
-        node, index = self.__lookup(key, False)
-        if (node):
+        if (key in self._index):
             raise ValueError(f'Key "{key}" already exists.')
-        self._nodes.append(Node(key, value))
+        self._index[key] = len(self)
+        self._keys.append(key)
+        self._values.append(value)
+        self._references.append(0xFFFFFFFF)
+        self._idx_lefts.append(0)
+        self._idx_rights.append(0)
 
     def value_index(self, value: core.ResData):
         """Searches for the specified value and returns the zero-based
         index of the first occurrence within the entire dictionary."""
-        node, index = self.__lookup(value, False)
-        if (node):
-            return index
-        else:
-            return -1
+        return self.__lookup(value, False)
 
     def remove(self, value: core.ResData):
         """Removes the first occurrence of a specific value
         from the dictionary."""
-        node, index = self.__lookup(value, False)
-        if (node):
-            self._nodes.remove(node)
-            return True
-        else:
+        index = self.__lookup(value, False)
+        if (index < 0):
             return False
+        self.__delete(index)
+        return True
 
     def to_dict(self) -> dict[str, T]:
         """Copies the elements of the dictionary to a python dict
         """
-        res_data = {}
-        for i, node in enumerate(self):
-            res_data[node.key] = node.value
-        return res_data
+        return dict(self.items())
 
     def try_get_key(self, value):
         """Returns True if a key was found for the given value and has been
         assigned to key, or None if no key was found.
         """
-        node, index = self.__lookup(value, False)
-        if (node):
-            return node.key
-        else:
-            return None
+        index = self.__lookup(value, False)
+        return None if index < 0 else self._keys[index + 1]
 
     # Methods
 
     def load(self, T: type[core.ResData], loader: core.ResFileLoader):
         loader.read_uint32()  # Always 0 on switch, total size on Wii U
-        num_nodes = loader.read_uint32()  # Excluding Root node
-
-        i = 0
-        # Read the nodes including the root node.
-        nodes = []
-        while (num_nodes >= 0):
-            nodes.append(self.__read_node(T, loader))
-            i += 1  # XXX What does i do here?
-            num_nodes -= 1
-        self._nodes = nodes
+        num_nodes = loader.read_uint32() + 1  # Including the root node
+
+        self.__truncate(0)
+        for i in range(num_nodes):
+            self._references.append(loader.read_uint32())
+            self._idx_lefts.append(loader.read_uint16())
+            self._idx_rights.append(loader.read_uint16())
+            self._keys.append(loader.load_string())
+            self._values.append(None if loader.is_switch
+                                else self._load_node_value(T, loader))
+        self._reindex()
+
+    @staticmethod
+    def search(loader: core.ResFileLoader, key: str, offset: int) -> int:
+        """Finds the key in the dictionary stored at offset by walking its
+        Patricia trie in the file, and returns its zero-based index or -1 if
+        it is not stored. Only the nodes on the path of the key are read, and
+        only the key of the last one is decoded.
+        """
+        if (offset == 0):
+            return -1
+        data = key.encode('utf-8')
+
+        def bit(reference):
+            # Bits are counted from the lowest bit of the last character.
+            char_idx = reference >> 3
+            if (char_idx >= len(data)):
+                return 0
+            return (data[-1 - char_idx] >> (reference & 7)) & 1
+
+        def read_node(idx):
+            loader.seek(offset + 8 + idx * Node.size_in_bytes, io.SEEK_SET)
+            reference = loader.read_uint32()
+            # The root node references bit -1.
+            if (reference & 0x80000000):
+                reference -= 1 << 32
+            return (reference, loader.read_uint16(), loader.read_uint16())
+
+        with loader.temporary_seek(offset + 4, io.SEEK_SET):
+            if (loader.read_int32() <= 0):
+                return -1
+            parent_ref, idx, _ = read_node(0)
+            child_ref, left, right = read_node(idx)
+            # References grow towards the leaves, so a link back up the trie
+            # ends the search.
+            while (parent_ref < child_ref):
+                parent_ref = child_ref
+                idx = right if bit(child_ref) else left
+                child_ref, left, right = read_node(idx)
+            if (idx == 0 or loader.load_string() != key):
+                return -1
+            return idx - 1
 
     # Protected Methods
 
@@ -853,51 +1079,82 @@ class ResDict(core.ResData, Collection[Node[T]]):
         """Loads an ResData instance from the given loader"""
         return loader.load(T)
 
-    # Private Methods
+    def _set_key(self, idx: int, key: str):
+        """Changes the key of the node at idx, the root node being 0, and
+        updates the key index without rebuilding it.
+        """
+        old_key = self._keys[idx]
+        self._keys[idx] = key
+        if (len(self._index) != len(self._keys) - 1):
+            # Another node may share the old key, so look all of them up.
+            self._reindex()
+            return
+        del self._index[old_key]
+        first = self._index.get(key)
+        if (first is None or first > idx - 1):
+            self._index[key] = idx - 1
+
+    def _reindex(self):
+        """Rebuilds the key index after nodes were removed or renamed."""
+        self._index.clear()
+        for i, key in enumerate(self._keys[1:]):
+            self._index.setdefault(key, i)
 
-    def __read_node(self, T, loader: core.ResFileLoader) -> Node:
-        node = Node()
+    # Private Methods
 
-        node.reference = loader.read_uint32()
-        node.idx_left = loader.read_uint16()
-        node.idx_right = loader.read_uint16()
-        node.key = loader.load_string()
-        if (not loader.is_switch):
-            node.value = self._load_node_value(T, loader)
-        return node
+    def __find(self, key: str) -> int:
+        index = self._index.get(key)
+        if (index is None):
+            raise ValueError(f"{key} not found in {self}.")
+        return index
+
+    def __delete(self, index: int):
+        index += 1
+        del self._keys[index]
+        del self._values[index]
+        del self._references[index]
+        del self._idx_lefts[index]
+        del self._idx_rights[index]
+        self._reindex()
+
+    def __truncate(self, count: int):
+        """Removes all nodes after the first count ones."""
+        del self._keys[count:]
+        del self._values[count:]
+        del self._references[count:]
+        del self._idx_lefts[count:]
+        del self._idx_rights[count:]
 
     @singledispatchmethod
-    def __lookup(self, value, throwonfail=True):
-        for i, found_node in enumerate(self):
-            if (found_node.value == value):
-                return (found_node, i)
+    def __lookup(self, value, throwonfail=True) -> int:
+        for i, found in enumerate(self._values[1:]):
+            if (found == value):
+                return i
         if (throwonfail):
             raise ValueError("{key} not found in {this}.")
-        return (Node(), -1)
+        return -1
 
     @__lookup.register
-    def _(self, value: ResString, throwonfail=True):
-        for i, found_node in enumerate(self):
-            if (isinstance(found_node.value, ResString)):
-                if (str(found_node.value) == str(value)):
-                    return (found_node, i)
-        return (Node(), -1)
+    def _(self, value: ResString, throwonfail=True) -> int:
+        for i, found in enumerate(self._values[1:]):
+            if (isinstance(found, ResString)):
+                if (str(found) == str(value)):
+                    return i
+        return -1
 
     @__lookup.register
-    def _(self, key: int, throwonfail=True):
-        if (key < 0 or key > len(self._nodes)):
+    def _(self, key: int, throwonfail=True) -> int:
+        if (key < 0 or key >= len(self)):
             if (throwonfail):
                 raise IndexError(f"{key} out of bounds in {self}.")
-            return (Node(), -1)
-        node = self._nodes[key + 1]
-        return (node, key)
+            return -1
+        return key
 
     @__lookup.register
-    def _(self, key: str, throwonfail=True):
-        for i, found_node in enumerate(self):
-            if (found_node.key == key):
-                return (found_node, i)
+    def _(self, key: str, throwonfail=True) -> int:
+        index = self._index.get(key)
+        if (index is not None):
+            return index
         if (throwonfail):
             raise ValueError("{key} not found in {this}.")
-        return (Node(), -1)
-
+        return -1
@@ -1,6 +1,7 @@
 from __future__ import annotations
 import io
 from abc import ABC, abstractmethod
+from enum import Enum
 from typing import TypeVar
 from collections.abc import Callable
 from . import binary_io as bin_io
@@ -8,6 +9,9 @@ from . import binary_io as bin_io
 
 class ResData(ABC):
     """Represents the common interface for ResFile data instances."""
+    # Lets subclasses which are created in large numbers use __slots__.
+    __slots__ = ()
+
     @abstractmethod
     def load(self, loader):
         """Loads raw data from the loader data stream into instances"""
@@ -16,6 +20,24 @@ class ResData(ABC):
 
 _I = TypeVar('_I', bound=ResData)
 _T = TypeVar('_T')
+_E = TypeVar('_E', bound=Enum)
+
+
+class EnumTable(dict[int, _E]):
+    """Maps raw values to the members of an IntEnum or IntFlag.
+
+    Constructing enum members is slow, so classes store raw ints and look up
+    their enum views here. Values which are not a single member, like
+    combined flags, are converted once on their first lookup.
+    """
+
+    def __init__(self, enum: type[_E]):
+        super().__init__((member.value, member) for member in enum)
+        self.enum = enum
+
+    def __missing__(self, value: int) -> _E:
+        member = self[value] = self.enum(value)
+        return member
 
 
 class ResFileLoader(bin_io.BinaryReader):
@@ -26,6 +48,9 @@ class ResFileLoader(bin_io.BinaryReader):
         super().__init__(stream, leave_open)
         self.res_file = res_file
         self._data_map = {}
+        # Shared with the ResFile, which fills it while loading.
+        self._string_cache: dict[int, str] = getattr(
+            res_file, '_string_cache', {})
         self.is_switch: bool
         if (res_data):
             self.importable_file = res_data
@@ -142,29 +167,28 @@ class ResFileLoader(bin_io.BinaryReader):
         """Reads and returns a str instance from the following offset or an
         empty string if the read offset is 0.
         """
-        from . import common
         offset = self.read_offset()
         if (offset == 0):
             return ''
-        if (offset in common.stringcache):
-            return common.stringcache[offset]
+        if (offset in self._string_cache):
+            return self._string_cache[offset]
         with self.temporary_seek(offset, io.SEEK_SET):
             return self.read_string(encoding)
 
     def load_strings(self, count, encoding=None) -> tuple[str, ...]:
         """Reads and returns count of str from the following offset.
         """
-        from . import common
         offsets = self.read_offsets(count)
         names = [''] * len(offsets)
         with self.temporary_seek():
             for i, offset in enumerate(offsets):
                 if (offset == 0):
                     continue
-                if (offset in common.stringcache):
-                    names[i] = common.stringcache[offset]
-                self.seek(offset, io.SEEK_SET)
-                names[i] = self.read_string(encoding)
+                if (offset in self._string_cache):
+                    names[i] = self._string_cache[offset]
+                else:
+                    self.seek(offset, io.SEEK_SET)
+                    names[i] = self.read_string(encoding)
         return tuple(names)
 
     def load_dict_values(self, _I: type[ResData],
@@ -183,12 +207,9 @@ class ResFileLoader(bin_io.BinaryReader):
             dict_ = ResDict()
             dict_.load(_I, self)
 
-            keys = list(dict_.keys())
             values = self.load_list(_I, len(dict_), values_offs)
-
-            dict_.clear()
-            for i in range(len(keys)):
-                dict_.append(keys[i], values[i])
+            for i, value in enumerate(values):
+                dict_[i] = value
             return dict_
 
     def load_relocation_table(self, offset):
@@ -0,0 +1,176 @@
+"""Fits AnimCurve instances with as few keys as possible to baked values."""
+from __future__ import annotations
+from dataclasses import dataclass
+
+import numpy
+
+from .common import AnimCurve, AnimCurveType
+from .skeletal_anim import BoneAnim
+
+_CHANNEL_OFFSETS = {channel: offs
+                    for offs, channel in BoneAnim.CURVE_CHANNELS.items()}
+"""The BoneAnimData offset of each baked channel."""
+
+
+@dataclass
+class ReductionReport:
+    """Key counts before and after fitting curves to baked values."""
+    key_count_before: int
+    key_count_after: int
+    max_error: float = 0.0
+
+    def __repr__(self):
+        return (f"ReductionReport[{self.key_count_before} -> "
+                f"{self.key_count_after} keys, max error {self.max_error}]")
+
+    def __add__(self, other: ReductionReport):
+        return ReductionReport(
+            self.key_count_before + other.key_count_before,
+            self.key_count_after + other.key_count_after,
+            max(self.max_error, other.max_error),
+        )
+
+    @property
+    def ratio(self) -> float:
+        """The fraction of keys which remained after the reduction."""
+        if (self.key_count_before == 0):
+            return 1.0
+        return self.key_count_after / self.key_count_before
+
+
+def fit_curve(values, frames=None, tolerance=1e-3,
+              curve_type=AnimCurveType.CUBIC) -> tuple[AnimCurve,
+                                                       ReductionReport]:
+    """Fits a LINEAR or CUBIC AnimCurve to the baked values sampled at frames
+    (0, 1, 2, ... by default) so that no sample deviates by more than
+    tolerance, and returns it with a ReductionReport.
+
+    Keys are added where the error is largest, refining every segment which
+    is still out of tolerance at once, and the error of the whole curve is
+    measured with array operations in each pass.
+    """
+    values = numpy.asarray(values, dtype=numpy.float64)
+    if (frames is None):
+        frames = numpy.arange(len(values), dtype=numpy.float64)
+    else:
+        frames = numpy.asarray(frames, dtype=numpy.float64)
+    if (curve_type not in (AnimCurveType.CUBIC, AnimCurveType.LINEAR)):
+        raise ValueError(
+            f"Cannot fit curves of type {AnimCurveType(curve_type).name}.")
+    if (len(values) != len(frames) or len(values) == 0):
+        raise ValueError("Expected the same, non-zero number of values "
+                         "and frames.")
+
+    slopes = (numpy.gradient(values, frames)
+              if len(values) > 1 else numpy.zeros(1))
+    key_idxs = numpy.unique([0, len(values) - 1])
+    while True:
+        approx = _interpolate(frames, values, slopes, key_idxs, curve_type)
+        error = numpy.abs(approx - values)
+        # Segment each sample belongs to, and the worst sample per segment.
+        segments = numpy.searchsorted(key_idxs, numpy.arange(len(values)),
+                                      side='right') - 1
+        segment_max = numpy.zeros(len(key_idxs))
+        numpy.maximum.at(segment_max, segments, error)
+        worst = (error == segment_max[segments]) \
+            & (segment_max[segments] > tolerance)
+        candidates = numpy.flatnonzero(worst)
+        if (len(candidates) == 0):
+            break
+        # Only keep the first worst sample of each segment.
+        __, first = numpy.unique(segments[candidates], return_index=True)
+        key_idxs = numpy.union1d(key_idxs, candidates[first])
+
+    curve = _build_curve(frames, values, slopes, key_idxs, curve_type)
+    report = ReductionReport(len(values), len(key_idxs),
+                             float(error.max()))
+    return curve, report
+
+
+def reduce_baked(baked, frames=None, tolerance=1e-3,
+                 curve_type=AnimCurveType.CUBIC) -> tuple[
+                     list[list[AnimCurve]], numpy.ndarray, ReductionReport]:
+    """Fits curves to every channel of a baked (frames, bones, channels)
+    tensor, as returned by SkeletonAnim.bake(), and returns the curves per
+    bone, the (bones, channels) values of the first frame and a
+    ReductionReport over all channels.
+
+    Channels staying within tolerance of their first value get no curve at
+    all, so the first frame values are the base data of each bone: scale,
+    rotation and translation, in the order of the baked channels. The
+    anim_data_offset of each curve targets the BoneAnimData field of its
+    channel, so together with that base data the curves can be used as
+    BoneAnim.curves.
+    """
+    baked = numpy.asarray(baked)
+    num_frames, num_bones, num_channels = baked.shape
+    curves_per_bone: list[list[AnimCurve]] = []
+    report = ReductionReport(0, 0)
+
+    constant = numpy.all(numpy.abs(baked - baked[:1]) <= tolerance, axis=0)
+    for bone in range(num_bones):
+        curves = []
+        for channel in range(num_channels):
+            if (constant[bone, channel]):
+                report += ReductionReport(num_frames, 0)
+                continue
+            curve, channel_report = fit_curve(
+                baked[:, bone, channel], frames, tolerance, curve_type)
+            curve.anim_data_offset = _CHANNEL_OFFSETS[channel]
+            curves.append(curve)
+            report += channel_report
+        curves_per_bone.append(curves)
+    return curves_per_bone, baked[0].copy(), report
+
+
+def _interpolate(frames, values, slopes, key_idxs, curve_type):
+    """Evaluates the piecewise curve through the given keys at all frames."""
+    if (len(key_idxs) == 1):
+        return numpy.full(len(frames), values[key_idxs[0]])
+    if (curve_type is AnimCurveType.LINEAR):
+        return numpy.interp(frames, frames[key_idxs], values[key_idxs])
+
+    key_frames = frames[key_idxs]
+    seg = numpy.clip(numpy.searchsorted(key_frames, frames, side='right') - 1,
+                     0, len(key_idxs) - 2)
+    start, end = key_idxs[seg], key_idxs[seg + 1]
+    duration = frames[end] - frames[start]
+    t = (frames - frames[start]) / duration
+    t2 = t * t
+    t3 = t2 * t
+    return ((2 * t3 - 3 * t2 + 1) * values[start]
+            + (t3 - 2 * t2 + t) * slopes[start] * duration
+            + (-2 * t3 + 3 * t2) * values[end]
+            + (t3 - t2) * slopes[end] * duration)
+
+
+def _build_curve(frames, values, slopes, key_idxs, curve_type) -> AnimCurve:
+    """Creates the AnimCurve storing the keys at the given sample indices."""
+    key_values = values[key_idxs]
+    key_frames = frames[key_idxs]
+    duration = numpy.diff(key_frames)
+    p0, p1 = key_values[:-1], key_values[1:]
+    if (curve_type is AnimCurveType.CUBIC):
+        m0 = slopes[key_idxs[:-1]] * duration
+        m1 = slopes[key_idxs[1:]] * duration
+        keys = numpy.zeros((len(key_idxs), 4))
+        keys[:-1, 0] = p0
+        keys[:-1, 1] = m0
+        keys[:-1, 2] = 3 * (p1 - p0) - 2 * m0 - m1
+        keys[:-1, 3] = 2 * (p0 - p1) + m0 + m1
+    else:
+        keys = numpy.zeros((len(key_idxs), 2))
+        keys[:-1, 0] = p0
+        keys[:-1, 1] = p1 - p0
+    keys[-1, 0] = key_values[-1]
+
+    curve = AnimCurve()
+    curve.curve_type = curve_type
+    curve.frames = key_frames.astype(numpy.float32)
+    curve.keys = keys.astype(numpy.float32)
+    curve.start_frame = float(key_frames[0])
+    curve.end_frame = float(key_frames[-1])
+    curve.scale = 1.0
+    curve.offs = 0.0
+    curve.delta = float(key_values.max() - key_values.min())
+    return curve
@@ -1,25 +1,55 @@
+from __future__ import annotations
 import io
 from . import core
+from .binary_io import MemoryViewStream
 
 
 class ExternalFile(core.ResData):
-    """Represents a file attachment to a ResFile which can be of arbitrary 
+    """Represents a file attachment to a ResFile which can be of arbitrary
     data.
+
+    Only the position of loaded files is read, their data stays in the file
+    data kept by the ResFile and is sliced from it when it is requested.
     """
 
     def __init__(self):
-        self.data: bytes
-        self.loaded_file_data: object
+        self.loaded_file_data: object = None
+        self._data: bytes | memoryview | None = None
+        self._res_file = None
+        self._data_offs = 0
+        self._data_size = 0
+
+    @property
+    def data(self) -> bytes | memoryview:
+        """The raw data of the file. For loaded files, this is a read-only
+        view of the data of the ResFile, which is not copied.
+        """
+        if (self._data is None):
+            if (self._res_file is None):
+                return b''
+            return memoryview(self._res_file._data).toreadonly()[
+                self._data_offs:self._data_offs + self._data_size]
+        return self._data
+
+    @data.setter
+    def data(self, value: bytes | memoryview):
+        self._data = value
 
     def get_stream(self, writeable=False):
-        """Opens and returns a BytesIO on the raw data byte array, which 
-        optionally can be written to.
+        """Opens and returns a read-only stream on the raw data without
+        copying it, or a BytesIO on a copy of it if the stream should be
+        writeable.
         """
-        return io.BytesIO(self.data)
+        if (writeable):
+            return io.BytesIO(self.data)
+        return MemoryViewStream(self.data)
 
     def load(self, loader: core.ResFileLoader):
         offs_data = loader.read_offset()
         siz_data = loader.read_size()
-        self.data = loader.load_custom(
-            bytes, lambda: loader.read_bytes(siz_data), offset=offs_data
-        )
+        if (loader.is_switch):
+            loader.seek(4)  # Padding
+        if (offs_data != 0):
+            self._res_file = loader.res_file
+            self._data_offs = offs_data
+            self._data_size = siz_data
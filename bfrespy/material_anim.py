@@ -0,0 +1,301 @@
+from __future__ import annotations
+from enum import IntFlag
+import numpy
+from . import core
+from . import common
+from . import models
+
+from typing import TYPE_CHECKING
+if (TYPE_CHECKING):
+    from .res_file import ResFile
+
+
+class MaterialAnim(core.ResData):
+    """Represents an FMAA subfile in a ResFile, storing animations of
+    Material instances like texture patterns, shader parameters and
+    visibility.
+
+    Only the header is read with the file. The per-material animation data
+    with its curves is loaded the first time material_anim_data_list is
+    accessed, so files with many animations stay cheap to open.
+    """
+    _SIGNATURE = "FMAA"
+
+    class MaterialAnimFlags(IntFlag):
+        BAKED_CURVE = 1 << 0
+        """The stored curve data has been baked."""
+
+        LOOPING = 1 << 2
+        """The animation repeats from the start after
+        the last frame has been played.
+        """
+
+    def __init__(self):
+        self._flags = 0
+        self.name = ''
+        self.path = ''
+        self.frame_cnt = 0
+        self.baked_size = 0
+        self.bind_model = models.Model()
+        self.bind_idxs: tuple[int, ...] = ()
+        self.texture_names: tuple[str, ...] = ()
+        self.userdata = common.ResDict()
+
+        self.shaderparam_anim_cnt = 0
+        self.tex_pattern_anim_cnt = 0
+        self.visibility_anim_cnt = 0
+        self.curve_cnt = 0
+
+        self._res_file: ResFile | None = None
+        self._anim_data_offs = 0
+        self._anim_data_cnt = 0
+        self._material_anim_data_list: list[MaterialAnimData] | None = []
+
+    def __repr__(self):
+        return "MaterialAnim{" + str(self.name) + "}"
+
+    @property
+    def flags(self) -> MaterialAnimFlags:
+        return self.MaterialAnimFlags(self._flags)
+
+    @flags.setter
+    def flags(self, value: MaterialAnimFlags):
+        self._flags = int(value)
+
+    @property
+    def material_anim_data_list(self) -> list[MaterialAnimData]:
+        """The animations of each animated Material, loaded from the file on
+        first access.
+        """
+        if (self._material_anim_data_list is None):
+            self._material_anim_data_list = self._res_file.load_deferred(
+                lambda loader: loader.load_list(
+                    MaterialAnimData, self._anim_data_cnt,
+                    self._anim_data_offs
+                )
+            )
+        return self._material_anim_data_list
+
+    @material_anim_data_list.setter
+    def material_anim_data_list(self, value: list[MaterialAnimData]):
+        self._material_anim_data_list = value
+
+    @property
+    def baked_frames(self) -> numpy.ndarray:
+        """The frames evaluate_* sample by default, one per whole frame
+        including the last one.
+        """
+        return numpy.arange(self.frame_cnt + 1, dtype=numpy.float32)
+
+    def evaluate_texture_patterns(self, frames=None) \
+            -> dict[tuple[str, str], numpy.ndarray]:
+        """Returns the index into texture_names used at each of the given
+        frames as an int32 array, keyed by (material name, sampler name).
+        """
+        frames = self.baked_frames if frames is None else frames
+        frames = numpy.asarray(frames, dtype=numpy.float32)
+        patterns = {}
+        for anim_data in self.material_anim_data_list:
+            for info in anim_data.tex_pattern_anim_infos:
+                if (info.curve_idx != 0xFFFF):
+                    curve = anim_data.curves[info.curve_idx]
+                    idxs = numpy.rint(curve.evaluate(frames)) \
+                        .astype(numpy.int32)
+                elif (info.begin_constant != 0xFFFF):
+                    constant = anim_data.constants[info.begin_constant]
+                    idxs = numpy.full(frames.shape, constant.int_value,
+                                      dtype=numpy.int32)
+                else:
+                    continue
+                patterns[(anim_data.name, info.name)] = idxs
+        return patterns
+
+    def evaluate_shaderparams(self, frames=None) \
+            -> dict[tuple[str, str], numpy.ndarray]:
+        """Returns the values of each animated shader parameter at the given
+        frames as a float32 array of shape (frames, components), keyed by
+        (material name, parameter name). Components which are neither
+        animated nor constant are NaN, as their value comes from the
+        material.
+        """
+        frames = self.baked_frames if frames is None else frames
+        frames = numpy.asarray(frames, dtype=numpy.float32)
+        params = {}
+        for anim_data in self.material_anim_data_list:
+            for info in anim_data.param_anim_infos:
+                curves = anim_data.curves[
+                    info.begin_curve:info.begin_curve + info.curve_cnt]
+                constants = anim_data.constants[
+                    info.begin_constant:
+                    info.begin_constant + info.constant_cnt]
+                # The data offsets are byte offsets into the parameter value.
+                component_cnt = max(
+                    (target.anim_data_offset // 4 + 1
+                     for target in (*curves, *constants)), default=0)
+                values = numpy.full((len(frames), component_cnt), numpy.nan,
+                                    dtype=numpy.float32)
+                for constant in constants:
+                    values[:, constant.anim_data_offset // 4] = constant.value
+                for curve in curves:
+                    values[:, curve.anim_data_offset // 4] = \
+                        curve.evaluate(frames)
+                params[(anim_data.name, info.name)] = values
+        return params
+
+    def evaluate_visibility(self, frames=None) -> dict[str, numpy.ndarray]:
+        """Returns whether each material with animated visibility is shown at
+        the given frames as a bool array, keyed by material name.
+        """
+        frames = self.baked_frames if frames is None else frames
+        frames = numpy.asarray(frames, dtype=numpy.float32)
+        visibility = {}
+        for anim_data in self.material_anim_data_list:
+            if (anim_data.visual_curve_idx != 0xFFFF):
+                curve = anim_data.curves[anim_data.visual_curve_idx]
+                visibility[anim_data.name] = curve.evaluate(frames) != 0
+            elif (anim_data.visual_constant_idx != 0xFFFF):
+                constant = anim_data.constants[anim_data.visual_constant_idx]
+                visibility[anim_data.name] = numpy.full(
+                    frames.shape, constant.int_value != 0)
+        return visibility
+
+    def load(self, loader: core.ResFileLoader):
+        loader._check_signature(self._SIGNATURE)
+        if (loader.is_switch):
+            if (loader.res_file.version_major2 >= 9):
+                self._flags = loader.read_uint32()
+            else:
+                loader.load_header_block()
+
+            self.name = loader.load_string()
+            self.path = loader.load_string()
+            self.bind_model = loader.load(models.Model)
+            bind_idx_array = loader.read_offset()
+            self._anim_data_offs = loader.read_offset()
+            texture_array_offs = loader.read_offset()
+            texture_names_offs = loader.read_offset()
+            self.userdata = loader.load_dict_values(common.UserData)
+            texture_bind_array_offs = loader.read_offset()
+            if (loader.res_file.version_major2 < 9):
+                self._flags = loader.read_uint32()
+
+            self.frame_cnt = loader.read_int32()
+            self.baked_size = loader.read_uint32()
+            num_userdata = loader.read_uint16()
+            self._anim_data_cnt = loader.read_uint16()
+            self.curve_cnt = loader.read_uint16()
+            self.shaderparam_anim_cnt = loader.read_uint16()
+            self.tex_pattern_anim_cnt = loader.read_uint16()
+            self.visibility_anim_cnt = loader.read_uint16()
+            num_texture = loader.read_uint16()
+            loader.read_uint16()  # Padding
+
+            self.bind_idxs = loader.load_custom(
+                tuple, lambda: loader.read_uint16s(self._anim_data_cnt),
+                bind_idx_array
+            )
+            self.texture_names = loader.load_custom(
+                tuple, lambda: loader.load_strings(num_texture),
+                texture_names_offs
+            )
+            self._res_file = loader.res_file
+            self._material_anim_data_list = None
+        else:
+            raise NotImplementedError(
+                "Sorry, WiiU material animations aren't supported yet")
+
+
+class MaterialAnimData(core.ResData):
+    """Represents the animation of a single Material in a MaterialAnim."""
+
+    def __init__(self):
+        self.name = ''
+        self.param_anim_infos: list[ParamAnimInfo] = []
+        self.tex_pattern_anim_infos: list[TexturePatternAnimInfo] = []
+        self.curves: list[common.AnimCurve] = []
+        self.constants: list[common.AnimConstant] = []
+        self.shaderparam_curve_idx = 0xFFFF
+        self.tex_pattern_curve_idx = 0xFFFF
+        self.begin_visual_constant_idx = 0xFFFF
+        self.visual_curve_idx = 0xFFFF
+        self.visual_constant_idx = 0xFFFF
+
+    def __repr__(self):
+        return "MaterialAnimData{" + str(self.name) + "}"
+
+    def load(self, loader: core.ResFileLoader):
+        self.name = loader.load_string()
+        param_anim_info_offs = loader.read_offset()
+        tex_pattern_anim_info_offs = loader.read_offset()
+        curve_offs = loader.read_offset()
+        constant_offs = loader.read_offset()
+        self.shaderparam_curve_idx = loader.read_uint16()
+        self.tex_pattern_curve_idx = loader.read_uint16()
+        self.begin_visual_constant_idx = loader.read_uint16()
+        self.visual_curve_idx = loader.read_uint16()
+        self.visual_constant_idx = loader.read_uint16()
+        num_shaderparam_anim = loader.read_uint16()
+        num_tex_pattern_anim = loader.read_uint16()
+        num_constant = loader.read_uint16()
+        num_curve = loader.read_uint16()
+        loader.seek(6)  # Padding
+
+        self.param_anim_infos = loader.load_list(
+            ParamAnimInfo, num_shaderparam_anim, param_anim_info_offs)
+        self.tex_pattern_anim_infos = loader.load_list(
+            TexturePatternAnimInfo, num_tex_pattern_anim,
+            tex_pattern_anim_info_offs)
+        self.curves = loader.load_list(
+            common.AnimCurve, num_curve, curve_offs)
+        self.constants = loader.load_list(
+            common.AnimConstant, num_constant, constant_offs)
+
+
+class ParamAnimInfo(core.ResData):
+    """Represents the curves and constants animating a ShaderParam."""
+
+    def __init__(self):
+        self.name = ''
+        self.begin_curve = 0
+        self.float_curve_cnt = 0
+        self.int_curve_cnt = 0
+        self.begin_constant = 0
+        self.constant_cnt = 0
+        self.sub_bind_idx = 0
+
+    def __repr__(self):
+        return "ParamAnimInfo{" + str(self.name) + "}"
+
+    @property
+    def curve_cnt(self):
+        return self.float_curve_cnt + self.int_curve_cnt
+
+    def load(self, loader: core.ResFileLoader):
+        self.name = loader.load_string()
+        self.begin_curve = loader.read_uint16()
+        self.float_curve_cnt = loader.read_uint16()
+        self.int_curve_cnt = loader.read_uint16()
+        self.begin_constant = loader.read_uint16()
+        self.constant_cnt = loader.read_uint16()
+        self.sub_bind_idx = loader.read_uint16()
+        loader.seek(4)  # Padding
+
+
+class TexturePatternAnimInfo(core.ResData):
+    """Represents the curve or constant selecting the texture of a sampler."""
+
+    def __init__(self):
+        self.name = ''
+        self.curve_idx = 0xFFFF
+        self.begin_constant = 0xFFFF
+        self.sub_bind_idx = -1
+
+    def __repr__(self):
+        return "TexturePatternAnimInfo{" + str(self.name) + "}"
+
+    def load(self, loader: core.ResFileLoader):
+        self.name = loader.load_string()
+        self.curve_idx = loader.read_uint16()
+        self.begin_constant = loader.read_uint16()
+        self.sub_bind_idx = loader.read_sbyte()
+        loader.seek(3)  # Padding
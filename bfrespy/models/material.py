@@ -17,7 +17,7 @@ class Material(core.ResData):
     def __init__(self):
 
         self.name = ""
-        self.flags = MaterialFlags.VISIBLE
+        self._flags = int(MaterialFlags.VISIBLE)
 
         self.shader_assign = ShaderAssign()
 
@@ -40,16 +40,24 @@ class Material(core.ResData):
     def __repr__(self) -> str:
         return "Material" + "{" + self.name + "}"
 
+    @property
+    def flags(self):
+        return _MATERIAL_FLAGS[self._flags]
+
+    @flags.setter
+    def flags(self, value):
+        self._flags = int(value)
+
     @property
     def visible(self):
-        return MaterialFlags.VISIBLE == self.flags
+        return self._flags == MaterialFlags.VISIBLE
 
     @visible.setter
     def visible(self, value):
         if (value):
-            self.flags |= MaterialFlags.VISIBLE
+            self._flags |= MaterialFlags.VISIBLE
         else:
-            self.flags = MaterialFlags.NONE
+            self._flags = int(MaterialFlags.NONE)
 
     def __fill_slots(self, count):
         slots = []
@@ -64,7 +72,7 @@ class Material(core.ResData):
             MaterialParser.load(loader, self)
         else:
             self.name = loader.load_string()
-            self.flags = MaterialFlags(loader.read_uint32())
+            self.flags = loader.read_uint32()
             idx = loader.read_uint16()
             num_renderinfo = loader.read_uint16()
             num_sampler = loader.read_byte()
@@ -163,6 +171,9 @@ class MaterialFlags(IntEnum):
     """The material is rendered."""
 
 
+_MATERIAL_FLAGS = core.EnumTable(MaterialFlags)
+
+
 class ShaderAssign(core.ResData):
     def __init__(self):
         self.shader_archive_name: str = ''
@@ -220,17 +231,29 @@ class RenderInfoType(IntEnum):
     STRING = 2
 
 
+_RENDER_INFO_TYPES = core.EnumTable(RenderInfoType)
+
+
 class RenderInfo(core.ResData):
     """Represents a render info in a FMAT section storing uniform parameters
     required to render the UserData"""
+    __slots__ = ('__value', '_type', 'name')
 
     def __init__(self):
         self.__value: tuple[Any, ...]
-        self.type: RenderInfoType
+        self._type: int
 
         self.name = ""
         self.set_value([])
 
+    @property
+    def type(self):
+        return _RENDER_INFO_TYPES[self._type]
+
+    @type.setter
+    def type(self, value):
+        self._type = int(value)
+
     @property
     def data(self):
         return self.__value
@@ -252,7 +275,7 @@ class RenderInfo(core.ResData):
         return tuple(self.__value)
 
     def get_value_strings(self) -> tuple[str, ...]:
-        if (self.__value is None or self.type != RenderInfoType.STRING):
+        if (self.__value is None or self._type != RenderInfoType.STRING):
             return ('',)
         return tuple(self.__value)
 
@@ -270,10 +293,10 @@ class RenderInfo(core.ResData):
             self.name = loader.load_string()
             data_offs = loader.read_offset()
             count = loader.read_uint16()
-            self.type = RenderInfoType(loader.read_byte())
+            self._type = loader.read_byte()
             loader.seek(5)
 
-            match (self.type):
+            match (self._type):
                 case RenderInfoType.INT32:
                     self.__value = loader.load_custom(
                         tuple, lambda: loader.read_int32s(count), data_offs
@@ -292,10 +315,10 @@ class RenderInfo(core.ResData):
                         )
         else:
             count = loader.read_uint16()
-            self.type = RenderInfoType(loader.read_byte())
+            self._type = loader.read_byte()
             loader.seek(1)
             self.name = loader.load_string()
-            match (self.type):
+            match (self._type):
                 case RenderInfoType.INT32:
                     self.__value = loader.read_int32s(count)
                 case RenderInfoType.SINGLE:
@@ -305,8 +328,8 @@ class RenderInfo(core.ResData):
 
     def read_data(self, loader: core.ResFileLoader,
                   typ: RenderInfoType, count):
-        self.type = typ
-        match (self.type):
+        self._type = int(typ)
+        match (self._type):
             case RenderInfoType.INT32:
                 self.__value = loader.read_int32s(count)
             case RenderInfoType.SINGLE:
@@ -345,6 +368,9 @@ class RenderStateFlagsBlendMode(IntEnum):
 class ShaderParam(core.ResData):
     """Represents a parameter value in a UserData section, passing data to
     shader variables"""
+    __slots__ = ('data', 'callback_pointer', 'use_padding', 'padding_length',
+                 'name', '_type', 'data_offs', 'offset', 'depended_idx',
+                 'depend_idx')
 
     def __init__(self):
         self.data: object
@@ -353,7 +379,7 @@ class ShaderParam(core.ResData):
         self.padding_length: int
 
         self.name = ""
-        self.type = ShaderParamType.FLOAT
+        self._type = int(ShaderParamType.FLOAT)
         self.data_offs = 0
         self.depended_idx = 0
         self.depend_idx = 0
@@ -361,6 +387,14 @@ class ShaderParam(core.ResData):
     def __repr__(self):
         return "ShaderParam{" + str(self.name) + "}"
 
+    @property
+    def type(self):
+        return _SHADER_PARAM_TYPES[self._type]
+
+    @type.setter
+    def type(self, value):
+        self._type = int(value)
+
     @property
     def data_size(self):
         """The size of the value in bytes."""
@@ -389,7 +423,7 @@ class ShaderParam(core.ResData):
         if (loader.is_switch):
             self.callback_pointer = loader.read_uint64()
             self.name = loader.load_string()
-            self.type = ShaderParamType(loader.read_byte())
+            self._type = loader.read_byte()
             siz_data = loader.read_byte()
             self.data_offs = loader.read_uint16()
             self.offset = loader.read_int32()  # Uniform variable offset
@@ -397,7 +431,7 @@ class ShaderParam(core.ResData):
             self.depend_idx = loader.read_uint16()
             padding2 = loader.read_uint32()  # Uniform variable offset.
         else:
-            self.type = ShaderParamType(loader.read_byte())
+            self._type = loader.read_byte()
             siz_data = loader.read_byte()
 
             if (siz_data != self.data_size and siz_data > self.data_size):
@@ -528,10 +562,14 @@ class ShaderParamType(IntEnum):
     """The value is a TexSrtEx."""
 
 
+_SHADER_PARAM_TYPES = core.EnumTable(ShaderParamType)
+
+
 class Sampler(core.ResData):
     """Represents a Texture sampler in a UserData section, storing
     configuration on how to draw and interpolate textures.
     """
+    __slots__ = ('tex_sampler', 'name')
 
     def __init__(self):
         self.tex_sampler: TexSampler
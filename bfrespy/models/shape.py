@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from enum import IntFlag, IntEnum
 
-from ..core import ResData, ResFileLoader
+from ..core import ResData, ResFileLoader, EnumTable
 from ..common import ResDict, Buffer
 from ..gx2 import GX2PrimitiveType, GX2IndexFormat
 from ..switch.memory_pool import MemoryPool, BufferSize, BufferInfo
@@ -14,7 +14,7 @@ class Shape(ResData):
 
     def __init__(self):
         self.name = ""
-        self.flags = ShapeFlags.HAS_VERTEX_BUFFER
+        self._flags = int(ShapeFlags.HAS_VERTEX_BUFFER)
         self.material_idx = 0
         self.bone_idx = 0
         self.vtx_buff_idx = 0
@@ -30,27 +30,35 @@ class Shape(ResData):
         self.submesh_bounding_idxs = []
         self.vtx_buffer = VertexBuffer()
 
+    @property
+    def flags(self):
+        return _SHAPE_FLAGS[self._flags]
+
+    @flags.setter
+    def flags(self, value):
+        self._flags = int(value)
+
     @property
     def has_vtx_buffer(self):
-        return ShapeFlags.HAS_VERTEX_BUFFER in self.flags
+        return bool(self._flags & ShapeFlags.HAS_VERTEX_BUFFER)
 
     @has_vtx_buffer.setter
     def has_vtx_buffer(self, value):
         if (value):
-            self.flags |= ShapeFlags.HAS_VERTEX_BUFFER
+            self._flags |= ShapeFlags.HAS_VERTEX_BUFFER
         else:
-            self.flags &= ShapeFlags.HAS_VERTEX_BUFFER
+            self._flags &= ~ShapeFlags.HAS_VERTEX_BUFFER
 
     @property
     def submesh_boundary_consistent(self):
-        return ShapeFlags.SUBMESH_BOUNDARY_CONSISTENT in self.flags
+        return bool(self._flags & ShapeFlags.SUBMESH_BOUNDARY_CONSISTENT)
 
-    @has_vtx_buffer.setter
-    def has_vtx_buffer(self, value):
+    @submesh_boundary_consistent.setter
+    def submesh_boundary_consistent(self, value):
         if (value):
-            self.flags |= ShapeFlags.SUBMESH_BOUNDARY_CONSISTENT
+            self._flags |= ShapeFlags.SUBMESH_BOUNDARY_CONSISTENT
         else:
-            self.flags &= ShapeFlags.SUBMESH_BOUNDARY_CONSISTENT
+            self._flags &= ~ShapeFlags.SUBMESH_BOUNDARY_CONSISTENT
 
     def load(self, loader: ResFileLoader):
         loader._check_signature(self._SIGNATURE)
@@ -64,17 +72,15 @@ class Mesh(ResData):
     which index Buffer to use for referencing vertices of theshape, mostly used
     for different levels of detail (LoD) models.
     """
+    __slots__ = ('_primitive_type', '_index_format', 'submeshes',
+                 'index_buffer', 'mempool', 'first_vtx')
 
     def __init__(self):
-        self.primitive_type = GX2PrimitiveType.TRIANGLES
-        """The GX2PrimitiveType which determines how indices are used to 
-        form polygons.
-        """
-
-        self.index_format = GX2IndexFormat.UINT16
-        """The GX2IndexFormat determining the data type of the indices in the
-        IndexBuffer.
-        """
+        # Both hold the raw Switch value as a plain int until they are
+        # accessed, so invalid values only raise then.
+        self._primitive_type: GX2PrimitiveType | int = \
+            GX2PrimitiveType.TRIANGLES
+        self._index_format: GX2IndexFormat | int = GX2IndexFormat.UINT16
 
         self.submeshes = []
         """List of SubMesh instances which split up a mesh into parts which can
@@ -91,6 +97,38 @@ class Mesh(ResData):
         reference by indices.
         """
 
+    @property
+    def primitive_type(self) -> GX2PrimitiveType:
+        """The GX2PrimitiveType which determines how indices are used to
+        form polygons.
+        """
+        value = self._primitive_type
+        if (type(value) is int):
+            if (value not in self.primitive_type_list):
+                raise ValueError(f"Invalid Switch primitive type {value}.")
+            value = self._primitive_type = self.primitive_type_list[value]
+        return value
+
+    @primitive_type.setter
+    def primitive_type(self, value: GX2PrimitiveType):
+        self._primitive_type = GX2PrimitiveType(value)
+
+    @property
+    def index_format(self) -> GX2IndexFormat:
+        """The GX2IndexFormat determining the data type of the indices in the
+        IndexBuffer.
+        """
+        value = self._index_format
+        if (type(value) is int):
+            if (value not in self.index_list):
+                raise ValueError(f"Invalid Switch index format {value}.")
+            value = self._index_format = self.index_list[value]
+        return value
+
+    @index_format.setter
+    def index_format(self, value: GX2IndexFormat):
+        self._index_format = GX2IndexFormat(value)
+
     @property
     def index_count(self):
         """Gets the number of indices stored in the IndexBuffer"""
@@ -142,12 +180,8 @@ class Mesh(ResData):
             buffer = loader.read_offset()
             buffer_size = loader.load(BufferSize)
             face_buff_offs = loader.read_uint32()
-            self.primitive_type = self.primitive_type_list[
-                self.SwitchPrimitiveType(loader.read_uint32())
-            ]
-            self.index_format = self.index_list[
-                self.SwitchIndexFormat(loader.read_uint32())
-            ]
+            self._primitive_type = loader.read_uint32()
+            self._index_format = loader.read_uint32()
             index_count = loader.read_uint32()
             self.first_vtx = loader.read_uint32()
             num_submesh = loader.read_uint16()
@@ -201,6 +235,8 @@ class Mesh(ResData):
 
 
 class SubMesh(ResData):
+    __slots__ = ('offset', 'count')
+
     def __init__(self):
         self.offset: int
         self.count: int
@@ -227,6 +263,8 @@ class BoundingNode(ResData):
     """Represents a node in a SubMesh bounding tree to determine when to show 
     which sub mesh of a Mesh
     """
+    __slots__ = ('left_child_idx', 'next_sibling', 'right_child_idx', 'unk',
+                 'submesh_idx', 'submesh_cnt')
 
     def __init__(self):
         self.left_child_idx: int
@@ -261,3 +299,6 @@ class ShapeFlags(IntFlag):
     """
     HAS_VERTEX_BUFFER = 1 << 1
     SUBMESH_BOUNDARY_CONSISTENT = 1 << 2
+
+
+_SHAPE_FLAGS = EnumTable(ShapeFlags)
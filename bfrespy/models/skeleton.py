@@ -1,5 +1,7 @@
 from enum import IntFlag
-from ..core import ResData, ResFileLoader
+import numpy
+from .. import rotations
+from ..core import ResData, ResFileLoader, EnumTable
 from ..common import ResDict, UserData
 
 
@@ -14,8 +16,13 @@ class Bone(ResData):
     _FLAGS_MASK_TRANSFORM = 0B00001111_00000000_00000000_00000000
     _FLAGS_MASK_TRANSFORM_CUMULATIVE = 0B11110000_00000000_00000000_00000000
 
+    __slots__ = ('_flags', 'name', 'userdata', 'parent_idx', 'smooth_mtx_idx',
+                 'rigid_mtx_idx', 'billboard_idx', 'scale', 'rotation',
+                 'position', 'inverse_mtx')
+
     def __init__(self):
-        _flags = 0
+        # Visible with Euler XYZ rotations, no billboarding or transforms.
+        self._flags = 0x00001001
         self.name = ""
         self.userdata = ResDict()
         self.parent_idx = -1
@@ -27,12 +34,6 @@ class Bone(ResData):
         self.rotation = (0, 0, 0, 0)
         self.position = (0, 0, 0)
 
-        self.flags = BoneFlags.VISIBLE
-        self.flags_rotation = BoneFlagsRotation.EULER_XYZ
-        self.flags_billboard = BoneFlagsBillboard.NONE
-        self.flags_transform = BoneFlagsTransform.NONE
-        self.flags_transform_cumulative = BoneFlagsTransformCumulative.NONE
-
     def __repr__(self):
         return "Bone{" + str(self.name) + "}"
 
@@ -40,55 +41,63 @@ class Bone(ResData):
 
     @property
     def visible(self):
-        return BoneFlags.VISIBLE in self.flags
+        return bool(self._flags & BoneFlags.VISIBLE)
 
     @visible.setter
     def visible(self, value):
         if (value):
-            self.flags |= BoneFlags.VISIBLE
+            self._flags |= BoneFlags.VISIBLE
         else:
-            self.flags &= BoneFlags.VISIBLE
+            self._flags &= ~BoneFlags.VISIBLE
 
     @property
     def bone_flags(self):
-        return BoneFlags(self._flags & self._FLAGS_MASK)
+        return _BONE_FLAGS[self._flags & self._FLAGS_MASK]
 
     @bone_flags.setter
     def bone_flags(self, value):
-        self._flags &= ~self._FLAGS_MASK | int(value)
+        self._flags = self._flags & ~self._FLAGS_MASK | int(value)
 
     @property
     def bone_flags_rotation(self):
-        return BoneFlagsRotation(self._flags & self._FLAGS_MASK_ROTATE)
+        return _BONE_FLAGS_ROTATION[self._flags & self._FLAGS_MASK_ROTATE]
 
     @bone_flags_rotation.setter
     def bone_flags_rotation(self, value):
-        self._flags &= ~self._FLAGS_MASK_ROTATE | int(value)
+        self._flags = self._flags & ~self._FLAGS_MASK_ROTATE | int(value)
 
     @property
     def bone_flags_billboard(self):
-        return BoneFlagsBillboard(self._flags & self._FLAGS_MASK_BILLBOARD)
+        return _BONE_FLAGS_BILLBOARD[self._flags & self._FLAGS_MASK_BILLBOARD]
 
     @bone_flags_billboard.setter
     def bone_flags_billboard(self, value):
-        self._flags &= ~self._FLAGS_MASK_BILLBOARD | int(value)
+        self._flags = self._flags & ~self._FLAGS_MASK_BILLBOARD | int(value)
 
     @property
     def bone_flags_transform(self):
-        return BoneFlagsTransform(self._flags & self._FLAGS_MASK_TRANSFORM)
+        return _BONE_FLAGS_TRANSFORM[self._flags & self._FLAGS_MASK_TRANSFORM]
 
     @bone_flags_transform.setter
     def bone_flags_transform(self, value):
-        self._flags &= ~self._FLAGS_MASK_TRANSFORM | int(value)
+        self._flags = self._flags & ~self._FLAGS_MASK_TRANSFORM | int(value)
 
     @property
     def bone_flags_transform_cumulative(self):
-        return BoneFlagsTransformCumulative(
-            self._flags & self._FLAGS_MASK_TRANSFORM_CUMULATIVE)
+        return _BONE_FLAGS_TRANSFORM_CUMULATIVE[
+            self._flags & self._FLAGS_MASK_TRANSFORM_CUMULATIVE]
 
     @bone_flags_transform_cumulative.setter
     def bone_flags_transform_cumulative(self, value):
-        self._flags &= ~self._FLAGS_MASK_TRANSFORM_CUMULATIVE | int(value)
+        self._flags = (self._flags & ~self._FLAGS_MASK_TRANSFORM_CUMULATIVE
+                       | int(value))
+
+    # The flags used to be stored separately under these names.
+    flags = bone_flags
+    flags_rotation = bone_flags_rotation
+    flags_billboard = bone_flags_billboard
+    flags_transform = bone_flags_transform
+    flags_transform_cumulative = bone_flags_transform_cumulative
 
     @property
     def userdata_list(self):
@@ -209,6 +218,13 @@ class BoneFlagsTransformCumulative(IntFlag):
     IDENTITY = SCALE_ONE | ROTATE_ZERO | TRANSLATE_ZERO
 
 
+_BONE_FLAGS = EnumTable(BoneFlags)
+_BONE_FLAGS_ROTATION = EnumTable(BoneFlagsRotation)
+_BONE_FLAGS_BILLBOARD = EnumTable(BoneFlagsBillboard)
+_BONE_FLAGS_TRANSFORM = EnumTable(BoneFlagsTransform)
+_BONE_FLAGS_TRANSFORM_CUMULATIVE = EnumTable(BoneFlagsTransformCumulative)
+
+
 class Skeleton(ResData):
     """Represents an FSKL section in a Model subfile, storing armature data."""
     _SIGNATURE = "FSKL"
@@ -252,6 +268,17 @@ class Skeleton(ResData):
     def bonelist(self):
         self.bones.values()
 
+    def get_rotations(self, mode: 'SkeletonFlagRotation | None' = None):
+        """Returns the rotations of all bones as a (bones, 4) quaternion array
+        or a (bones, 3) Euler XYZ array, converted in one pass from
+        flags_rotation to the given mode (flags_rotation by default).
+        """
+        values = numpy.array([bone.rotation for bone in self.bones.values()],
+                             dtype=numpy.float64).reshape(-1, 4)
+        if (mode is None):
+            mode = self.flags_rotation
+        return rotations.convert(values, self.flags_rotation, mode)
+
     def get_smooth_idxs(self):
         idxs = []
         for bone in self.bones.values():
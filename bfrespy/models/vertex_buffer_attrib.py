@@ -102,25 +102,48 @@ class VertexAttrib(ResData):
         FORMAT_32_32_32_32_SINT = 0X00000419
         FORMAT_32_32_32_32_SINGLE = 0X00000519
 
+    __slots__ = ('name', 'buffer_idx', 'offset', '_format')
+
     def __init__(self):
         self.name = ""
         self.buffer_idx = 0
         self.offset = 0
-        self.format_ = GX2AttribFormat.FORMAT_32_32_32_SINGLE
+        # Holds the raw Switch value as a plain int until it is accessed, so
+        # invalid values only raise then.
+        self._format: GX2AttribFormat | int = \
+            GX2AttribFormat.FORMAT_32_32_32_SINGLE
 
     def __repr__(self):
         return "VertexAttrib{" + str(self.name) + "}"
 
+    @property
+    def format_(self) -> GX2AttribFormat:
+        """The GX2AttribFormat of the attribute's data."""
+        value = self._format
+        if (type(value) is int):
+            if (value not in _GX2_ATTRIB_FORMATS):
+                raise ValueError(f"Invalid Switch attribute format {value}.")
+            value = self._format = _GX2_ATTRIB_FORMATS[value]
+        return value
+
+    @format_.setter
+    def format_(self, value: GX2AttribFormat):
+        self._format = GX2AttribFormat(value)
+
     def load(self, loader: ResFileLoader):
         if (loader.is_switch):
             self.name = loader.load_string()
             loader.endianness = '>'
-            self.format_ = self.__convert_to_gx2(
-                self.SwitchAttribFormat(loader.read_uint16()))
+            self._format = loader.read_uint16()
             loader.endianness = '<'
             loader.seek(2)
             self.offset = loader.read_uint16()
             self.buffer_idx = loader.read_uint16()
 
-    def __convert_to_gx2(self, att: 'SwitchAttribFormat'):
-        return GX2AttribFormat[att.name]
+
+# Maps raw SwitchAttribFormat values to the GX2AttribFormat of the same name.
+_GX2_ATTRIB_FORMATS = {
+    switch_format.value: GX2AttribFormat[switch_format.name]
+    for switch_format in VertexAttrib.SwitchAttribFormat
+    if (switch_format.name in GX2AttribFormat.__members__)
+}
@@ -1,6 +1,9 @@
 from __future__ import annotations
 import io
+import mmap
+import os
 import struct
+import weakref
 from enum import IntFlag
 from .core import ResData
 
@@ -11,6 +14,10 @@ if (TYPE_CHECKING):
     from .external_file import ExternalFile
     from .common import ResDict, StringTable
     from .skeletal_anim import SkeletonAnim
+    from .material_anim import MaterialAnim
+    from .visibility_anim import VisibilityAnim
+    from .shape_anim import ShapeAnim
+    from .scene_anim import SceneAnim
     from .switch.memory_pool import MemoryPool, BufferInfo
 
 
@@ -25,8 +32,17 @@ class ResFile(ResData):
 
         MESH_CODEC_RESAVE = 1 << 7
 
-    def __init__(self, stream: io.BytesIO | io.BufferedReader):
-        """Initializes a new instance of the ResFile class from a stream"""
+    def __init__(self, stream: io.BytesIO | io.BufferedReader, lazy=False):
+        """Initializes a new instance of the ResFile class from a stream.
+
+        If lazy is set, only the file header is read at first. The find_*
+        methods then load single sections without reading the dictionaries,
+        and all sections are loaded once any of them is accessed.
+
+        Streams of regular files are memory-mapped rather than read, and
+        stay mapped while the ResFile or views of its data, like the data of
+        its external files, are alive.
+        """
         self.external_flag: 'ResFile.ExternalFlags'
 
         self.is_platform_switch: bool
@@ -52,14 +68,31 @@ class ResFile(ResData):
         self.skeletal_anims: ResDict[SkeletonAnim]
         self.shape_anims: ResDict[ShapeAnim]
         self.bone_visibility_anims: ResDict[VisibilityAnim]
-        self.scene_anims: ResDict[SceneAnims]
+        self.scene_anims: ResDict[SceneAnim]
         self.external_files: ResDict[ExternalFile]
+        self.tex_pattern_anims: ResDict[MaterialAnim]
+        self.shaderparam_anims: ResDict[MaterialAnim]
+        self.color_anims: ResDict[MaterialAnim]
+        self.tex_srt_anims: ResDict[MaterialAnim]
+        self.mat_visibility_anims: ResDict[MaterialAnim]
 
         if (self.is_switch_binary(stream)):
-            from .switch.switchcore import ResFileSwitchLoader
-
-            with ResFileSwitchLoader(self, stream) as loader:
-                loader._execute()
+            # Keep the raw file around so sections can be loaded on demand.
+            stream.seek(0, io.SEEK_SET)
+            self._fd: int | None = None
+            self._data = self._read_data(stream)
+            self._lazy = lazy
+            # Strings stored outside of the file by their id, which is used
+            # in place of their offset. Kept per file, as sections loaded
+            # later resolve their names through it.
+            self._string_cache: dict[int, str] = {}
+            with self._open_loader() as loader:
+                if (lazy):
+                    from .switch.res_file_parser import ResFileParser
+                    self.is_platform_switch = True
+                    ResFileParser.load_header(loader, self)
+                else:
+                    loader._execute()
         else:
             raise NotImplementedError(
                 "Sorry, WiiU files aren't supported yet")
@@ -67,6 +100,17 @@ class ResFile(ResData):
     def __repr__(self):
         return "ResFile{" + str(self.name) + "}"
 
+    def __getattr__(self, name):
+        # Only called for attributes which are not set, which are the
+        # sections of lazily opened files until they are loaded.
+        if (name.startswith('_') or not self.__dict__.get('_lazy')):
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'")
+        self._lazy = False
+        with self._open_loader() as loader:
+            loader._execute()
+        return getattr(self, name)
+
     # Public Methods
 
     def is_switch_binary(self, stream):
@@ -109,6 +153,104 @@ class ResFile(ResData):
     def has_flag(self, value, flag):
         return value & flag == flag
 
+    def bake_all_skeletal_anims(self, jobs=None, rotation_mode=None):
+        """Bakes every SkeletonAnim of the file in a pool of jobs worker
+        processes and returns the float32 tensors by animation name. See
+        skeletal_anim.bake_skeletal_anims.
+        """
+        from .skeletal_anim import bake_skeletal_anims
+        return bake_skeletal_anims(self.skeletal_anims.values(), jobs,
+                                   rotation_mode)
+
+    def decode_all_textures(self, jobs=None, backend="thread"):
+        """Decodes every texture of the file in a pool of jobs workers and
+        returns their mip levels by the key of the texture in textures. See
+        switch.bntx.decode_textures.
+        """
+        from .switch.bntx import decode_textures
+        return dict(zip(self.textures.keys(),
+                        decode_textures(self.textures.values(), jobs,
+                                        backend)))
+
+    def find_model(self, name: str) -> Model | None:
+        """Returns the Model stored under name, or None if there is none."""
+        return self._find_section('models', name)
+
+    def find_skeletal_anim(self, name: str) -> SkeletonAnim | None:
+        """Returns the SkeletonAnim stored under name, or None if there is
+        none.
+        """
+        return self._find_section('skeletal_anims', name)
+
+    def find_material_anim(self, name: str) -> MaterialAnim | None:
+        """Returns the MaterialAnim stored under name, or None if there is
+        none.
+        """
+        return self._find_section('material_anims', name)
+
+    def find_bone_visibility_anim(self, name: str) -> VisibilityAnim | None:
+        """Returns the VisibilityAnim stored under name, or None if there is
+        none.
+        """
+        return self._find_section('bone_visibility_anims', name)
+
+    def find_shape_anim(self, name: str) -> ShapeAnim | None:
+        """Returns the ShapeAnim stored under name, or None if there is none.
+        """
+        return self._find_section('shape_anims', name)
+
+    def find_scene_anim(self, name: str) -> SceneAnim | None:
+        """Returns the SceneAnim stored under name, or None if there is none.
+        """
+        return self._find_section('scene_anims', name)
+
+    def _find_section(self, section: str, name: str):
+        # Use the loaded dictionary if there is one, otherwise walk the one in
+        # the file and load only the matching value.
+        if (section in self.__dict__):
+            return self.__dict__[section].try_get_value(name)
+        from .switch.res_file_parser import ResFileParser
+        return self.load_deferred(
+            lambda loader: ResFileParser.find(loader, section, name))
+
+    def load_deferred(self, callback):
+        """Opens a new loader over the file data and returns the result of
+        calling callback with it. Used by sections which load their contents
+        only once they are accessed.
+        """
+        with self._open_loader() as loader:
+            return callback(loader)
+
+    def _read_data(self, stream) -> bytes | mmap.mmap:
+        """Returns the data of the stream, mapping it if it is a file."""
+        if (isinstance(stream, io.BytesIO)):
+            return stream.getvalue()
+        try:
+            fd = os.dup(stream.fileno())
+        except (AttributeError, OSError):
+            # io.UnsupportedOperation is an OSError.
+            return stream.read()
+        try:
+            data = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Pipes and empty files cannot be mapped.
+            os.close(fd)
+            return stream.read()
+        # Loaders map the file again, see _open_loader().
+        self._fd = fd
+        weakref.finalize(self, os.close, fd)
+        return data
+
+    def _open_loader(self):
+        from .switch.switchcore import ResFileSwitchLoader
+        if (self._fd is not None):
+            # Every loader gets its own mapping, as loaders may be nested and
+            # each needs its own position. Unlike a BytesIO, it does not
+            # copy the file.
+            return ResFileSwitchLoader(
+                self, mmap.mmap(self._fd, 0, access=mmap.ACCESS_READ))
+        return ResFileSwitchLoader(self, io.BytesIO(self._data))
+
     # Methods
 
     def load(self, loader):
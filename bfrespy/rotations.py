@@ -0,0 +1,205 @@
+"""Batched rotation conversions over NumPy arrays.
+
+Quaternions are stored as (x, y, z, w) like Bone.rotation, and Euler angles
+are XYZ in radians, applying the X rotation first (R = Rz * Ry * Rx). All
+functions accept arrays with any number of leading dimensions.
+"""
+from __future__ import annotations
+import numpy
+
+QUATERNION = 0
+"""Rotation mode value shared by BoneFlagsRotation, SkeletonFlagRotation and
+SkeletonAnim.SkeletalAnimFlagsRotate for quaternions.
+"""
+EULER_XYZ = 1 << 12
+"""Rotation mode value shared by BoneFlagsRotation, SkeletonFlagRotation and
+SkeletonAnim.SkeletalAnimFlagsRotate for Euler XYZ angles.
+"""
+
+_EPSILON = 1e-8
+
+
+def normalize_quats(quats) -> numpy.ndarray:
+    """Returns the quaternions scaled to unit length. Zero quaternions become
+    the identity rotation.
+    """
+    quats = numpy.asarray(quats, dtype=numpy.float64)
+    length = numpy.linalg.norm(quats, axis=-1, keepdims=True)
+    identity = numpy.zeros_like(quats)
+    identity[..., 3] = 1
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        return numpy.where(length > _EPSILON, quats / length, identity)
+
+
+def euler_to_quat(eulers) -> numpy.ndarray:
+    """Converts (..., 3) Euler XYZ angles to (..., 4) quaternions."""
+    half = numpy.asarray(eulers, dtype=numpy.float64) * 0.5
+    cx, cy, cz = numpy.moveaxis(numpy.cos(half), -1, 0)
+    sx, sy, sz = numpy.moveaxis(numpy.sin(half), -1, 0)
+    return numpy.stack((
+        sx * cy * cz - cx * sy * sz,
+        cx * sy * cz + sx * cy * sz,
+        cx * cy * sz - sx * sy * cz,
+        cx * cy * cz + sx * sy * sz,
+    ), axis=-1)
+
+
+def quat_to_matrix(quats) -> numpy.ndarray:
+    """Converts (..., 4) quaternions to (..., 3, 3) rotation matrices."""
+    x, y, z, w = numpy.moveaxis(normalize_quats(quats), -1, 0)
+    xx, yy, zz = x * x, y * y, z * z
+    xy, xz, yz = x * y, x * z, y * z
+    wx, wy, wz = w * x, w * y, w * z
+    return numpy.stack((
+        1 - 2 * (yy + zz), 2 * (xy - wz), 2 * (xz + wy),
+        2 * (xy + wz), 1 - 2 * (xx + zz), 2 * (yz - wx),
+        2 * (xz - wy), 2 * (yz + wx), 1 - 2 * (xx + yy),
+    ), axis=-1).reshape(x.shape + (3, 3))
+
+
+def euler_to_matrix(eulers) -> numpy.ndarray:
+    """Converts (..., 3) Euler XYZ angles to (..., 3, 3) rotation
+    matrices.
+    """
+    eulers = numpy.asarray(eulers, dtype=numpy.float64)
+    cx, cy, cz = numpy.moveaxis(numpy.cos(eulers), -1, 0)
+    sx, sy, sz = numpy.moveaxis(numpy.sin(eulers), -1, 0)
+    return numpy.stack((
+        cy * cz, sx * sy * cz - cx * sz, cx * sy * cz + sx * sz,
+        cy * sz, sx * sy * sz + cx * cz, cx * sy * sz - sx * cz,
+        -sy, sx * cy, cx * cy,
+    ), axis=-1).reshape(cx.shape + (3, 3))
+
+
+def euler_zxy_to_matrix(eulers) -> numpy.ndarray:
+    """Converts (..., 3) Euler angles applied in Z, X, Y order
+    (R = Ry * Rx * Rz), as used by cameras, to (..., 3, 3) rotation matrices.
+    """
+    eulers = numpy.asarray(eulers, dtype=numpy.float64)
+    cx, cy, cz = numpy.moveaxis(numpy.cos(eulers), -1, 0)
+    sx, sy, sz = numpy.moveaxis(numpy.sin(eulers), -1, 0)
+    return numpy.stack((
+        cy * cz + sx * sy * sz, sx * sy * cz - cy * sz, cx * sy,
+        cx * sz, cx * cz, -sx,
+        sx * cy * sz - sy * cz, sy * sz + sx * cy * cz, cx * cy,
+    ), axis=-1).reshape(cx.shape + (3, 3))
+
+
+def matrix_to_euler(matrices) -> numpy.ndarray:
+    """Converts (..., 3, 3) rotation matrices to (..., 3) Euler XYZ angles.
+    In gimbal lock the X angle is set to 0.
+    """
+    m = numpy.asarray(matrices, dtype=numpy.float64)
+    sy = numpy.clip(-m[..., 2, 0], -1, 1)
+    locked = numpy.abs(sy) > 1 - 1e-6
+    x = numpy.where(locked, 0, numpy.arctan2(m[..., 2, 1], m[..., 2, 2]))
+    z = numpy.where(locked,
+                    numpy.arctan2(-m[..., 0, 1], m[..., 1, 1]),
+                    numpy.arctan2(m[..., 1, 0], m[..., 0, 0]))
+    return numpy.stack((x, numpy.arcsin(sy), z), axis=-1)
+
+
+def matrix_to_quat(matrices) -> numpy.ndarray:
+    """Converts (..., 3, 3) rotation matrices to (..., 4) quaternions with a
+    non-negative W component.
+    """
+    m = numpy.asarray(matrices, dtype=numpy.float64)
+    m00, m11, m22 = m[..., 0, 0], m[..., 1, 1], m[..., 2, 2]
+    # Compute all four candidates and keep the numerically stable one,
+    # which is the one with the largest diagonal term.
+    candidates = numpy.stack((
+        numpy.stack((1 + m00 - m11 - m22, m[..., 0, 1] + m[..., 1, 0],
+                     m[..., 0, 2] + m[..., 2, 0], m[..., 2, 1] - m[..., 1, 2]),
+                    axis=-1),
+        numpy.stack((m[..., 0, 1] + m[..., 1, 0], 1 - m00 + m11 - m22,
+                     m[..., 1, 2] + m[..., 2, 1], m[..., 0, 2] - m[..., 2, 0]),
+                    axis=-1),
+        numpy.stack((m[..., 0, 2] + m[..., 2, 0], m[..., 1, 2] + m[..., 2, 1],
+                     1 - m00 - m11 + m22, m[..., 1, 0] - m[..., 0, 1]),
+                    axis=-1),
+        numpy.stack((m[..., 2, 1] - m[..., 1, 2], m[..., 0, 2] - m[..., 2, 0],
+                     m[..., 1, 0] - m[..., 0, 1], 1 + m00 + m11 + m22),
+                    axis=-1),
+    ), axis=-2)
+    best = numpy.argmax(numpy.stack((m00 - m11 - m22, m11 - m00 - m22,
+                                     m22 - m00 - m11, m00 + m11 + m22),
+                                    axis=-1), axis=-1)
+    quats = numpy.take_along_axis(
+        candidates, best[..., None, None], axis=-2)[..., 0, :]
+    quats = normalize_quats(quats)
+    return numpy.where(quats[..., 3:] < 0, -quats, quats)
+
+
+def quat_to_euler(quats) -> numpy.ndarray:
+    """Converts (..., 4) quaternions to (..., 3) Euler XYZ angles."""
+    return matrix_to_euler(quat_to_matrix(quats))
+
+
+def quat_multiply(a, b) -> numpy.ndarray:
+    """Returns the Hamilton products a * b of two quaternion arrays, which
+    rotate by b first and then by a.
+    """
+    ax, ay, az, aw = numpy.moveaxis(numpy.asarray(a, numpy.float64), -1, 0)
+    bx, by, bz, bw = numpy.moveaxis(numpy.asarray(b, numpy.float64), -1, 0)
+    return numpy.stack((
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+        aw * bw - ax * bx - ay * by - az * bz,
+    ), axis=-1)
+
+
+def quat_conjugate(quats) -> numpy.ndarray:
+    """Returns the conjugates of the quaternions, which are their inverses
+    for unit quaternions.
+    """
+    quats = numpy.array(quats, dtype=numpy.float64)
+    quats[..., :3] *= -1
+    return quats
+
+
+def nlerp(a, b, t) -> numpy.ndarray:
+    """Linearly interpolates from the quaternions a to b by t along the
+    shortest path and normalizes the result.
+    """
+    a = numpy.asarray(a, dtype=numpy.float64)
+    b = numpy.asarray(b, dtype=numpy.float64)
+    t = numpy.asarray(t, dtype=numpy.float64)[..., None]
+    sign = numpy.where(numpy.sum(a * b, axis=-1, keepdims=True) < 0, -1, 1)
+    return normalize_quats(a + (b * sign - a) * t)
+
+
+def slerp(a, b, t) -> numpy.ndarray:
+    """Spherically interpolates from the quaternions a to b by t along the
+    shortest path. Nearly parallel pairs fall back to nlerp.
+    """
+    a = normalize_quats(a)
+    b = normalize_quats(b)
+    t = numpy.asarray(t, dtype=numpy.float64)[..., None]
+    dot = numpy.sum(a * b, axis=-1, keepdims=True)
+    b = numpy.where(dot < 0, -b, b)
+    dot = numpy.clip(numpy.abs(dot), 0, 1)
+    theta = numpy.arccos(dot)
+    sin_theta = numpy.sin(theta)
+    close = sin_theta < 1e-6
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        wa = numpy.where(close, 1 - t, numpy.sin((1 - t) * theta) / sin_theta)
+        wb = numpy.where(close, t, numpy.sin(t * theta) / sin_theta)
+    result = wa * a + wb * b
+    return numpy.where(close, normalize_quats(result), result)
+
+
+def convert(rotations, src_mode: int, dst_mode: int) -> numpy.ndarray:
+    """Converts rotations stored in src_mode to dst_mode, each being either
+    QUATERNION or EULER_XYZ. Euler input may have 3 or 4 components, with the
+    4th one ignored. Returns (..., 4) quaternions or (..., 3) angles.
+    """
+    rotations = numpy.asarray(rotations, dtype=numpy.float64)
+    if (int(src_mode) == EULER_XYZ):
+        rotations = rotations[..., :3]
+        if (int(dst_mode) == EULER_XYZ):
+            return rotations
+        return euler_to_quat(rotations)
+    if (int(dst_mode) == EULER_XYZ):
+        return quat_to_euler(rotations)
+    return normalize_quats(rotations)
@@ -0,0 +1,212 @@
+from __future__ import annotations
+from enum import IntFlag
+import numpy
+from . import core
+from . import common
+from . import models
+
+from typing import TYPE_CHECKING
+if (TYPE_CHECKING):
+    from .res_file import ResFile
+
+
+class ShapeAnim(core.ResData):
+    """Represents an FSHA subfile in a ResFile, storing animations of the key
+    shape weights of Shape instances.
+
+    Only the header is read with the file. The per-shape animations with
+    their curves are loaded the first time vertex_shape_anims is accessed.
+    """
+    _SIGNATURE = "FSHA"
+
+    class ShapeAnimFlags(IntFlag):
+        BAKED_CURVE = 1 << 0
+        """The stored curve data has been baked."""
+
+        LOOPING = 1 << 2
+        """The animation repeats from the start after
+        the last frame has been played.
+        """
+
+    def __init__(self):
+        self._flags = 0
+        self.name = ''
+        self.path = ''
+        self.frame_cnt = 0
+        self.baked_size = 0
+        self.bind_model = models.Model()
+        self.bind_idxs: tuple[int, ...] = ()
+        self.userdata = common.ResDict()
+
+        self.key_shape_anim_cnt = 0
+        self.curve_cnt = 0
+
+        self._res_file: ResFile | None = None
+        self._vertex_shape_anim_offs = 0
+        self._vertex_shape_anim_cnt = 0
+        self._vertex_shape_anims: list[VertexShapeAnim] | None = []
+
+    def __repr__(self):
+        return "ShapeAnim{" + str(self.name) + "}"
+
+    @property
+    def flags(self) -> ShapeAnimFlags:
+        return self.ShapeAnimFlags(self._flags)
+
+    @flags.setter
+    def flags(self, value: ShapeAnimFlags):
+        self._flags = int(value)
+
+    @property
+    def vertex_shape_anims(self) -> list[VertexShapeAnim]:
+        """The animations of each animated Shape, loaded from the file on
+        first access.
+        """
+        if (self._vertex_shape_anims is None):
+            self._vertex_shape_anims = self._res_file.load_deferred(
+                lambda loader: loader.load_list(
+                    VertexShapeAnim, self._vertex_shape_anim_cnt,
+                    self._vertex_shape_anim_offs
+                )
+            )
+        return self._vertex_shape_anims
+
+    @vertex_shape_anims.setter
+    def vertex_shape_anims(self, value: list[VertexShapeAnim]):
+        self._vertex_shape_anims = value
+
+    @property
+    def baked_frames(self) -> numpy.ndarray:
+        """The frames evaluate_weights samples by default, one per whole
+        frame including the last one.
+        """
+        return numpy.arange(self.frame_cnt + 1, dtype=numpy.float32)
+
+    def evaluate_weights(self, frames=None) -> dict[str, numpy.ndarray]:
+        """Returns the key shape weights of each animated Shape at the given
+        frames, keyed by shape name. See VertexShapeAnim.evaluate_weights.
+        """
+        frames = self.baked_frames if frames is None else frames
+        return {anim.name: anim.evaluate_weights(frames)
+                for anim in self.vertex_shape_anims}
+
+    def load(self, loader: core.ResFileLoader):
+        loader._check_signature(self._SIGNATURE)
+        if (loader.is_switch):
+            if (loader.res_file.version_major2 >= 9):
+                self._flags = loader.read_uint32()
+            else:
+                loader.load_header_block()
+
+            self.name = loader.load_string()
+            self.path = loader.load_string()
+            self.bind_model = loader.load(models.Model)
+            bind_idx_array = loader.read_offset()
+            self._vertex_shape_anim_offs = loader.read_offset()
+            self.userdata = loader.load_dict_values(common.UserData)
+            if (loader.res_file.version_major2 < 9):
+                self._flags = loader.read_uint32()
+
+            self.frame_cnt = loader.read_int32()
+            self.baked_size = loader.read_uint32()
+            num_userdata = loader.read_uint16()
+            self._vertex_shape_anim_cnt = loader.read_uint16()
+            self.key_shape_anim_cnt = loader.read_uint16()
+            self.curve_cnt = loader.read_uint16()
+
+            self.bind_idxs = loader.load_custom(
+                tuple,
+                lambda: loader.read_uint16s(self._vertex_shape_anim_cnt),
+                bind_idx_array
+            )
+            self._res_file = loader.res_file
+            self._vertex_shape_anims = None
+        else:
+            raise NotImplementedError(
+                "Sorry, WiiU shape animations aren't supported yet")
+
+
+class VertexShapeAnim(core.ResData):
+    """Represents the animation of the key shapes of a single Shape in a
+    ShapeAnim.
+    """
+
+    def __init__(self):
+        self.name = ''
+        self.begin_curve = 0
+        self.begin_key_shape_anim = 0
+        self.key_shape_anim_infos: list[KeyShapeAnimInfo] = []
+        """The animated key shapes, the first one being the base shape."""
+        self.curves: list[common.AnimCurve] = []
+        self.base_data = numpy.empty(0, dtype=numpy.float32)
+        """The weight of each key shape after the base shape when no curve
+        overrides it.
+        """
+
+    def __repr__(self):
+        return "VertexShapeAnim{" + str(self.name) + "}"
+
+    @property
+    def key_shape_names(self) -> list[str]:
+        """The names of the key shapes evaluate_weights returns weights for.
+        """
+        return [info.name for info in self.key_shape_anim_infos[1:]]
+
+    def evaluate_weights(self, frames) -> numpy.ndarray:
+        """Returns the weight of each key shape after the base shape at the
+        given frames as a float32 array of shape (frames, key_shapes), in
+        the order of key_shape_names.
+        """
+        frames = numpy.asarray(frames, dtype=numpy.float32)
+        infos = self.key_shape_anim_infos[1:]
+        weights = numpy.empty((len(frames), len(infos)), dtype=numpy.float32)
+        weights[:] = self.base_data[:len(infos)]
+        for i, info in enumerate(infos):
+            if (info.curve_idx >= 0):
+                weights[:, i] = self.curves[info.curve_idx].evaluate(frames)
+        return weights
+
+    def load(self, loader: core.ResFileLoader):
+        self.name = loader.load_string()
+        curve_offs = loader.read_offset()
+        key_shape_anim_info_offs = loader.read_offset()
+        base_data_offs = loader.read_offset()
+        num_curve = loader.read_uint16()
+        num_key_shape_anim_info = loader.read_uint16()
+        self.begin_curve = loader.read_int32()
+        self.begin_key_shape_anim = loader.read_int32()
+        loader.seek(4)  # Padding
+
+        self.key_shape_anim_infos = loader.load_list(
+            KeyShapeAnimInfo, num_key_shape_anim_info,
+            key_shape_anim_info_offs)
+        self.curves = loader.load_list(
+            common.AnimCurve, num_curve, curve_offs)
+        # The base shape has no weight of its own.
+        self.base_data = (
+            loader.load_custom(
+                tuple,
+                lambda: loader.read_array(
+                    numpy.float32, max(num_key_shape_anim_info - 1, 0)),
+                base_data_offs)
+            if base_data_offs != 0
+            else numpy.zeros(max(num_key_shape_anim_info - 1, 0),
+                             dtype=numpy.float32))
+
+
+class KeyShapeAnimInfo(core.ResData):
+    """Represents the curve animating the weight of a KeyShape."""
+
+    def __init__(self):
+        self.name = ''
+        self.curve_idx = -1
+        self.sub_bind_idx = -1
+
+    def __repr__(self):
+        return "KeyShapeAnimInfo{" + str(self.name) + "}"
+
+    def load(self, loader: core.ResFileLoader):
+        self.name = loader.load_string()
+        self.curve_idx = loader.read_int16()
+        self.sub_bind_idx = loader.read_int16()
+        loader.seek(4)  # Padding
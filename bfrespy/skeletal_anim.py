@@ -1,6 +1,10 @@
 from __future__ import annotations
+from dataclasses import dataclass
 from enum import IntFlag
-from . import core
+import os
+from collections.abc import Iterable
+import numpy
+from . import core, rotations
 from . import common
 from . import models
 
@@ -62,6 +66,13 @@ class SkeletonAnim(core.ResData):
     def __repr__(self):
         return "SkeletonAnim" + "{" + self.name + "}"
 
+    @property
+    def baked_frames(self) -> numpy.ndarray:
+        """The frames sampled by bake() when no frames are given, which are
+        all frames from 0 to frame_cnt inclusive.
+        """
+        return numpy.arange(self.frame_cnt + 1, dtype=numpy.float32)
+
     @property
     def flags_anim_settings(self) -> SkeletalAnimFlags:
         """The SkeletalAnimFlags mode used
@@ -123,6 +134,57 @@ class SkeletonAnim(core.ResData):
     def flags_rotate(self, value: SkeletalAnimFlagsRotate):
         self._flags &= ~self._FLAGS_MASK_ROTATE | value
 
+    def bake(self, frames=None, out: numpy.ndarray | None = None,
+             rotation_mode: SkeletalAnimFlagsRotate | None = None):
+        """Evaluates every BoneAnim at the given frames (baked_frames by
+        default) and returns a float32 array of shape
+        (frames, bone_anims, BoneAnim.CHANNEL_COUNT).
+
+        Rotations are stored as they are in the file (see flags_rotate) unless
+        a rotation_mode is given, in which case all of them are converted in
+        one pass. Euler angles occupy the first 3 rotation components and
+        leave the 4th one at 1.
+        """
+        if (frames is None):
+            frames = self.baked_frames
+        return _bake_bone_anims(self.bone_anims, frames, out,
+                                self._rotation_conversion(rotation_mode))
+
+    def resample(self, start: float, end: float, fps: float,
+                 source_fps: float = 30.0) -> numpy.ndarray:
+        """Bakes only the frame window [start, end) at fps samples per second,
+        with the animation running at source_fps. Returns the same layout as
+        bake().
+        """
+        return self.bake(common.sample_frames(start, end, fps, source_fps))
+
+    def extract_root_motion(self, root: int | str = 0, frames=None,
+                            baked: numpy.ndarray | None = None,
+                            vertical=False) -> tuple[RootMotion,
+                                                     numpy.ndarray]:
+        """Extracts the motion of the root BoneAnim, given by index or name,
+        from a bake of the animation (bake() at frames by default). See
+        extract_root_motion().
+        """
+        if (baked is None):
+            baked = self.bake(frames)
+        return extract_root_motion(baked, self._bone_anim_idx(root),
+                                   self.flags_rotate, vertical)
+
+    def _bone_anim_idx(self, bone: int | str) -> int:
+        if (isinstance(bone, int)):
+            return bone
+        for i, bone_anim in enumerate(self.bone_anims):
+            if (bone_anim.name == bone):
+                return i
+        raise KeyError(f"{self} has no BoneAnim named '{bone}'.")
+
+    def _rotation_conversion(self, rotation_mode):
+        if (rotation_mode is None
+                or int(rotation_mode) == int(self.flags_rotate)):
+            return None
+        return (int(self.flags_rotate), int(rotation_mode))
+
     def load(self, loader: core.ResFileLoader):
         loader._check_signature(self._SIGNATURE)
         if (loader.is_switch):
@@ -198,16 +260,207 @@ class SkeletonAnim(core.ResData):
                 )
 
 
+def bake_skeletal_anims(anims: Iterable[SkeletonAnim],
+                        jobs: int | None = None,
+                        rotation_mode=None) -> dict[str, numpy.ndarray]:
+    """Bakes all given SkeletonAnim instances with SkeletonAnim.bake() and
+    returns the results by animation name.
+
+    The work is spread over a pool of jobs worker processes (one per CPU by
+    default). Workers write their results into one shared memory block, so
+    only the curve data is pickled on the way in. The block is then copied
+    once into a private contiguous float32 buffer, of which all returned
+    arrays are views, and released.
+    """
+    anims = list(anims)
+    shapes = [(anim.frame_cnt + 1, len(anim.bone_anims), BoneAnim.CHANNEL_COUNT)
+              for anim in anims]
+    sizes = [int(numpy.prod(shape)) for shape in shapes]
+    offsets = numpy.concatenate(([0], numpy.cumsum(sizes, dtype=numpy.int64)))
+    baked = numpy.empty(int(offsets[-1]), dtype=numpy.float32)
+
+    if (jobs is None):
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(anims))
+
+    if (jobs <= 1 or baked.nbytes == 0):
+        for i, anim in enumerate(anims):
+            anim.bake(out=baked[offsets[i]:offsets[i + 1]].reshape(shapes[i]),
+                      rotation_mode=rotation_mode)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import shared_memory
+        shm = shared_memory.SharedMemory(create=True, size=baked.nbytes)
+        # Hand out a few batches per worker to keep the pickling overhead of
+        # tiny animations low while still balancing the load.
+        tasks = [(anim.bone_anims, anim.baked_frames, int(offsets[i]),
+                  shapes[i],
+                  anim._rotation_conversion(rotation_mode))
+                 for i, anim in enumerate(anims)]
+        batch_size = -(-len(tasks) // (jobs * 4))
+        try:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                futures = [
+                    pool.submit(_bake_shared, shm.name,
+                                tasks[i:i + batch_size])
+                    for i in range(0, len(tasks), batch_size)
+                ]
+                for future in futures:
+                    future.result()
+            baked[:] = numpy.ndarray(baked.shape, numpy.float32, shm.buf)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    return {anim.name: baked[offsets[i]:offsets[i + 1]].reshape(shapes[i])
+            for i, anim in enumerate(anims)}
+
+
+@dataclass
+class RootMotion:
+    """The motion of a root bone over the frames of an animation."""
+    translation: numpy.ndarray
+    """The (frames, 3) extracted translation of the root."""
+    yaw: numpy.ndarray
+    """The (frames,) extracted rotation around the Y axis in radians,
+    unwrapped so it does not jump between -pi and pi.
+    """
+    delta_translation: numpy.ndarray
+    """The (frames, 3) translation since the previous frame, in the space
+    facing the previous frame's yaw. The first frame has no motion.
+    """
+    delta_yaw: numpy.ndarray
+    """The (frames,) yaw change since the previous frame."""
+
+
+def extract_root_motion(baked: numpy.ndarray, root_idx: int,
+                        rotation_mode=rotations.QUATERNION,
+                        vertical=False) -> tuple[RootMotion, numpy.ndarray]:
+    """Extracts the translation and yaw of the bone at root_idx from a
+    (frames, bone_anims, 10) bake with rotations in rotation_mode.
+
+    Returns the root motion and a de-rooted copy of the bake. In the copy the
+    root no longer moves horizontally (or at all if vertical is set) and is
+    turned back by the extracted yaw. The Y axis is taken as up.
+    """
+    derooted = numpy.array(baked, dtype=numpy.float32)
+    root = derooted[:, root_idx].astype(numpy.float64)
+    quats = rotations.convert(root[:, 3:7], rotation_mode,
+                              rotations.QUATERNION)
+
+    # Heading of the root's Z axis projected onto the ground plane.
+    x, y, z, w = quats.T
+    yaw = numpy.unwrap(numpy.arctan2(2 * (x * z + w * y),
+                                     1 - 2 * (x * x + y * y)))
+    translation = root[:, 7:10].copy()
+    if (not vertical):
+        translation[:, 1] = 0
+
+    half = -yaw / 2
+    unturn = numpy.zeros((len(yaw), 4))
+    unturn[:, 1] = numpy.sin(half)
+    unturn[:, 3] = numpy.cos(half)
+    rotated = rotations.convert(rotations.quat_multiply(unturn, quats),
+                                rotations.QUATERNION, rotation_mode)
+    if (rotated.shape[-1] == 3):
+        derooted[:, root_idx, 3:6] = rotated
+        derooted[:, root_idx, 6] = 1
+    else:
+        derooted[:, root_idx, 3:7] = rotated
+    derooted[:, root_idx, 7:10] = root[:, 7:10] - translation
+
+    # Express each step in the space facing the previous frame's heading.
+    step = numpy.diff(translation, axis=0, prepend=translation[:1])
+    heading = numpy.concatenate((yaw[:1], yaw[:-1]))
+    cos, sin = numpy.cos(heading), numpy.sin(heading)
+    delta_translation = numpy.stack((
+        cos * step[:, 0] - sin * step[:, 2],
+        step[:, 1],
+        sin * step[:, 0] + cos * step[:, 2],
+    ), axis=-1)
+    delta_yaw = numpy.diff(yaw, prepend=yaw[:1])
+
+    motion = RootMotion(
+        translation.astype(numpy.float32), yaw.astype(numpy.float32),
+        delta_translation.astype(numpy.float32),
+        delta_yaw.astype(numpy.float32)
+    )
+    return motion, derooted
+
+
+def extract_root_motions(anims: Iterable[SkeletonAnim], root: int | str = 0,
+                         jobs: int | None = None, vertical=False) \
+        -> dict[str, tuple[RootMotion, numpy.ndarray]]:
+    """Bakes all given animations with bake_skeletal_anims() and extracts
+    the root motion of each, keyed by animation name. See
+    extract_root_motion().
+    """
+    anims = list(anims)
+    baked = bake_skeletal_anims(anims, jobs)
+    return {anim.name: anim.extract_root_motion(root, baked=baked[anim.name],
+                                                vertical=vertical)
+            for anim in anims}
+
+
+def _bake_shared(shm_name, tasks):
+    """Worker entry point of bake_skeletal_anims, baking each task into its
+    region of the shared memory block.
+    """
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        for bone_anims, frames, offset, shape, conversion in tasks:
+            out = numpy.ndarray(shape, numpy.float32, shm.buf,
+                                offset * numpy.dtype(numpy.float32).itemsize)
+            _bake_bone_anims(bone_anims, frames, out, conversion)
+            del out
+    finally:
+        shm.close()
+
+
+def _bake_bone_anims(bone_anims, frames, out=None, conversion=None):
+    frames = numpy.asarray(frames, dtype=numpy.float32)
+    if (out is None):
+        out = numpy.empty((len(frames), len(bone_anims),
+                           BoneAnim.CHANNEL_COUNT), dtype=numpy.float32)
+    for i, bone_anim in enumerate(bone_anims):
+        bone_anim.bake(frames, out[:, i])
+    if (conversion is not None):
+        rotated = rotations.convert(out[..., 3:7], *conversion)
+        if (rotated.shape[-1] == 3):
+            out[..., 3:6] = rotated
+            out[..., 6] = 1
+        else:
+            out[..., 3:7] = rotated
+    return out
+
+
 class BoneAnim(core.ResData):
     """Represents the animation of a single Bone in a SkeletalAnim subfile."""
     _FLAGS_MASK_BASE = 0b00000000_00000000_00000000_00111000
     _FLAGS_MASK_CURVE = 0B00000000_00000000_11111111_11000000
     _FLAGS_MASK_TRANSFORM = 0b00001111_10000000_00000000_00000000
 
+    CHANNEL_COUNT = 10
+    """The number of values per baked frame: scale XYZ, rotation XYZW and
+    translation XYZ.
+    """
+    CURVE_CHANNELS = {
+        0x04: 0, 0x08: 1, 0x0C: 2,  # Scale
+        0x10: 7, 0x14: 8, 0x18: 9,  # Translate
+        0x20: 3, 0x24: 4, 0x28: 5, 0x2C: 6,  # Rotate
+    }
+    """The baked channel of each BoneAnimData field a curve can target, by
+    its anim_data_offset. The fields follow the flags in the order scale,
+    translate, padding and rotate.
+    """
+
+    __slots__ = ('name', '_flags', 'begin_rotate', 'begin_translate',
+                 'begin_base_translate', 'curves', 'base_data', 'begin_curve')
+
     def __init__(self):
         self.name = ""
         self._flags = 0
-        self.flags_base = 0
         self.begin_rotate = 0
         self.begin_translate = 0
         self.begin_base_translate = 0
@@ -224,39 +477,54 @@ class BoneAnim(core.ResData):
         """The SkeletalAnimFlags mode used
         to control looping and baked settings.
         """
-        return BoneAnimFlagsBase(
-            self._flags & self._FLAGS_MASK_BASE
-        )
+        return _BONE_ANIM_FLAGS_BASE[self._flags & self._FLAGS_MASK_BASE]
 
     @flags_base.setter
     def flags_base(self, value: BoneAnimFlagsBase):
-        self._flags &= ~self._FLAGS_MASK_BASE | value
+        self._flags = self._flags & ~self._FLAGS_MASK_BASE | int(value)
 
     @property
     def flags_curve(self) -> BoneAnimsFlagCurve:
         """The SkeletalAnimFlags mode used
         to control looping and baked settings.
         """
-        return BoneAnimsFlagCurve(
-            self._flags & self._FLAGS_MASK_CURVE
-        )
+        return _BONE_ANIM_FLAGS_CURVE[self._flags & self._FLAGS_MASK_CURVE]
 
     @flags_curve.setter
     def flags_curve(self, value: BoneAnimsFlagCurve):
-        self._flags &= ~self._FLAGS_MASK_CURVE | value
+        self._flags = self._flags & ~self._FLAGS_MASK_CURVE | int(value)
 
     @property
     def flags_transform(self) -> BoneAnimFlagsTransform:
         """The SkeletalAnimFlags mode used
         to control looping and baked settings.
         """
-        return BoneAnimFlagsTransform(
-            self._flags & self._FLAGS_MASK_TRANSFORM
-        )
+        return _BONE_ANIM_FLAGS_TRANSFORM[
+            self._flags & self._FLAGS_MASK_TRANSFORM]
 
     @flags_transform.setter
     def flags_transform(self, value: BoneAnimFlagsTransform):
-        self._flags &= ~self._FLAGS_MASK_TRANSFORM | value
+        self._flags = self._flags & ~self._FLAGS_MASK_TRANSFORM | int(value)
+
+    def bake(self, frames, out: numpy.ndarray | None = None):
+        """Evaluates the bone transformation at the given frames and returns
+        a float32 array of shape (frames, CHANNEL_COUNT), starting from the
+        base data and overwriting every channel animated by a curve.
+        """
+        frames = numpy.asarray(frames, dtype=numpy.float32)
+        if (out is None):
+            out = numpy.empty((len(frames), self.CHANNEL_COUNT),
+                              dtype=numpy.float32)
+        base = getattr(self, 'base_data', None)
+        if (base is None):
+            out[:] = (1, 1, 1, 0, 0, 0, 1, 0, 0, 0)
+        else:
+            out[:] = (*base.scale, *base.rotate, *base.translate)
+        for curve in self.curves:
+            channel = self.CURVE_CHANNELS.get(curve.anim_data_offset)
+            if (channel is not None):
+                out[:, channel] = curve.evaluate(frames)
+        return out
 
     def load(self, loader: core.ResFileLoader):
         if (loader.is_switch):
@@ -341,6 +609,11 @@ class BoneAnimFlagsTransform(IntFlag):
     IDENTITY = SCALE_ONE | ROTATE_ZERO | TRANSLATE_ZERO
 
 
+_BONE_ANIM_FLAGS_BASE = core.EnumTable(BoneAnimFlagsBase)
+_BONE_ANIM_FLAGS_CURVE = core.EnumTable(BoneAnimsFlagCurve)
+_BONE_ANIM_FLAGS_TRANSFORM = core.EnumTable(BoneAnimFlagsTransform)
+
+
 class BoneAnimData:
     """Represents the animatable data of a Bone instance."""
 
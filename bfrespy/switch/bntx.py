@@ -0,0 +1,577 @@
+from __future__ import annotations
+import copy
+import functools
+import io
+import os
+from enum import IntEnum
+from collections.abc import Iterable
+import numpy
+from .switchcore import ResFileSwitchLoader
+from .. import astc, bcn, bptc, core, common
+from ..binary_io import MemoryViewStream
+from ..texture import TextureShared
+from . import swizzle
+
+
+class SurfaceFormatType(IntEnum):
+    """Represents the data layout of a texture format, stored in the upper
+    byte of a BRTI format.
+    """
+    R8 = 0x02
+    R5_G6_B5 = 0x07
+    R8_G8 = 0x09
+    R8_G8_B8_A8 = 0x0B
+    B8_G8_R8_A8 = 0x0C
+    BC1 = 0x1A
+    BC2 = 0x1B
+    BC3 = 0x1C
+    BC4 = 0x1D
+    BC5 = 0x1E
+    BC6H = 0x1F
+    BC7 = 0x20
+    ASTC_4X4 = 0x2D
+    ASTC_5X4 = 0x2E
+    ASTC_5X5 = 0x2F
+    ASTC_6X5 = 0x30
+    ASTC_6X6 = 0x31
+    ASTC_8X5 = 0x32
+    ASTC_8X6 = 0x33
+    ASTC_8X8 = 0x34
+    ASTC_10X5 = 0x35
+    ASTC_10X6 = 0x36
+    ASTC_10X8 = 0x37
+    ASTC_10X10 = 0x38
+    ASTC_12X10 = 0x39
+    ASTC_12X12 = 0x3A
+
+
+class SurfaceFormatVariant(IntEnum):
+    """Represents how the channels of a texture format are interpreted,
+    stored in the lower byte of a BRTI format.
+    """
+    UNORM = 0x01
+    SNORM = 0x02
+    UINT = 0x03
+    SINT = 0x04
+    FLOAT = 0x05
+    SRGB = 0x06
+    UFLOAT = 0x0A
+
+
+_FORMAT_TYPES = core.EnumTable(SurfaceFormatType)
+_FORMAT_VARIANTS = core.EnumTable(SurfaceFormatVariant)
+
+# The width and height in texels and the size in bytes of a block of each
+# format type. Uncompressed formats use blocks of a single texel.
+_BLOCK_INFOS = {
+    SurfaceFormatType.R8: (1, 1, 1),
+    SurfaceFormatType.R5_G6_B5: (1, 1, 2),
+    SurfaceFormatType.R8_G8: (1, 1, 2),
+    SurfaceFormatType.R8_G8_B8_A8: (1, 1, 4),
+    SurfaceFormatType.B8_G8_R8_A8: (1, 1, 4),
+    SurfaceFormatType.BC1: (4, 4, 8),
+    SurfaceFormatType.BC2: (4, 4, 16),
+    SurfaceFormatType.BC3: (4, 4, 16),
+    SurfaceFormatType.BC4: (4, 4, 8),
+    SurfaceFormatType.BC5: (4, 4, 16),
+    SurfaceFormatType.BC6H: (4, 4, 16),
+    SurfaceFormatType.BC7: (4, 4, 16),
+    **{typ: (int(typ.name[5:].split('X')[0]),
+             int(typ.name[5:].split('X')[1]), 16)
+       for typ in SurfaceFormatType if (typ.name.startswith('ASTC'))},
+}
+
+
+def _decode_rgba8(blocks: numpy.ndarray) -> numpy.ndarray:
+    return blocks.reshape(blocks.shape[:2] + (4,))
+
+
+def _decode_bgra8(blocks: numpy.ndarray) -> numpy.ndarray:
+    return blocks.reshape(blocks.shape[:2] + (4,))[..., [2, 1, 0, 3]]
+
+
+def _formats(typ: SurfaceFormatType, *variants: SurfaceFormatVariant):
+    return [typ << 8 | variant for variant in variants]
+
+
+_UNORM_SRGB = (SurfaceFormatVariant.UNORM, SurfaceFormatVariant.SRGB)
+_DECODERS = {
+    **dict.fromkeys(_formats(SurfaceFormatType.R8_G8_B8_A8, *_UNORM_SRGB),
+                    _decode_rgba8),
+    **dict.fromkeys(_formats(SurfaceFormatType.B8_G8_R8_A8, *_UNORM_SRGB),
+                    _decode_bgra8),
+    **dict.fromkeys(_formats(SurfaceFormatType.BC1, *_UNORM_SRGB),
+                    bcn.decode_bc1),
+    **dict.fromkeys(_formats(SurfaceFormatType.BC2, *_UNORM_SRGB),
+                    bcn.decode_bc2),
+    **dict.fromkeys(_formats(SurfaceFormatType.BC3, *_UNORM_SRGB),
+                    bcn.decode_bc3),
+    **dict.fromkeys(_formats(SurfaceFormatType.BC4,
+                             SurfaceFormatVariant.UNORM), bcn.decode_bc4),
+    **dict.fromkeys(_formats(SurfaceFormatType.BC4,
+                             SurfaceFormatVariant.SNORM),
+                    functools.partial(bcn.decode_bc4, signed=True)),
+    **dict.fromkeys(_formats(SurfaceFormatType.BC5,
+                             SurfaceFormatVariant.UNORM), bcn.decode_bc5),
+    **dict.fromkeys(_formats(SurfaceFormatType.BC5,
+                             SurfaceFormatVariant.SNORM),
+                    functools.partial(bcn.decode_bc5, signed=True)),
+    **dict.fromkeys(_formats(SurfaceFormatType.BC6H,
+                             SurfaceFormatVariant.UFLOAT), bptc.decode_bc6h),
+    **dict.fromkeys(_formats(SurfaceFormatType.BC6H,
+                             SurfaceFormatVariant.FLOAT),
+                    functools.partial(bptc.decode_bc6h, signed=True)),
+    **dict.fromkeys(_formats(SurfaceFormatType.BC7, *_UNORM_SRGB),
+                    bptc.decode_bc7),
+    **{raw: functools.partial(astc.decode_astc,
+                              block_width=_BLOCK_INFOS[typ][0],
+                              block_height=_BLOCK_INFOS[typ][1])
+       for typ in SurfaceFormatType if (typ.name.startswith('ASTC'))
+       for raw in _formats(typ, *_UNORM_SRGB)},
+}
+"""The decoder of each supported raw format, taking the deswizzled blocks
+of an image and returning its RGBA texels.
+"""
+
+
+class BntxFile(core.ResData):
+    """Represents a BNTX texture container, which Switch files embed as an
+    ExternalFile.
+
+    Only the headers of the textures are read. The container keeps a view of
+    the data it was opened on, and the texture data is sliced from it only
+    when it is requested, without being copied.
+    """
+    _SIGNATURE = "BNTX"
+
+    def __init__(self, data: bytes | bytearray | memoryview):
+        """Initializes a new instance of the BntxFile class from the raw
+        data of the container, which is not copied.
+        """
+        self.name = ''
+        self.version = 0
+        self.version_major = 0
+        self.version_major2 = 0
+        self.alignment = 0
+        self.target_addr_size = 0
+        self.flags = 0
+        self.target_platform = ''
+        self.textures: common.ResDict[SwitchTexture] = common.ResDict()
+        self._data = memoryview(data).cast('B').toreadonly()
+
+        with ResFileSwitchLoader(self, MemoryViewStream(self._data)) \
+                as loader:
+            loader._execute()
+
+    def __repr__(self):
+        return "BntxFile{" + str(self.name) + "}"
+
+    def load(self, loader: ResFileSwitchLoader):
+        # File Header
+        loader._check_signature(self._SIGNATURE)
+        padding = loader.read_uint32()
+        self.version = loader.read_uint32()
+        self.version_major = self.version >> 24
+        self.version_major2 = self.version >> 16 & 0xFF
+        loader._read_byte_order()
+        self.alignment = loader.read_byte()
+        self.target_addr_size = loader.read_byte()
+        name_offs = loader.read_uint32()
+        self.flags = loader.read_uint16()
+        block_offs = loader.read_uint16()
+        relocation_table_offs = loader.read_uint32()
+        siz_file = loader.read_uint32()
+        if (name_offs != 0):
+            with loader.temporary_seek(name_offs, io.SEEK_SET):
+                self.name = loader.read_null_string()
+
+        # Texture Container
+        self.target_platform = loader.read_raw_string(4, 'ascii')
+        num_texture = loader.read_uint32()
+        info_array_offs = loader.read_offset()
+        data_block_offs = loader.read_offset()
+        dict_offs = loader.read_offset()
+        siz_string_dict = loader.read_uint32()
+
+        self.textures = common.ResDict()
+        if (dict_offs != 0):
+            with loader.temporary_seek(dict_offs, io.SEEK_SET):
+                self.textures.load(SwitchTexture, loader)
+        # The infos are referenced by an array of pointers to them.
+        with loader.temporary_seek(info_array_offs, io.SEEK_SET):
+            for i in range(num_texture):
+                texture = loader.load(SwitchTexture)
+                texture._data = self._data
+                if (i < len(self.textures)):
+                    self.textures[i] = texture
+                else:
+                    self.textures.append(texture.name, texture)
+
+
+class SwitchTexture(TextureShared):
+    """Represents a BRTI texture of a BntxFile.
+
+    The texture data stays in the container and get_swizzled_data() returns
+    views of it.
+    """
+    _SIGNATURE = "BRTI"
+
+    def __init__(self):
+        super().__init__()
+        self.flags = 0
+        self.dim = 0
+        self.tile_mode = 0
+        """The layout of the texture data, 0 being block linear and 1
+        being pitch linear.
+        """
+        self.swizzle = 0
+        self.sample_count = 1
+        self._format = 0
+        self.access_flags = 0
+        self.block_height_log2 = 0
+        """The base 2 logarithm of the number of GOBs stacked in a block of
+        the block linear layout.
+        """
+        self.image_size = 0
+        """The size of all mip levels and array layers in bytes."""
+        self.alignment = 0
+        self.channel_sources: tuple[int, int, int, int] = (2, 3, 4, 5)
+        """The sources of the red, green, blue and alpha channels."""
+        self.surface_dim = 0
+        self.mip_offsets: tuple[int, ...] = ()
+        """The offset of each mip level relative to the first one."""
+
+        self._data: memoryview | None = None
+        self._data_offs = 0
+
+    def __repr__(self):
+        return "SwitchTexture{" + str(self.name) + "}"
+
+    @property
+    def format(self) -> int:
+        """The raw format of the texture, see format_type and
+        format_variant.
+        """
+        return self._format
+
+    @format.setter
+    def format(self, value: int):
+        self._format = int(value)
+
+    @property
+    def format_type(self) -> SurfaceFormatType:
+        return _FORMAT_TYPES[self._format >> 8]
+
+    @property
+    def format_variant(self) -> SurfaceFormatVariant:
+        return _FORMAT_VARIANTS[self._format & 0xFF]
+
+    @property
+    def block_width(self) -> int:
+        return _BLOCK_INFOS[self.format_type][0]
+
+    @property
+    def block_height(self) -> int:
+        return _BLOCK_INFOS[self.format_type][1]
+
+    @property
+    def bytes_per_block(self) -> int:
+        return _BLOCK_INFOS[self.format_type][2]
+
+    def get_swizzled_data(self, arraylevel=None, miplevel=None) -> memoryview:
+        """Returns a view of the data of the mip level in the array layer as
+        it is stored, or of all data if no levels are given.
+        """
+        data = self._data[self._data_offs:self._data_offs + self.image_size]
+        if (arraylevel is None and miplevel is None):
+            return data
+        arraylevel = arraylevel or 0
+        miplevel = miplevel or 0
+        if (not 0 <= arraylevel < self.array_length):
+            raise IndexError(f"Array level {arraylevel} out of bounds in "
+                             f"{self}.")
+        if (not 0 <= miplevel < len(self.mip_offsets)):
+            raise IndexError(f"Mip level {miplevel} out of bounds in {self}.")
+        layer_size = self.image_size // self.array_length
+        start = self.mip_offsets[miplevel]
+        end = (self.mip_offsets[miplevel + 1]
+               if miplevel + 1 < len(self.mip_offsets) else layer_size)
+        layer_offs = arraylevel * layer_size
+        return data[layer_offs + start:layer_offs + end]
+
+    def get_deswizzled_data(self, arraylevel=0, miplevel=0) -> numpy.ndarray:
+        """Returns the data of the mip level in the array layer in row-major
+        order, as a (rows, columns, bytes_per_block) uint8 array of the
+        format's blocks.
+        """
+        return self._deswizzle(self.get_swizzled_data(arraylevel, miplevel),
+                               miplevel)
+
+    def get_decoded_data(self, arraylevel=0, miplevel=0) -> numpy.ndarray:
+        """Returns the mip level in the array layer as a (height, width, 4)
+        RGBA image, see bcn, bptc and astc for the value ranges.
+
+        If the textures have a cache, images found in it are returned as
+        read-only memory-mapped arrays.
+        """
+        return self._decode(self.get_swizzled_data(arraylevel, miplevel),
+                            miplevel)
+
+    def _get_decoder(self):
+        decoder = _DECODERS.get(self._format)
+        if (decoder is None):
+            raise NotImplementedError(
+                f"Decoding {self.format_type.name}_"
+                f"{self.format_variant.name} textures isn't supported yet")
+        return decoder
+
+    def _deswizzle(self, data, miplevel) -> numpy.ndarray:
+        """Deswizzles the stored data of a mip level, see
+        get_deswizzled_data().
+        """
+        width, height = self.get_mip_size(miplevel)
+        cols = (width + self.block_width - 1) // self.block_width
+        rows = (height + self.block_height - 1) // self.block_height
+        if (self.tile_mode == 1):
+            return swizzle.deswizzle_pitch_linear(
+                data, cols, rows, self.bytes_per_block)
+        return swizzle.deswizzle_block_linear(
+            data, cols, rows, self.bytes_per_block,
+            swizzle.mip_block_height_log2(rows, self.block_height_log2))
+
+    def _decode(self, data, miplevel) -> numpy.ndarray:
+        """Decodes the stored data of a mip level, see get_decoded_data()."""
+        decoder = self._get_decoder()
+        if (self.cache is not None):
+            # Everything the image depends on besides the data is hashed.
+            key = self.cache.make_key(
+                data, self._format, self.width, self.height, miplevel,
+                self.tile_mode, self.block_height_log2)
+            image = self.cache.get(key)
+            if (image is not None):
+                return image
+        width, height = self.get_mip_size(miplevel)
+        image = decoder(self._deswizzle(data, miplevel))[:height, :width]
+        if (self.cache is not None):
+            self.cache.put(key, image)
+        return image
+
+    def _detached(self) -> SwitchTexture:
+        """Returns a copy of the texture without its data and user data,
+        which is sent to worker processes along with the data of single
+        levels.
+        """
+        texture = copy.copy(self)
+        texture._data = None
+        texture.userdata = common.ResDict()
+        # Keep the cache of the class, which is not pickled.
+        texture.cache = self.cache
+        return texture
+
+    def export(self, base_path) -> str:
+        """Writes the texture in its GPU format without decoding it, see
+        texture_export.export_texture.
+        """
+        from .texture_export import export_texture
+        return export_texture(self, base_path)
+
+    def load(self, loader: ResFileSwitchLoader):
+        loader._check_signature(self._SIGNATURE)
+        loader.load_header_block()
+        self.flags = loader.read_byte()
+        self.dim = loader.read_byte()
+        self.tile_mode = loader.read_uint16()
+        self.swizzle = loader.read_uint16()
+        self.mipcount = loader.read_uint16()
+        self.sample_count = loader.read_uint16()
+        loader.seek(2)  # Padding
+        self._format = loader.read_uint32()
+        self.access_flags = loader.read_uint32()
+        self.width = loader.read_int32()
+        self.height = loader.read_int32()
+        self.depth = loader.read_int32()
+        self.array_length = loader.read_uint32()
+        texture_layout = loader.read_uint32()
+        self.block_height_log2 = texture_layout & 0x7
+        texture_layout2 = loader.read_uint32()
+        loader.seek(20)  # Reserved
+        self.image_size = loader.read_uint32()
+        self.alignment = loader.read_uint32()
+        self.channel_sources = tuple(loader.read_bytes(4))
+        self.surface_dim = loader.read_byte()
+        loader.seek(3)  # Padding
+        self.name = loader.load_string()
+        parent_offs = loader.read_offset()
+        mip_array_offs = loader.read_offset()
+        userdata_offs = loader.read_offset()
+        texture_offs = loader.read_offset()
+        texture_view_offs = loader.read_offset()
+        desc_slot_offs = loader.read_offset()
+        userdata_dict_offs = loader.read_offset()
+        self.userdata = loader.load_dict_values(
+            common.UserData, userdata_dict_offs, userdata_offs)
+
+        mip_offsets = loader.load_custom(
+            tuple, lambda: loader.read_uint64s(self.mipcount), mip_array_offs)
+        if (mip_offsets):
+            self._data_offs = mip_offsets[0]
+            self.mip_offsets = tuple(offs - mip_offsets[0]
+                                     for offs in mip_offsets)
+
+
+@functools.lru_cache(maxsize=None)
+def _decoded_dtype(raw_format) -> numpy.dtype:
+    """Returns the type of the texels a format decodes to, by decoding a
+    single block of zeros.
+    """
+    bytes_per_block = _BLOCK_INFOS[_FORMAT_TYPES[raw_format >> 8]][2]
+    return _DECODERS[raw_format](
+        numpy.zeros((1, 1, bytes_per_block), dtype=numpy.uint8)).dtype
+
+
+def _decoded_nbytes(texture: SwitchTexture, miplevel) -> int:
+    width, height = texture.get_mip_size(miplevel)
+    return width * height * 4 * _decoded_dtype(texture.format).itemsize
+
+
+def iter_decoded_textures(textures: Iterable[SwitchTexture],
+                          jobs: int | None = None, backend="thread",
+                          all_mips=True, memory_budget=256 << 20):
+    """Decodes the levels of the given textures in a pool of jobs workers
+    (one per CPU by default), and yields a (texture, arraylevel, miplevel,
+    image) tuple for each in the order they finish. Without all_mips, only
+    the base level of each array layer is decoded.
+
+    With the "thread" backend, the workers are threads, as the decoders
+    mostly run in NumPy without holding the GIL. With the "process" backend,
+    they are processes sharing a memory block with each level, which holds
+    its stored data and receives its image, so neither is pickled. Levels are only started while the
+    images being decoded fit into memory_budget bytes, so memory use stays
+    bounded however many textures there are.
+    """
+    if (backend not in ("thread", "process")):
+        raise ValueError(f"Unknown backend {backend!r}.")
+    textures = list(textures)
+    for texture in textures:
+        texture._get_decoder()
+    tasks = [(texture, arraylevel, miplevel)
+             for texture in textures
+             for arraylevel in range(texture.array_length)
+             for miplevel in range(texture.mipcount if (all_mips) else 1)]
+
+    if (jobs is None):
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(tasks))
+    if (jobs <= 1):
+        for texture, arraylevel, miplevel in tasks:
+            yield (texture, arraylevel, miplevel,
+                   texture.get_decoded_data(arraylevel, miplevel))
+        return
+
+    from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                    ThreadPoolExecutor, wait)
+    from multiprocessing import shared_memory
+    process = backend == "process"
+    executor = ProcessPoolExecutor if (process) else ThreadPoolExecutor
+    detached = {}
+    running = {}
+    budget = memory_budget
+    tasks.reverse()
+    with executor(max_workers=jobs) as pool:
+        try:
+            while (tasks or running):
+                # Start levels while there are few enough queued and their
+                # images fit into the budget, but always at least one.
+                while (tasks and len(running) < 2 * jobs):
+                    texture, arraylevel, miplevel = tasks[-1]
+                    nbytes = _decoded_nbytes(texture, miplevel)
+                    if (running and nbytes > budget):
+                        break
+                    tasks.pop()
+                    shm = None
+                    if (process):
+                        if (id(texture) not in detached):
+                            detached[id(texture)] = texture._detached()
+                        data = texture.get_swizzled_data(arraylevel,
+                                                         miplevel)
+                        # The stored data follows the space of the image.
+                        shm = shared_memory.SharedMemory(
+                            create=True, size=max(nbytes + len(data), 1))
+                        shm.buf[nbytes:nbytes + len(data)] = data
+                        future = pool.submit(_decode_shared, shm.name,
+                                             detached[id(texture)], nbytes,
+                                             len(data), miplevel)
+                    else:
+                        future = pool.submit(texture.get_decoded_data,
+                                             arraylevel, miplevel)
+                    running[future] = (texture, arraylevel, miplevel,
+                                       nbytes, shm)
+                    budget -= nbytes
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    texture, arraylevel, miplevel, nbytes, shm = \
+                        running.pop(future)
+                    budget += nbytes
+                    try:
+                        image = future.result()
+                        if (shm is not None):
+                            shape, dtype = image
+                            image = numpy.ndarray(shape, dtype,
+                                                  shm.buf).copy()
+                    finally:
+                        if (shm is not None):
+                            shm.close()
+                            shm.unlink()
+                    yield texture, arraylevel, miplevel, image
+        finally:
+            # Stop early on errors or when the caller stops iterating.
+            for future in running:
+                future.cancel()
+            wait(running)
+            for *_, shm in running.values():
+                if (shm is not None):
+                    shm.close()
+                    shm.unlink()
+
+
+def decode_textures(textures: Iterable[SwitchTexture],
+                    jobs: int | None = None, backend="thread", all_mips=True,
+                    memory_budget=256 << 20) -> list[list[numpy.ndarray]]:
+    """Decodes the given textures with iter_decoded_textures() and returns
+    the mip levels of each texture in the order they were given, each as a
+    (layers, height, width, 4) array of the images of all array layers.
+    """
+    textures = list(textures)
+    # Keyed by texture rather than by name, as names need not be unique.
+    results = {id(texture): {} for texture in textures}
+    for texture, arraylevel, miplevel, image in iter_decoded_textures(
+            textures, jobs, backend, all_mips, memory_budget):
+        levels = results[id(texture)]
+        if (miplevel not in levels):
+            levels[miplevel] = numpy.empty(
+                (texture.array_length,) + image.shape, dtype=image.dtype)
+        levels[miplevel][arraylevel] = image
+    return [[levels[miplevel] for miplevel in sorted(levels)]
+            for levels in (results[id(texture)] for texture in textures)]
+
+
+def _decode_shared(shm_name, texture: SwitchTexture, data_offs, data_size,
+                   miplevel):
+    """Worker entry point of iter_decoded_textures, decoding the stored data
+    of a level found at data_offs in the shared memory block into its start,
+    and returning the shape and type of the image.
+    """
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        # Copied out, as views of the block left in a traceback would keep
+        # it from being closed.
+        data = bytes(shm.buf[data_offs:data_offs + data_size])
+        image = texture._decode(data, miplevel)
+        out = numpy.ndarray(image.shape, image.dtype, shm.buf)
+        out[...] = image
+        del out
+    finally:
+        shm.close()
+    return image.shape, image.dtype.str
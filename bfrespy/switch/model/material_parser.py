@@ -8,7 +8,7 @@ class MaterialParser:
     @staticmethod
     def load(loader: ResFileSwitchLoader, mat: models.Material):
         if (loader.res_file.version_major2 >= 9):
-            mat.flags = models.MaterialFlags(loader.read_uint32())
+            mat.flags = loader.read_uint32()
         else:
             (loader.load_header_block())
 
@@ -33,7 +33,7 @@ class MaterialParser:
         sampler_slot_array_offs = loader.read_int64()
         tex_slot_array_offs = loader.read_int64()
         if (loader.res_file.version_major2 < 9):
-            mat.flags = models.MaterialFlags(loader.read_uint32())
+            mat.flags = loader.read_uint32()
         idx = loader.read_uint16()
         num_renderinfo = loader.read_uint16()
         num_tex_ref = loader.read_byte()
@@ -338,8 +338,7 @@ class MaterialParserV10:
             loader.seek(info.shader_assign.renderinfo_list_offs
                         + i * 16, io.SEEK_SET)
             renderinfo.name = loader.load_string()
-            renderinfo.type = models.material.RenderInfoType(
-                loader.read_byte())
+            renderinfo.type = loader.read_byte()
 
             # Counter table
             loader.seek(renderinfo_counter_table + i * 2, io.SEEK_SET)
@@ -366,8 +365,7 @@ class MaterialParserV10:
             pad0 = loader.read_uint64()  # padding
             param.name = loader.load_string()  # name offset
             param.data_offs = loader.read_uint16()  # padding
-            param.type = models.material.ShaderParamType(
-                loader.read_uint16())  # type
+            param.type = loader.read_uint16()  # type
             pad2 = loader.read_uint32()  # padding
 
             mat.shaderparams.append(param.name, param)
@@ -1,13 +1,13 @@
 import io
 from ..switchcore import ResFileSwitchLoader
-from ...models import Shape, ShapeFlags, Mesh, VertexBuffer, KeyShape
+from ...models import Shape, Mesh, VertexBuffer, KeyShape
 
 
 class ShapeParser:
     @staticmethod
     def read(loader: ResFileSwitchLoader, shape: Shape):
         if (loader.res_file.version_major2 >= 9):
-            shape.flags = ShapeFlags(loader.read_int32())
+            shape.flags = loader.read_int32()
         else:
             loader.load_header_block()
 
@@ -26,7 +26,7 @@ class ShapeParser:
             user_pointer = loader.read_int64()
             shape.radius_array.append(loader.read_single())
         if (loader.res_file.version_major2 < 9):
-            shape.flags = ShapeFlags(loader.read_int32())
+            shape.flags = loader.read_int32()
         idx = loader.read_uint16()
         shape.material_idx = loader.read_uint16()
         shape.bone_idx = loader.read_uint16()
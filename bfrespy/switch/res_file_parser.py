@@ -2,33 +2,31 @@ from __future__ import annotations
 import io
 from .switchcore import ResFileSwitchLoader
 from .memory_pool import MemoryPool, BufferInfo
-from .. import common, models, skeletal_anim
+from .bntx import BntxFile
+from .. import common, models, skeletal_anim, material_anim
+from .. import visibility_anim, shape_anim, scene_anim
 from .. import res_file as res
 from .. import external_file as ext
 
 
 class ResFileParser:
+    # Section dictionaries in the Bfres header, with the offset of their
+    # values and the size of each value before and since version 9.
+    _SECTIONS = {
+        'models': (models.Model, (0x28, 0x28), (0x78, 0x78)),
+        'skeletal_anims': (skeletal_anim.SkeletonAnim, (0x38, 0x58),
+                           (0x60, 0x50)),
+        'material_anims': (material_anim.MaterialAnim, (0x48, 0x68),
+                           (0x80, 0x70)),
+        'bone_visibility_anims': (visibility_anim.VisibilityAnim,
+                                  (0x58, 0x78), (0x68, 0x60)),
+        'shape_anims': (shape_anim.ShapeAnim, (0x68, 0x88), (0x60, 0x50)),
+        'scene_anims': (scene_anim.SceneAnim, (0x78, 0x98), (0x68, 0x68)),
+    }
+
     @staticmethod
     def load(loader: ResFileSwitchLoader, res_file: res.ResFile):
-        # File Header
-        loader._check_signature("FRES")
-        padding = loader.read_uint32()
-        res_file.version = loader.read_uint32()
-        res_file.set_version_info(res_file.version)
-        res_file.endianness = loader._read_byte_order()
-        res_file.alignment = loader.read_byte()
-        # Thanks MasterF0X for pointing out the layout of the these
-        res_file.target_addr_size = loader.read_byte()
-        offset_to_filename = loader.read_uint32()
-        res_file.flags = loader.read_uint16()
-        res_file.block_offs = loader.read_uint16()
-        relocation_table_offs = loader.read_uint32()
-        siz_file = loader.read_uint32()
-
-        # loader.load_relocation_table(relocation_table_offs)
-
-        # Bfres Header
-        res_file.name = loader.load_string()
+        siz_file = ResFileParser.load_header(loader, res_file)
         model_offs = loader.read_offset()
         model_dict_offs = loader.read_offset()
         if (loader.res_file.version_major2 >= 9):
@@ -36,15 +34,13 @@ class ResFileParser:
 
         res_file.skeletal_anims = loader.load_dict_values(
             skeletal_anim.SkeletonAnim)
-        # TODO Read These properly
-        res_file.material_anims = loader.read_offset()
-        res_file.material_anims = loader.read_offset()
-        res_file.bone_visibility_anims = loader.read_offset()
-        res_file.bone_visibility_anims = loader.read_offset()
-        res_file.shape_anims = loader.read_offset()
-        res_file.shape_anims = loader.read_offset()
-        res_file.scene_anims = loader.read_offset()
-        res_file.scene_anims = loader.read_offset()
+        res_file.material_anims = loader.load_dict_values(
+            material_anim.MaterialAnim)
+        ResFileParser._split_material_anims(res_file)
+        res_file.bone_visibility_anims = loader.load_dict_values(
+            visibility_anim.VisibilityAnim)
+        res_file.shape_anims = loader.load_dict_values(shape_anim.ShapeAnim)
+        res_file.scene_anims = loader.load_dict_values(scene_anim.SceneAnim)
 
         res_file.mempool = loader.load(MemoryPool)
         res_file.buffer_info = loader.load(BufferInfo)
@@ -62,10 +58,10 @@ class ResFileParser:
                 externalFileDict = loader.load_dict(common.ResString)
 
                 with (loader.temporary_seek(externalFileOffset, io.SEEK_SET)):
-                    common.stringcache.clear()
+                    res_file._string_cache.clear()
                     for string in externalFileDict.keys():
                         string_id = loader.read_int64()
-                        common.stringcache[string_id] = string
+                        res_file._string_cache[string_id] = string
                 return
 
             # GPU section for TOTK
@@ -113,37 +109,84 @@ class ResFileParser:
         if (reserve10 == 1 or res_file.external_flag != 0):
             res_file.data_alignment_override = 0x1000
 
-        # TODO External Files and material animations
-        """res_file.textures = ResDict()
-        for ext in res_file.external_files:
-            if (".bntx" in ext.key):
-                bntx = BntxFile(io.BytesIO(ext.value.data))
-                ext.Value.LoadedFileData = bntx
-                for tex in bntx.nx.textures:
-                    res_file.textures.append(
-                        tex.Name, SwitchTexture(bntx, tex))
-
-        res_file.tex_pattern_anims = ResDict(MaterialAnim)
-        res_file.mat_visibility_anims = ResDict(MaterialAnim)
-        res_file.shaderparam_anims = ResDict(MaterialAnim)
-        res_file.color_anims = ResDict(MaterialAnim)
-        res_file.tex_srt_anims = ResDict(MaterialAnim)
-
-        # Split material animations into shader, texture, and visual animation lists
-        for anim in res_file.material_anims.values:
-            if (anim.name.contains("_ftp")):
+        # Only the texture headers are read, their data stays in the file.
+        res_file.textures = common.ResDict()
+        for name, external_file in res_file.external_files.items():
+            if (name.endswith(".bntx")):
+                bntx = BntxFile(external_file.data)
+                external_file.loaded_file_data = bntx
+                for texture in bntx.textures:
+                    res_file.textures.append(texture.key, texture.value)
+
+    @staticmethod
+    def find(loader: ResFileSwitchLoader, section: str, name: str):
+        """Loads only the value stored under name in the given section
+        dictionary (like 'models'), or returns None if there is none.
+        """
+        typ, header_offs, sizes = ResFileParser._SECTIONS[section]
+        new = loader.res_file.version_major2 >= 9
+        loader.seek(header_offs[new], io.SEEK_SET)
+        values_offs = loader.read_offset()
+        dict_offs = loader.read_offset()
+        idx = common.ResDict.search(loader, name, dict_offs)
+        if (idx < 0):
+            return None
+        loader.seek(values_offs + idx * sizes[new], io.SEEK_SET)
+        return loader.load(typ, use_offset=False)
+
+    @staticmethod
+    def load_header(loader: ResFileSwitchLoader, res_file: res.ResFile):
+        """Reads the file header and the name of the file, and returns the
+        size of the file.
+        """
+        # File Header
+        loader._check_signature("FRES")
+        padding = loader.read_uint32()
+        res_file.version = loader.read_uint32()
+        res_file.set_version_info(res_file.version)
+        res_file.endianness = loader._read_byte_order()
+        res_file.alignment = loader.read_byte()
+        # Thanks MasterF0X for pointing out the layout of the these
+        res_file.target_addr_size = loader.read_byte()
+        offset_to_filename = loader.read_uint32()
+        res_file.flags = loader.read_uint16()
+        res_file.block_offs = loader.read_uint16()
+        relocation_table_offs = loader.read_uint32()
+        siz_file = loader.read_uint32()
+
+        # loader.load_relocation_table(relocation_table_offs)
+
+        # Bfres Header
+        res_file.name = loader.load_string()
+        return siz_file
+
+    @staticmethod
+    def _split_material_anims(res_file: res.ResFile):
+        """Splits the material animations into texture pattern, shader
+        parameter, color, texture SRT and visibility animation lists.
+        """
+        res_file.tex_pattern_anims = common.ResDict()
+        res_file.mat_visibility_anims = common.ResDict()
+        res_file.shaderparam_anims = common.ResDict()
+        res_file.color_anims = common.ResDict()
+        res_file.tex_srt_anims = common.ResDict()
+
+        for anim in res_file.material_anims.values():
+            if ("_ftp" in anim.name):
                 res_file.tex_pattern_anims.append(anim.name, anim)
-            elif (anim.name.contains("_fts")):
+            elif ("_fts" in anim.name):
                 res_file.shaderparam_anims.append(anim.name, anim)
-            elif (anim.name.contains("_fcl")):
+            elif ("_fcl" in anim.name):
                 res_file.color_anims.append(anim.name, anim)
-            elif (anim.name.contains("_fst")):
+            elif ("_fst" in anim.name):
                 res_file.tex_srt_anims.append(anim.name, anim)
-            elif (anim.name.contains("_fvt")):
+            elif ("_fvt" in anim.name):
                 res_file.mat_visibility_anims.append(anim.name, anim)
-            elif (anim.material_anim_data_list != None and anim.material_anim_data_list.any(x= > x.visibily_count > 0)):
+            # Use the header counts so unnamed kinds don't need the
+            # animation data to be loaded.
+            elif (anim.visibility_anim_cnt > 0):
                 res_file.mat_visibility_anims.append(anim.name, anim)
-            elif (anim.material_anim_data_list != None and anim.material_anim_data_list.any(x= > x.texture_pattern_count > 0)):
+            elif (anim.tex_pattern_anim_cnt > 0):
                 res_file.tex_pattern_anims.append(anim.name, anim)
             else:
-                res_file.shaderparam_anims.append(anim.name, anim)"""
+                res_file.shaderparam_anims.append(anim.name, anim)
@@ -1,5 +1,5 @@
 import io
-from .. import core, ResFile, common
+from .. import core, ResFile
 
 
 class ResFileSwitchLoader(core.ResFileLoader):
@@ -29,8 +29,8 @@ class ResFileSwitchLoader(core.ResFileLoader):
         offset = self.read_offset()
         if (offset == 0):
             return ''
-        if (offset in common.stringcache):
-            return common.stringcache[offset]
+        if (offset in self._string_cache):
+            return self._string_cache[offset]
         if (offset < 0):
             return ''
         with self.temporary_seek(offset, io.SEEK_SET) as reader:
@@ -41,16 +41,16 @@ class ResFileSwitchLoader(core.ResFileLoader):
 
     def load_strings(self, count, encoding=None) -> tuple[str, ...]:
         offsets = self.read_uint64s(count)
-        names = []
+        names = [''] * len(offsets)
         with self.temporary_seek():
             for i, offset in enumerate(offsets):
                 if (offset == 0):
-                    names.append(None)
-                if (offset in common.stringcache):
-                    names[i] = common.stringcache[offset]
+                    continue
+                if (offset in self._string_cache):
+                    names[i] = self._string_cache[offset]
                 else:
                     self.seek(offset, io.SEEK_SET)
-                    names.append(self.read_string(encoding))
+                    names[i] = self.read_string(encoding)
         return tuple(names)
 
     def read_string(self, encoding=None):
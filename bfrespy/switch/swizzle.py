@@ -0,0 +1,108 @@
+"""Deswizzles Switch (Tegra X1) texture data as NumPy index arithmetic.
+
+Block linear surfaces are made of GOBs (groups of bytes) of 64 bytes by 8
+rows, stacked 2 ** block_height_log2 GOBs high into blocks which are laid
+out in rows. Texels are addressed in units of format blocks, so a BC1
+surface of 64x64 texels is deswizzled as 16x16 elements of 8 bytes.
+"""
+from __future__ import annotations
+import functools
+import numpy
+
+_GOB_WIDTH = 64
+_GOB_HEIGHT = 8
+_GOB_SIZE = _GOB_WIDTH * _GOB_HEIGHT
+
+
+def _div_round_up(n, d) -> int:
+    return (n + d - 1) // d
+
+
+def _round_up(n, d) -> int:
+    return _div_round_up(n, d) * d
+
+
+def block_linear_size(width, height, bpp, block_height_log2) -> int:
+    """Returns the size in bytes of a block linear surface of width by height
+    elements of bpp bytes.
+    """
+    block_height = 1 << block_height_log2
+    return (_round_up(width * bpp, _GOB_WIDTH)
+            * _round_up(height, _GOB_HEIGHT * block_height))
+
+
+def mip_block_height_log2(height, block_height_log2) -> int:
+    """Returns the block height of a mip level of height elements, as mip
+    levels use smaller blocks than the base level once they fit into them.
+    """
+    while (block_height_log2 > 0
+           and height <= (1 << block_height_log2 - 1) * _GOB_HEIGHT):
+        block_height_log2 -= 1
+    return block_height_log2
+
+
+@functools.lru_cache(maxsize=32)
+def block_linear_indices(width, height, bpp,
+                         block_height_log2) -> numpy.ndarray:
+    """Returns a read-only (height, width) array holding the index of each
+    element in a block linear surface of elements of bpp bytes.
+
+    The maps are cached, as textures of a file often share their dimensions.
+    """
+    block_height = 1 << block_height_log2
+    gobs_per_row = _div_round_up(width * bpp, _GOB_WIDTH)
+    # The address is the sum of a part depending on the column and one
+    # depending on the row, so both are computed for a single line.
+    x = numpy.arange(width, dtype=numpy.int64) * bpp
+    x_addrs = ((x // _GOB_WIDTH) * _GOB_SIZE * block_height
+               + (x % 64 // 32) * 256 + (x % 32 // 16) * 32 + x % 16)
+    y = numpy.arange(height, dtype=numpy.int64)
+    y_addrs = ((y // (_GOB_HEIGHT * block_height))
+               * _GOB_SIZE * block_height * gobs_per_row
+               + (y % (_GOB_HEIGHT * block_height) // _GOB_HEIGHT) * _GOB_SIZE
+               + (y % 8 // 2) * 64 + (y % 2) * 16)
+    # Elements are at most 16 bytes and never straddle the 16 byte rows of a
+    # GOB, so every address is a multiple of bpp.
+    dtype = (numpy.int32
+             if (block_linear_size(width, height, bpp, block_height_log2)
+                 // bpp < 2 ** 31)
+             else numpy.int64)
+    indices = numpy.add.outer(y_addrs // bpp, x_addrs // bpp).astype(dtype)
+    indices.setflags(write=False)
+    return indices
+
+
+def _elements(data, size, bpp) -> numpy.ndarray:
+    """Returns the first size bytes of data as elements of bpp bytes, padding
+    them with zeros if data is too short.
+    """
+    data = numpy.frombuffer(data, dtype=numpy.uint8)
+    if (len(data) < size):
+        padded = numpy.zeros(size, dtype=numpy.uint8)
+        padded[:len(data)] = data
+        data = padded
+    return data[:size].view(numpy.dtype((numpy.void, bpp)))
+
+
+def deswizzle_block_linear(data, width, height, bpp,
+                           block_height_log2) -> numpy.ndarray:
+    """Returns the block linear data of width by height elements of bpp bytes
+    as a (height, width, bpp) uint8 array in row-major order.
+    """
+    size = block_linear_size(width, height, bpp, block_height_log2)
+    elements = _elements(data, size, bpp)
+    indices = block_linear_indices(width, height, bpp, block_height_log2)
+    return elements[indices].view(numpy.uint8).reshape(height, width, bpp)
+
+
+def deswizzle_pitch_linear(data, width, height, bpp,
+                           pitch=None) -> numpy.ndarray:
+    """Returns the pitch linear data of width by height elements of bpp bytes
+    as a (height, width, bpp) uint8 array. Rows are pitch bytes apart, by
+    default the row size rounded up to 32 bytes.
+    """
+    if (pitch is None):
+        pitch = _round_up(width * bpp, 32)
+    rows = _elements(data, pitch * height, 1).view(numpy.uint8)
+    return (rows.reshape(height, pitch)[:, :width * bpp]
+            .reshape(height, width, bpp).copy())
@@ -0,0 +1,188 @@
+"""Exports Switch textures in their GPU format, without decoding them.
+
+Block compressed and uncompressed textures are written as DDS files with a
+DX10 header, ASTC textures as KTX2 files. The data of each mip level of each
+array layer is deswizzled and written on its own, so only one level is held
+in memory at a time.
+"""
+from __future__ import annotations
+import os
+import struct
+from typing import BinaryIO
+from .bntx import (SurfaceFormatType, SurfaceFormatVariant, SwitchTexture,
+                   _formats, _UNORM_SRGB)
+
+_DXGI_FORMATS = {
+    **dict(zip(_formats(SurfaceFormatType.R8, SurfaceFormatVariant.UNORM,
+                        SurfaceFormatVariant.SNORM), (61, 63))),
+    **dict(zip(_formats(SurfaceFormatType.R8_G8, SurfaceFormatVariant.UNORM,
+                        SurfaceFormatVariant.SNORM), (49, 51))),
+    **dict(zip(_formats(SurfaceFormatType.R8_G8_B8_A8, *_UNORM_SRGB),
+               (28, 29))),
+    **dict(zip(_formats(SurfaceFormatType.B8_G8_R8_A8, *_UNORM_SRGB),
+               (87, 91))),
+    **dict(zip(_formats(SurfaceFormatType.BC1, *_UNORM_SRGB), (71, 72))),
+    **dict(zip(_formats(SurfaceFormatType.BC2, *_UNORM_SRGB), (74, 75))),
+    **dict(zip(_formats(SurfaceFormatType.BC3, *_UNORM_SRGB), (77, 78))),
+    **dict(zip(_formats(SurfaceFormatType.BC4, SurfaceFormatVariant.UNORM,
+                        SurfaceFormatVariant.SNORM), (80, 81))),
+    **dict(zip(_formats(SurfaceFormatType.BC5, SurfaceFormatVariant.UNORM,
+                        SurfaceFormatVariant.SNORM), (83, 84))),
+    **dict(zip(_formats(SurfaceFormatType.BC6H, SurfaceFormatVariant.UFLOAT,
+                        SurfaceFormatVariant.FLOAT), (95, 96))),
+    **dict(zip(_formats(SurfaceFormatType.BC7, *_UNORM_SRGB), (98, 99))),
+}
+"""The DXGI_FORMAT of each raw format which can be written to DDS."""
+
+_ASTC_TYPES = [typ for typ in SurfaceFormatType
+               if (typ.name.startswith('ASTC'))]
+# The Vulkan formats of the footprints follow each other in the same order,
+# UNORM first.
+_VK_FORMATS = {
+    raw: 157 + 2 * i + srgb
+    for i, typ in enumerate(_ASTC_TYPES)
+    for srgb, raw in enumerate(_formats(typ, *_UNORM_SRGB))
+}
+"""The VkFormat of each raw ASTC format."""
+
+# DDS header flags.
+_DDSD_CAPS = 0x1
+_DDSD_HEIGHT = 0x2
+_DDSD_WIDTH = 0x4
+_DDSD_PITCH = 0x8
+_DDSD_PIXELFORMAT = 0x1000
+_DDSD_MIPMAPCOUNT = 0x20000
+_DDSD_LINEARSIZE = 0x80000
+_DDPF_FOURCC = 0x4
+_DDSCAPS_COMPLEX = 0x8
+_DDSCAPS_TEXTURE = 0x1000
+_DDSCAPS_MIPMAP = 0x400000
+_D3D10_RESOURCE_DIMENSION_TEXTURE2D = 3
+
+_KTX2_IDENTIFIER = b'\xABKTX 20\xBB\r\n\x1A\n'
+_KTX2_HEADER_SIZE = 80
+_KTX2_LEVEL_SIZE = 24
+_KHR_DF_MODEL_ASTC = 162
+_KHR_DF_PRIMARIES_BT709 = 1
+_KHR_DF_TRANSFER_LINEAR = 1
+_KHR_DF_TRANSFER_SRGB = 2
+
+
+def _level_size(texture: SwitchTexture, miplevel) -> int:
+    """Returns the size in bytes of the blocks of one layer of a mip level."""
+    width, height = texture.get_mip_size(miplevel)
+    cols = (width + texture.block_width - 1) // texture.block_width
+    rows = (height + texture.block_height - 1) // texture.block_height
+    return rows * cols * texture.bytes_per_block
+
+
+def _unsupported(texture: SwitchTexture, container):
+    return NotImplementedError(
+        f"Exporting {texture.format_type.name}_"
+        f"{texture.format_variant.name} textures to {container} isn't "
+        f"supported yet")
+
+
+def write_dds(texture: SwitchTexture, f: BinaryIO):
+    """Writes the texture with all mip levels and array layers to the
+    binary stream as a DDS file.
+    """
+    dxgi_format = _DXGI_FORMATS.get(texture.format)
+    if (dxgi_format is None):
+        raise _unsupported(texture, "DDS")
+    flags = _DDSD_CAPS | _DDSD_HEIGHT | _DDSD_WIDTH | _DDSD_PIXELFORMAT
+    # Uncompressed formats give the size of a row, compressed ones the size
+    # of the first level.
+    if (texture.block_width == 1):
+        flags |= _DDSD_PITCH
+        pitch = texture.width * texture.bytes_per_block
+    else:
+        flags |= _DDSD_LINEARSIZE
+        pitch = _level_size(texture, 0)
+    caps = _DDSCAPS_TEXTURE
+    if (texture.mipcount > 1):
+        flags |= _DDSD_MIPMAPCOUNT
+        caps |= _DDSCAPS_COMPLEX | _DDSCAPS_MIPMAP
+    f.write(b'DDS ')
+    f.write(struct.pack('<7I44x', 124, flags, texture.height, texture.width,
+                        pitch, 0, texture.mipcount))
+    # The pixel format only refers to the DX10 header.
+    f.write(struct.pack('<2I4s20x', 32, _DDPF_FOURCC, b'DX10'))
+    f.write(struct.pack('<4I4x', caps, 0, 0, 0))
+    f.write(struct.pack('<5I', dxgi_format,
+                        _D3D10_RESOURCE_DIMENSION_TEXTURE2D, 0,
+                        texture.array_length, 0))
+    # Each layer holds its whole mip chain.
+    for arraylevel in range(texture.array_length):
+        for miplevel in range(texture.mipcount):
+            f.write(texture.get_deswizzled_data(arraylevel, miplevel).data)
+
+
+def _astc_dfd(texture: SwitchTexture) -> bytes:
+    """Returns the data format descriptor of an ASTC texture, a basic
+    descriptor block with a single sample covering the whole block.
+    """
+    srgb = texture.format_variant == SurfaceFormatVariant.SRGB
+    transfer = _KHR_DF_TRANSFER_SRGB if (srgb) else _KHR_DF_TRANSFER_LINEAR
+    block = struct.pack(
+        '<2I4B4B8B', 0, 2 | 40 << 16,
+        _KHR_DF_MODEL_ASTC, _KHR_DF_PRIMARIES_BT709, transfer, 0,
+        texture.block_width - 1, texture.block_height - 1, 0, 0,
+        16, 0, 0, 0, 0, 0, 0, 0)
+    sample = struct.pack('<4I', 127 << 16, 0, 0, 0xFFFFFFFF)
+    return struct.pack('<I', 4 + len(block) + len(sample)) + block + sample
+
+
+def write_ktx2(texture: SwitchTexture, f: BinaryIO):
+    """Writes the ASTC texture with all mip levels and array layers to the
+    binary stream as a KTX2 file.
+    """
+    vk_format = _VK_FORMATS.get(texture.format)
+    if (vk_format is None):
+        raise _unsupported(texture, "KTX2")
+    dfd = _astc_dfd(texture)
+    dfd_offs = _KTX2_HEADER_SIZE + _KTX2_LEVEL_SIZE * texture.mipcount
+    # Levels are stored from the smallest one, each starting at a multiple
+    # of the block size.
+    level_sizes = [_level_size(texture, miplevel) * texture.array_length
+                   for miplevel in range(texture.mipcount)]
+    level_offsets = {}
+    offs = dfd_offs + len(dfd)
+    for miplevel in reversed(range(texture.mipcount)):
+        offs += -offs % texture.bytes_per_block
+        level_offsets[miplevel] = offs
+        offs += level_sizes[miplevel]
+
+    f.write(_KTX2_IDENTIFIER)
+    f.write(struct.pack(
+        '<9I', vk_format, 1, texture.width, texture.height, 0,
+        texture.array_length if (texture.array_length > 1) else 0, 1,
+        texture.mipcount, 0))
+    f.write(struct.pack('<4I2Q', dfd_offs, len(dfd), 0, 0, 0, 0))
+    for miplevel in range(texture.mipcount):
+        f.write(struct.pack('<3Q', level_offsets[miplevel],
+                            level_sizes[miplevel], level_sizes[miplevel]))
+    f.write(dfd)
+    pos = dfd_offs + len(dfd)
+    for miplevel in reversed(range(texture.mipcount)):
+        f.write(bytes(level_offsets[miplevel] - pos))
+        for arraylevel in range(texture.array_length):
+            f.write(texture.get_deswizzled_data(arraylevel, miplevel).data)
+        pos = level_offsets[miplevel] + level_sizes[miplevel]
+
+
+def export_texture(texture: SwitchTexture, base_path) -> str:
+    """Writes the texture to a KTX2 file if it is ASTC compressed, or to a
+    DDS file otherwise, and returns the path of the file, which is base_path
+    with the extension of the container appended.
+    """
+    if (texture.format in _VK_FORMATS):
+        write, extension = write_ktx2, '.ktx2'
+    elif (texture.format in _DXGI_FORMATS):
+        write, extension = write_dds, '.dds'
+    else:
+        raise _unsupported(texture, "DDS or KTX2")
+    path = os.fspath(base_path) + extension
+    with open(path, 'wb') as f:
+        write(texture, f)
+    return path
@@ -1,20 +1,30 @@
+from __future__ import annotations
 from . import core
+from . import common
+
+from typing import TYPE_CHECKING
+if (TYPE_CHECKING):
+    from .texture_cache import TextureCache
 
 
 class TextureShared(core.ResData):
-    """Represents an FMDL subfile in a ResFile storing multi-dimensional 
+    """Represents a texture stored in a ResFile, holding multi-dimensional
     texture data.
     """
+    cache: TextureCache | None = None
+    """The cache get_decoded_data() reads decoded images from and stores
+    them in, shared by all textures unless set on a single one.
+    """
 
     def __init__(self):
-        self.name: str
-        self.path: str
-        self.width: int
-        self.height: int
-        self.depth: int
-        self.mipcount: int
-        self.array_length: int
-        self.userdata: 'UserData'
+        self.name = ''
+        self.path = ''
+        self.width = 0
+        self.height = 0
+        self.depth = 1
+        self.mipcount = 1
+        self.array_length = 1
+        self.userdata: common.ResDict[common.UserData] = common.ResDict()
 
     def __repr__(self):
         return "TextureShared{" + str(self.name) + "}"
@@ -22,5 +32,37 @@ class TextureShared(core.ResData):
     def get_swizzled_data(self, arraylevel=None, miplevel=None):
         return None
 
-    def load(self, loader: core.ResData):
+    def get_deswizzled_data(self, arraylevel=0, miplevel=0):
+        return None
+
+    def get_decoded_data(self, arraylevel=0, miplevel=0):
+        return None
+
+    def get_mip_size(self, miplevel) -> tuple[int, int]:
+        """Returns the width and height in texels of the mip level."""
+        return max(1, self.width >> miplevel), max(1, self.height >> miplevel)
+
+    def get_thumbnail_miplevel(self, size=128) -> int:
+        """Returns the smallest mip level whose longer side is still at
+        least size texels, or the base level if the texture is smaller.
+        """
+        miplevel = 0
+        while (miplevel + 1 < self.mipcount
+               and max(self.get_mip_size(miplevel + 1)) >= size):
+            miplevel += 1
+        return miplevel
+
+    def decode(self, mip=0, layer=0):
+        """Returns the mip level of the array layer as an RGBA image. Only
+        the data of that level is deswizzled and decoded.
+        """
+        return self.get_decoded_data(layer, mip)
+
+    def decode_thumbnail(self, size=128, layer=0):
+        """Returns the array layer decoded at the smallest mip level which
+        is still at least size texels on its longer side, for previews.
+        """
+        return self.decode(self.get_thumbnail_miplevel(size), layer)
+
+    def load(self, loader: core.ResFileLoader):
         pass
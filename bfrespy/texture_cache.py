@@ -0,0 +1,152 @@
+"""Caches decoded texture images on disk, keyed by a hash of their raw data.
+
+Images are stored as .npy files named after their key, so they are read
+back memory-mapped instead of being decoded again. Reading an image updates
+the modification time of its file, and once the files exceed the size limit
+of the cache, the least recently used ones are removed. Files are written
+under a temporary name and then renamed, so several processes can share a
+cache directory.
+"""
+from __future__ import annotations
+import hashlib
+import os
+import tempfile
+import threading
+import numpy
+
+_SUFFIX = '.npy'
+
+
+class TextureCache:
+    """Represents a directory of decoded texture images."""
+
+    def __init__(self, directory, max_size=1 << 30):
+        """Initializes a new instance of the TextureCache class storing at
+        most max_size bytes of images in directory, which is created if it
+        does not exist.
+        """
+        self.directory = os.fspath(directory)
+        self.max_size = max_size
+        self._size: int | None = None
+        self._lock = threading.RLock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def __repr__(self):
+        return "TextureCache{" + self.directory + "}"
+
+    def __getstate__(self):
+        # Worker processes get their own lock and count the size again.
+        state = self.__dict__.copy()
+        del state['_lock']
+        state['_size'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def make_key(data, *params) -> str:
+        """Returns the key of the image decoded from the raw data with the
+        parameters, like its format, dimensions and mip level.
+        """
+        digest = hashlib.blake2b(repr(params).encode(), digest_size=20)
+        digest.update(data)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> numpy.ndarray | None:
+        """Returns a read-only memory-mapped view of the image stored under
+        key, or None if there is none.
+        """
+        path = self._path(key)
+        try:
+            image = numpy.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            # Missing, evicted by another process or incompletely written.
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            # Evicted since, or the directory is read-only. The image is
+            # still mapped, so this remains a hit.
+            pass
+        return image
+
+    def put(self, key: str, image: numpy.ndarray):
+        """Stores the image under key, and removes the least recently used
+        images if the cache grows too large. Images larger than the cache
+        are not stored.
+        """
+        image = numpy.ascontiguousarray(image)
+        if (image.nbytes > self.max_size):
+            return
+        path = self._path(key)
+        # Every writer gets its own temporary file, as threads and processes
+        # may store the same image at once.
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                numpy.save(f, image)
+            new_size = os.path.getsize(temp_path)
+            try:
+                old_size = os.path.getsize(path)
+            except OSError:
+                old_size = 0
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+        # Threads share the running size, other processes are only noticed
+        # when evicting.
+        with self._lock:
+            if (self._size is None):
+                self._size = sum(size for _, _, size in self._entries())
+            else:
+                self._size += new_size - old_size
+            if (self._size > self.max_size):
+                self.evict()
+
+    def evict(self, max_size=None):
+        """Removes the least recently used images until the cache holds at
+        most max_size bytes, by default its size limit.
+        """
+        if (max_size is None):
+            max_size = self.max_size
+        with self._lock:
+            entries = sorted(self._entries())
+            size = sum(size for _, _, size in entries)
+            for _, path, entry_size in entries:
+                if (size <= max_size):
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    # Removed by another process, or still mapped on Windows.
+                    continue
+                size -= entry_size
+            self._size = size
+
+    def clear(self):
+        """Removes all images of the cache."""
+        self.evict(0)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def _entries(self):
+        """Returns the modification time, path and size of each image."""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if (not entry.name.endswith(_SUFFIX)):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, entry.path, stat.st_size))
+        return entries
@@ -0,0 +1,169 @@
+from __future__ import annotations
+from enum import IntFlag
+import numpy
+from . import core
+from . import common
+from . import models
+
+from typing import TYPE_CHECKING
+if (TYPE_CHECKING):
+    from .res_file import ResFile
+
+
+class VisibilityAnim(core.ResData):
+    """Represents an FVIS subfile in a ResFile, storing animations toggling
+    the visibility of Bone or Material instances.
+
+    Only the header, names and base values are read with the file. The
+    curves are loaded the first time they are accessed.
+    """
+    _SIGNATURE = "FVIS"
+    _FLAGS_MASK_TYPE = 0b00000001_00000000
+
+    class VisibilityAnimFlags(IntFlag):
+        BAKED_CURVE = 1 << 0
+        """The stored curve data has been baked."""
+
+        LOOPING = 1 << 2
+        """The animation repeats from the start after
+        the last frame has been played.
+        """
+
+    class VisibilityAnimType(IntFlag):
+        BONE = 0
+        """Bone visibility is animated."""
+
+        MATERIAL = 1 << 8
+        """Material visibility is animated."""
+
+    def __init__(self):
+        self._flags = 0
+        self.name = ''
+        self.path = ''
+        self.frame_cnt = 0
+        self.baked_size = 0
+        self.bind_model = models.Model()
+        self.bind_idxs: tuple[int, ...] = ()
+        self.names: tuple[str, ...] = ()
+        """The names of the animated Bone or Material instances."""
+        self.base_data = numpy.empty(0, dtype=numpy.bool_)
+        """The visibility of each animated instance when no curve
+        overrides it.
+        """
+        self.userdata = common.ResDict()
+
+        self._res_file: ResFile | None = None
+        self._curve_offs = 0
+        self._curve_cnt = 0
+        self._curves: list[common.AnimCurve] | None = []
+
+    def __repr__(self):
+        return "VisibilityAnim{" + str(self.name) + "}"
+
+    @property
+    def flags(self) -> VisibilityAnimFlags:
+        return self.VisibilityAnimFlags(self._flags & ~self._FLAGS_MASK_TYPE)
+
+    @flags.setter
+    def flags(self, value: VisibilityAnimFlags):
+        self._flags = self._flags & self._FLAGS_MASK_TYPE | int(value)
+
+    @property
+    def type(self) -> VisibilityAnimType:
+        return self.VisibilityAnimType(self._flags & self._FLAGS_MASK_TYPE)
+
+    @type.setter
+    def type(self, value: VisibilityAnimType):
+        self._flags = self._flags & ~self._FLAGS_MASK_TYPE | int(value)
+
+    @property
+    def curves(self) -> list[common.AnimCurve]:
+        """The STEP_BOOL curves animating the visibility, each targeting the
+        instance at the index stored in its anim_data_offset. Loaded from the
+        file on first access.
+        """
+        if (self._curves is None):
+            self._curves = self._res_file.load_deferred(
+                lambda loader: loader.load_list(
+                    common.AnimCurve, self._curve_cnt, self._curve_offs)
+            )
+        return self._curves
+
+    @curves.setter
+    def curves(self, value: list[common.AnimCurve]):
+        self._curves = value
+
+    @property
+    def baked_frames(self) -> numpy.ndarray:
+        """The frames evaluate samples by default, one per whole frame
+        including the last one.
+        """
+        return numpy.arange(self.frame_cnt + 1, dtype=numpy.float32)
+
+    def evaluate(self, frames=None, packed=True) -> numpy.ndarray:
+        """Returns the visibility of each animated instance at the given
+        frames as a bitset of shape (frames, len(names)).
+
+        When packed, the bits of each frame are packed into a uint8 array of
+        shape (frames, ceil(len(names) / 8)), the instance at index i being
+        bit i % 8 of byte i // 8. Otherwise a bool array is returned.
+        """
+        frames = self.baked_frames if frames is None else frames
+        frames = numpy.asarray(frames, dtype=numpy.float32)
+        bits = numpy.empty((len(frames), len(self.names)), dtype=numpy.bool_)
+        bits[:] = self.base_data[:len(self.names)]
+        for curve in self.curves:
+            bits[:, curve.anim_data_offset] = curve.evaluate(frames) != 0
+        if (not packed):
+            return bits
+        return numpy.packbits(bits, axis=1, bitorder='little')
+
+    def load(self, loader: core.ResFileLoader):
+        loader._check_signature(self._SIGNATURE)
+        if (loader.is_switch):
+            if (loader.res_file.version_major2 >= 9):
+                self._flags = loader.read_uint32()
+            else:
+                loader.load_header_block()
+
+            self.name = loader.load_string()
+            self.path = loader.load_string()
+            self.bind_model = loader.load(models.Model)
+            bind_idx_array = loader.read_offset()
+            self._curve_offs = loader.read_offset()
+            base_data_offs = loader.read_offset()
+            names_offs = loader.read_offset()
+            self.userdata = loader.load_dict_values(common.UserData)
+            if (loader.res_file.version_major2 < 9):
+                self._flags = loader.read_uint16()
+            num_userdata = loader.read_uint16()
+            if (loader.res_file.version_major2 >= 9):
+                loader.read_uint16()  # Padding
+            self.frame_cnt = loader.read_int32()
+            num_anim = loader.read_uint16()
+            self._curve_cnt = loader.read_uint16()
+            self.baked_size = loader.read_uint32()
+
+            self.bind_idxs = loader.load_custom(
+                tuple, lambda: loader.read_uint16s(num_anim), bind_idx_array
+            )
+            self.names = loader.load_custom(
+                tuple, lambda: loader.load_strings(num_anim), names_offs
+            )
+
+            # The base values are packed into 32-bit words, lowest bit first.
+            def loadbasedata():
+                words = loader.read_array(numpy.uint32, -(-num_anim // 32))
+                return numpy.unpackbits(
+                    words.astype('<u4').view(numpy.uint8), bitorder='little'
+                )[:num_anim].astype(numpy.bool_)
+            self.base_data = (
+                loader.load_custom(tuple, loadbasedata, base_data_offs)
+                if base_data_offs != 0
+                else numpy.zeros(num_anim, dtype=numpy.bool_))
+
+            self._res_file = loader.res_file
+            self._curves = None
+        else:
+            raise NotImplementedError(
+                "Sorry, WiiU visibility animations aren't supported yet")
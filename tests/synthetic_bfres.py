@@ -0,0 +1,157 @@
+"""Writes minimal version 9 Switch Bfres and BNTX files for the tests."""
+import io
+import struct
+
+from bfrespy import ResFile
+from bfrespy.switch import swizzle
+from bfrespy.switch.bntx import _BLOCK_INFOS, _FORMAT_TYPES
+
+HEADER_SIZE = 0x100
+
+
+def _bit(data: bytes, reference: int) -> int:
+    # Bits are counted from the lowest bit of the last character.
+    char_idx = reference >> 3
+    if (reference < 0 or char_idx >= len(data)):
+        return 0
+    return (data[-1 - char_idx] >> (reference & 7)) & 1
+
+
+def patricia_nodes(keys) -> list[tuple[int, int, int]]:
+    """Returns the (reference, left, right) links of the root node and of a
+    node for each of the keys, forming the Patricia trie of a ResDict.
+    """
+    datas = [b''] + [key.encode('utf-8') for key in keys]
+    nodes = [[-1, 0, 0]]
+
+    def child(idx, data):
+        return nodes[idx][2 if _bit(data, nodes[idx][0]) else 1]
+
+    for new, data in enumerate(datas[1:], 1):
+        # Find the closest key stored so far and the first bit differing.
+        parent, idx = 0, nodes[0][1]
+        while (nodes[parent][0] < nodes[idx][0]):
+            parent, idx = idx, child(idx, data)
+        closest = datas[idx]
+        reference = next(
+            bit for bit in range(max(len(data), len(closest)) * 8)
+            if _bit(data, bit) != _bit(closest, bit))
+
+        # Insert the new node above the first one testing a later bit.
+        parent, idx = 0, nodes[0][1]
+        while (nodes[parent][0] < nodes[idx][0] < reference):
+            parent, idx = idx, child(idx, data)
+        nodes.append([reference, idx, new] if _bit(data, reference)
+                     else [reference, new, idx])
+        if (parent == 0 or not _bit(data, nodes[parent][0])):
+            nodes[parent][1] = new
+        else:
+            nodes[parent][2] = new
+    return [tuple(node) for node in nodes]
+
+
+class BfresWriter:
+    """Appends structures to a version 9 Bfres with otherwise empty header.
+    Every add method returns the absolute offset of what it wrote, which is
+    how Switch files reference data.
+    """
+
+    def __init__(self):
+        self.data = bytearray(HEADER_SIZE)
+        struct.pack_into('<4sII', self.data, 0, b'FRES', 0x20202020,
+                         0x00090000)
+        self.data[12:14] = b'\xFF\xFE'
+        self._strings: dict[str, int] = {}
+
+    def add(self, fmt: str, *values, align=8) -> int:
+        """Packs the values little endian and appends them."""
+        return self.add_bytes(struct.pack('<' + fmt, *values), align)
+
+    def add_bytes(self, data: bytes, align=8) -> int:
+        self.data += bytes(-len(self.data) % align)
+        offset = len(self.data)
+        self.data += data
+        return offset
+
+    def string(self, value: str) -> int:
+        """Appends a string once and returns its offset."""
+        if (value not in self._strings):
+            data = value.encode('utf-8')
+            self._strings[value] = self.add_bytes(
+                struct.pack('<H', len(data)) + data + b'\0', align=2)
+        return self._strings[value]
+
+    def strings(self, values) -> int:
+        """Appends an array of offsets to the given strings."""
+        offsets = [self.string(value) for value in values]
+        return self.add(f'{len(offsets)}Q', *offsets)
+
+    def res_dict(self, keys) -> int:
+        """Appends a ResDict of the keys with a real Patricia trie."""
+        nodes = patricia_nodes(keys)
+        names = [0] + [self.string(key) for key in keys]
+        data = struct.pack('<II', 0, len(keys))
+        for (reference, left, right), name in zip(nodes, names):
+            data += struct.pack('<IHHQ', reference & 0xFFFFFFFF, left, right,
+                                name)
+        return self.add_bytes(data)
+
+    def section(self, header_offs: int, values_offs: int, keys):
+        """Points the section dictionary at header_offs to the values and a
+        dictionary of the keys.
+        """
+        struct.pack_into('<QQ', self.data, header_offs, values_offs,
+                         self.res_dict(keys))
+
+    def res_file(self, lazy=False) -> ResFile:
+        return ResFile(io.BytesIO(bytes(self.data)), lazy)
+
+
+def curve(writer: BfresWriter, flags: int, anim_data_offset: int, frames,
+          keys, key_fmt='f', scale=0.0, offs=0.0) -> bytes:
+    """Writes the frames and keys of an AnimCurve and returns the packed
+    curve, to be placed in an array.
+    """
+    frames_offs = writer.add(f'{len(frames)}f', *frames)
+    keys_offs = writer.add(f'{len(keys)}{key_fmt}', *keys)
+    return struct.pack('<QQHHI5fi', frames_offs, keys_offs, flags,
+                       len(frames), anim_data_offset, frames[0], frames[-1],
+                       scale, offs, 0, 0)
+
+
+def bntx(textures) -> bytes:
+    """Returns a BNTX container of the given (name, width, height, format,
+    mip_count, array_length, block_height_log2, data) textures, which are
+    stored block linear with their mip levels following each other.
+    """
+    writer = BfresWriter()
+    infos = []
+    for (name, width, height, format_, mip_cnt, array_length,
+         block_height_log2, data) in textures:
+        block_width, block_height, bpp = _BLOCK_INFOS[
+            _FORMAT_TYPES[format_ >> 8]]
+        mip_offsets, size = [], 0
+        for miplevel in range(mip_cnt):
+            rows = -(-max(1, height >> miplevel) // block_height)
+            cols = -(-max(1, width >> miplevel) // block_width)
+            mip_offsets.append(size)
+            size += swizzle.block_linear_size(
+                cols, rows, bpp,
+                swizzle.mip_block_height_log2(rows, block_height_log2))
+        assert len(data) == size * array_length
+        data_offs = writer.add_bytes(data, align=512)
+        mip_array = writer.add(f'{mip_cnt}Q', *(data_offs + offs
+                                                for offs in mip_offsets))
+        infos.append(writer.add(
+            '4s12xBBHHHH2xIIiiiIII20xII4sB3x8Q', b'BRTI', 1, 2, 0, 0,
+            mip_cnt, 1, format_, 0, width, height, 1, array_length,
+            block_height_log2, 0, len(data), 512, bytes((2, 3, 4, 5)), 1,
+            writer.string(name), 0, mip_array, 0, 0, 0, 0, 0))
+    info_array = writer.add(f'{len(infos)}Q', *infos)
+    names = writer.res_dict([texture[0] for texture in textures])
+    name_offs = writer.string('textures') + 2
+    struct.pack_into('<4sII2sBBIHHII4sIQQQI', writer.data, 0, b'BNTX', 0,
+                     0x00040000, b'\xFF\xFE', 12, 64, name_offs, 0, 0, 0,
+                     len(writer.data), b'NX  ', len(infos), info_array, 0,
+                     names, 0)
+    return bytes(writer.data)
@@ -0,0 +1,73 @@
+import numpy
+
+from bfrespy.animblend import AnimBinding
+from bfrespy.models.skeleton import Bone, Skeleton
+from bfrespy.skeletal_anim import BoneAnim, SkeletonAnim
+
+
+def _skeleton(names):
+    skeleton = Skeleton()
+    for i, name in enumerate(names):
+        bone = Bone()
+        bone.name = name
+        bone.position = (i, 0, 0)
+        skeleton.bones.append(name, bone)
+    return skeleton
+
+
+def _anim(names, bind_idxs=()):
+    anim = SkeletonAnim()
+    for name in names:
+        bone_anim = BoneAnim()
+        bone_anim.name = name
+        anim.bone_anims.append(bone_anim)
+    anim.bind_idxs = tuple(bind_idxs)
+    return anim
+
+
+def test_binding_cache_hits():
+    skeleton = _skeleton(['root', 'arm', 'hand'])
+    anim = _anim(['root', 'hand'], (0, 2))
+    binding = AnimBinding.get(anim, skeleton)
+    assert AnimBinding.get(anim, skeleton) is binding
+    # Bindings are kept per animation, even with the same bones.
+    other = AnimBinding.get(_anim(['root', 'hand'], (0, 2)), skeleton)
+    assert other is not binding
+    numpy.testing.assert_array_equal(other.bone_idxs, binding.bone_idxs)
+    assert AnimBinding.get(anim, _skeleton(['root', 'hand'])) is not binding
+
+
+def test_binding_retargets_by_name():
+    skeleton = _skeleton(['root', 'spine', 'arm', 'hand'])
+    # The indices come from another skeleton, only 'root' still matches.
+    anim = _anim(['root', 'hand', 'tail'], (0, 1, 2))
+    binding = AnimBinding.get(anim, skeleton)
+    numpy.testing.assert_array_equal(binding.bone_idxs, (0, 3, -1))
+    assert binding.unmatched_names == ['tail']
+    numpy.testing.assert_array_equal(binding.bound,
+                                     (True, False, False, True))
+
+    baked = numpy.arange(2 * 3 * 10, dtype=numpy.float32).reshape(2, 3, 10)
+    poses = binding.apply(baked)
+    assert poses.shape == (2, 4, 10)
+    numpy.testing.assert_array_equal(poses[:, 0], baked[:, 0])
+    numpy.testing.assert_array_equal(poses[:, 3], baked[:, 1])
+    numpy.testing.assert_array_equal(poses[:, 1], numpy.broadcast_to(
+        binding.rest[1], (2, 10)))
+
+
+def test_binding_clear_cache():
+    skeleton = _skeleton(['root', 'arm'])
+    anim = _anim(['arm'])
+    binding = AnimBinding.get(anim, skeleton)
+    numpy.testing.assert_array_equal(binding.bone_idxs, (1,))
+
+    skeleton.bones.rename('arm', 'leg')
+    assert AnimBinding.get(anim, skeleton) is binding
+    AnimBinding.clear_cache(skeleton)
+    rebound = AnimBinding.get(anim, skeleton)
+    assert rebound is not binding
+    numpy.testing.assert_array_equal(rebound.bone_idxs, (-1,))
+
+    AnimBinding.clear_cache()
+    assert AnimBinding.get(anim, skeleton) is not rebound
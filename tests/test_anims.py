@@ -0,0 +1,145 @@
+import math
+import struct
+
+import numpy
+
+from synthetic_bfres import BfresWriter, curve
+
+_LINEAR = 1 << 4
+_STEP_INT = 4 << 4
+_STEP_BOOL = 6 << 4
+
+
+def _material_anim_file():
+    w = BfresWriter()
+    # mat0 selects textures, animates a parameter and its visibility with
+    # curves, mat1 uses constants for all of them.
+    curves0 = w.add_bytes(
+        curve(w, _STEP_INT, 0, (0, 5), (1, 2), key_fmt='I')
+        + curve(w, _LINEAR, 4, (0, 10), (0, 10, 10, 0))
+        + curve(w, _STEP_BOOL, 0, (0, 3, 6), (0b101, 0, 0), key_fmt='I'))
+    constants0 = w.add('If', 0, 0.5)
+    param_infos0 = w.add('Q6H4x', w.string('albedo_color'), 1, 1, 0, 0, 1, 0)
+    tex_infos0 = w.add('QHHb3x', w.string('_a0'), 0, 0xFFFF, 0)
+    constants1 = w.add('IiIi', 0, 3, 0, 0)
+    tex_infos1 = w.add('QHHb3x', w.string('_a0'), 0xFFFF, 0, 0)
+    anim_datas = w.add_bytes(
+        struct.pack('<5Q9H6x', w.string('mat0'), param_infos0, tex_infos0,
+                    curves0, constants0, 0, 0, 0, 2, 0xFFFF, 1, 1, 1, 3)
+        + struct.pack('<5Q9H6x', w.string('mat1'), 0, tex_infos1, 0,
+                      constants1, 0xFFFF, 0xFFFF, 0, 0xFFFF, 1, 0, 1, 2, 0))
+    textures = w.strings(('tex0', 'tex1', 'tex2', 'tex3'))
+    bind_idxs = w.add('2H', 0, 1)
+    anim = w.add('4sI10QiI8H', b'FMAA', 0, w.string('mat_anim'), 0, 0,
+                 bind_idxs, anim_datas, 0, textures, 0, 0, 0, 10, 0, 0, 2, 3,
+                 1, 2, 2, 4, 0)
+    w.section(0x68, anim, ['mat_anim'])
+    return w.res_file()
+
+
+def test_material_anim_evaluate():
+    anim = _material_anim_file().material_anims['mat_anim']
+    assert anim.frame_cnt == 10
+    assert anim.texture_names == ('tex0', 'tex1', 'tex2', 'tex3')
+    frames = numpy.arange(11)
+
+    patterns = anim.evaluate_texture_patterns()
+    assert list(patterns) == [('mat0', '_a0'), ('mat1', '_a0')]
+    numpy.testing.assert_array_equal(patterns[('mat0', '_a0')],
+                                     numpy.where(frames < 5, 1, 2))
+    numpy.testing.assert_array_equal(patterns[('mat1', '_a0')],
+                                     numpy.full(11, 3))
+
+    params = anim.evaluate_shaderparams()
+    assert list(params) == [('mat0', 'albedo_color')]
+    numpy.testing.assert_allclose(
+        params[('mat0', 'albedo_color')],
+        numpy.stack((numpy.full(11, 0.5), frames), axis=1))
+
+    visibility = anim.evaluate_visibility([0, 2, 3, 5, 6, 10])
+    numpy.testing.assert_array_equal(visibility['mat0'],
+                                     (True, True, False, False, True, True))
+    numpy.testing.assert_array_equal(visibility['mat1'], numpy.zeros(6))
+
+
+def _visibility_anim_file():
+    w = BfresWriter()
+    names = [f'bone{i}' for i in range(10)]
+    # Bones 0, 2 and 9 are visible unless a curve says otherwise.
+    base_data = w.add('I', 0b10_0000_0101)
+    curves = w.add_bytes(
+        curve(w, _STEP_BOOL, 1, (0, 2), (0b10, 0), key_fmt='I')
+        + curve(w, _STEP_BOOL, 9, (0,), (0,), key_fmt='I'))
+    bind_idxs = w.add('10H', *range(10))
+    anim = w.add('4sI9QHHiHHI', b'FVIS', 0, w.string('vis_anim'), 0, 0,
+                  bind_idxs, curves, base_data, w.strings(names), 0, 0, 0, 0,
+                  4, len(names), 2, 0)
+    w.section(0x78, anim, ['vis_anim'])
+    return w.res_file()
+
+
+def test_visibility_anim_evaluate():
+    anim = _visibility_anim_file().bone_visibility_anims['vis_anim']
+    assert anim.names == tuple(f'bone{i}' for i in range(10))
+    expected = numpy.zeros((5, 10), dtype=numpy.bool_)
+    expected[:, [0, 2]] = True
+    expected[2:, 1] = True
+
+    bits = anim.evaluate(packed=False)
+    numpy.testing.assert_array_equal(bits, expected)
+    packed = anim.evaluate(packed=True)
+    assert packed.shape == (5, 2)
+    assert packed.dtype == numpy.uint8
+    numpy.testing.assert_array_equal(
+        packed, numpy.packbits(expected, axis=1, bitorder='little'))
+    numpy.testing.assert_array_equal(packed[:, 0], (0b101, 0b101, 0b111,
+                                                    0b111, 0b111))
+
+
+def test_shape_anim_evaluate_weights():
+    w = BfresWriter()
+    curves = w.add_bytes(curve(w, _LINEAR, 0, (0, 10), (0, 1, 1, 0)))
+    infos = w.add('Qhh4xQhh4xQhh4x', w.string('base'), -1, 0,
+                  w.string('smile'), 0, 1, w.string('blink'), -1, 2)
+    base_data = w.add('2f', 0.25, 0.75)
+    vertex_shape_anims = w.add('4QHHii4x', w.string('face'), curves, infos,
+                               base_data, 1, 3, 0, 0)
+    anim = w.add('4sI7QiI4H', b'FSHA', 0, w.string('shape_anim'), 0, 0, 0,
+                  vertex_shape_anims, 0, 0, 10, 0, 0, 1, 2, 1)
+    w.section(0x88, anim, ['shape_anim'])
+    anim = w.res_file().shape_anims['shape_anim']
+
+    weights = anim.evaluate_weights([0, 5, 10])
+    assert anim.vertex_shape_anims[0].key_shape_names == ['smile', 'blink']
+    numpy.testing.assert_allclose(weights['face'],
+                                  ((0, 0.75), (0.5, 0.75), (1, 0.75)))
+
+
+def test_camera_anim_evaluate():
+    w = BfresWriter()
+    # Looks at the origin from 10 units along Z, moving along X.
+    base_data = w.add('11f', 1, 100, 2, math.pi / 2, 0, 0, 10, 0, 0, 0, 0)
+    curves = w.add_bytes(curve(w, _LINEAR, 0x10, (0, 10), (0, 10, 10, 0)))
+    camera = w.add('4sIQHxxiBxHI5Q', b'FCAM', 0, 0, 1 << 10, 10, 1, 0, 0,
+                   w.string('cam'), curves, base_data, 0, 0)
+    scene = w.add('4sIQ10Q4H', b'FSCN', 0, 0, w.string('scene_anim'), 0,
+                  camera, w.res_dict(['cam']), 0, 0, 0, 0, 0, 0, 0, 1, 0, 0)
+    w.section(0x98, scene, ['scene_anim'])
+    scene = w.res_file().scene_anims['scene_anim']
+
+    cameras = scene.evaluate_cameras([0, 10])
+    assert list(cameras) == ['cam']
+    frames = cameras['cam']
+    numpy.testing.assert_allclose(frames.position, ((0, 0, 10), (10, 0, 10)))
+    numpy.testing.assert_allclose(frames.view[0], (
+        (1, 0, 0, 0), (0, 1, 0, 0), (0, 0, 1, -10), (0, 0, 0, 1)), atol=1e-6)
+    # The camera sits at the view space origin and looks down -Z.
+    position = numpy.append(frames.position[1], 1)
+    numpy.testing.assert_allclose(frames.view[1] @ position, (0, 0, 0, 1),
+                                  atol=1e-5)
+    numpy.testing.assert_allclose(frames.view[1] @ (0, 0, 0, 1),
+                                  (0, 0, -math.sqrt(200), 1), atol=1e-5)
+    numpy.testing.assert_allclose(frames.projection[0], (
+        (0.5, 0, 0, 0), (0, 1, 0, 0), (0, 0, -101 / 99, -200 / 99),
+        (0, 0, -1, 0)), rtol=1e-6, atol=1e-6)
+    numpy.testing.assert_allclose(frames.aspect_ratio, (2, 2))
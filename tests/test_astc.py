@@ -0,0 +1,92 @@
+"""Checks the ASTC decoder against reference blocks.
+
+The blocks were encoded with Arm's astcenc, and the expected texels are the
+RGBA8 values its decoder returns for them.
+"""
+import numpy
+import pytest
+
+from bfrespy import astc
+
+BLOCKS = [
+    ('4x4 void extent', 4, 4,
+     'fcfdffffffffffff1e1e3c3c5a5affff',
+     '1e3c5aff1e3c5aff1e3c5aff1e3c5aff1e3c5aff1e3c5aff1e3c5aff1e3c5aff'
+     '1e3c5aff1e3c5aff1e3c5aff1e3c5aff1e3c5aff1e3c5aff1e3c5aff1e3c5aff'),
+    ('4x4 dual plane', 4, 4,
+     '5284ab60c1a1592a8d29a35c2693c160',
+     '55bbeedd550000dd55bbee0055bbee0055bbeedd550000dd55bbee0055bbee00'
+     '55bbeedd552e3b6e552e3b6e552e3b6e552e3b6e552e3b37552e3b37552e3b37'),
+    ('4x4 2 partitions', 4, 4,
+     '5128c263a5b10d6740b200fe21c20046',
+     '4adee700000000ff000000ff000000ff4adee700000000ff000000ff000000ff'
+     '5a183163000000ff000000ff000000ff9463083994630839000000ff000000ff'),
+    ('4x4 4 partitions', 4, 4,
+     '51f85543b1cd820772179fab48fe5610',
+     '6929d22e742ee8e8a3a3a3a3a3a3a3a36929d22ed18bbaffbababae8a3a3a3a3'
+     '6929d22ebababae8bababae8000000ffd18bbaffd18bbaffa3a3a300a3a3a300'),
+    ('6x6 dual plane', 6, 6,
+     '62840f108c9898bbee9c44bccccc0400',
+     'a30017ffa30017ffa30017ffa30017ff7a4017ee35ab17d11ecf17c71ecf17c7'
+     '1ecf17c71ecf17c717db17c40aef17bf4593a8d71cd351c607f317bd19d717c5'
+     '21cb17c821cb17c86d54e2e928bf63cc07f31abd19d730c521cb34c821cb34c8'
+     '6d54c2e935ab72d114df46c314df6ec314df67c314df54c36d54ffe96d54ffe9'
+     '6d54f1e96d54c2e96d5479e96d5417e9'),
+    ('6x6 3 partitions', 6, 6,
+     '04f14d0db8085584fd08494a02400000',
+     '000000ff000000ff000000ff000000ff000000ff000000ff000000ff000000ff'
+     '000000ff000000ff000000ff000000ff000000ff000000ff000000ff000000ff'
+     '000000ff5ca32ed1000000ff000000ff000000ff000000ff000000ff000000ff'
+     '000000ff000000ff000000ff000000ff000000ff000000ff2e2e2e2e000000ff'
+     '000000ff2e74745c000000ff000000ff'),
+    ('8x5 2 partitions', 8, 5,
+     '6548b383e897fe9b9ee09f0702000206',
+     '44ff44ff44ff44ff44ff44ff44ff44ff44ff44ff44ff44ff44ff44ff000000ff'
+     '44ff44ff44ff44ff44ff44ff44ff44ff44ff44ff44ff44ff44ff44ff000000ff'
+     '44ff44ff44ff44ff44ff44ff44ff44ff44ff44ff44ff44ff44ff44ff000000ff'
+     '44ff44ff44ff44ff44ff44ff44ff44ff44ff44ff44ff44ff44bbffdd000000ff'
+     '44ff44ff44ff44ff44ff44ff44ff44ff44ff44ff44bbffdd44bbffdd44bbffdd'),
+    ('8x5 4 partitions', 8, 5,
+     '65d80fa305dd8571d000220800e0fcfe',
+     '99990099999900999999009999990099999900999999009999990099000000ff'
+     '999999009999009999990099999900999999009999990099000000ff000000ff'
+     '999999009999990099999900000000ff000000ff000000ff000000ff000000ff'
+     '000000ff000000ff000000ff000000ff000000ff000000ff000000ff000000ff'
+     '000000ff000000ff000000ff000000ffcc66ccff000000ff000000ff000000ff'),
+]
+"""Void extent, partitioned and dual plane blocks of several footprints."""
+
+
+@pytest.mark.parametrize('name, block_width, block_height, block, expected',
+                         BLOCKS, ids=[case[0] for case in BLOCKS])
+def test_decode_astc(name, block_width, block_height, block, expected):
+    blocks = numpy.frombuffer(bytes.fromhex(block),
+                              dtype=numpy.uint8).reshape(1, 1, 16)
+    texels = astc.decode_astc(blocks, block_width, block_height)
+    assert texels.shape == (block_height, block_width, 4)
+    assert texels.dtype == numpy.uint8
+    numpy.testing.assert_array_equal(
+        texels, numpy.frombuffer(bytes.fromhex(expected), dtype=numpy.uint8)
+        .reshape(block_height, block_width, 4))
+
+
+def test_decode_astc_batch():
+    # Blocks of different kinds decoded together match their single
+    # decodes.
+    cases = [case for case in BLOCKS if (case[1:3] == (4, 4))]
+    blocks = numpy.frombuffer(
+        bytes.fromhex(''.join(case[3] for case in cases)),
+        dtype=numpy.uint8).reshape(1, len(cases), 16)
+    texels = astc.decode_astc(blocks, 4, 4)
+    for i, case in enumerate(cases):
+        numpy.testing.assert_array_equal(
+            texels[:, i * 4:i * 4 + 4].reshape(-1),
+            numpy.frombuffer(bytes.fromhex(case[4]), dtype=numpy.uint8))
+
+
+def test_decode_astc_reserved_block():
+    # A block mode of 0 is reserved and decodes to the error color.
+    texels = astc.decode_astc(numpy.zeros((1, 1, 16), dtype=numpy.uint8),
+                              6, 6)
+    numpy.testing.assert_array_equal(texels.reshape(-1, 4),
+                                     numpy.tile((255, 0, 255, 255), (36, 1)))
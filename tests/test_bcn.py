@@ -0,0 +1,105 @@
+"""Checks the BC1 to BC5 decoders against reference blocks.
+
+Interpolated values of the blocks are exact, so they do not depend on
+rounding. The expected texels of BC1, BC3 and unsigned BC4 and BC5 are the
+RGBA8 values texture2ddecoder decodes, except where it differs from the
+specification, as noted per block. The BC2 and signed texels follow the
+specification.
+"""
+import numpy
+import pytest
+
+from bfrespy import bcn
+from bfrespy.gx2 import GX2SurfaceFormat
+
+UNORM_BLOCKS = [
+    ('BC1 four colors', bcn.decode_bc1,
+     '00f8ff07e4e4e4e4',
+     'ff0000ff00ffffffaa5555ff55aaaaffff0000ff00ffffffaa5555ff55aaaaff'
+     'ff0000ff00ffffffaa5555ff55aaaaffff0000ff00ffffffaa5555ff55aaaaff'),
+    # texture2ddecoder decodes the punch-through texels as opaque black.
+    ('BC1 three colors, punch-through', bcn.decode_bc1,
+     'e007ff076c6c6c6c',
+     '00ff00ff0000000000ff7fff00ffffff00ff00ff0000000000ff7fff00ffffff'
+     '00ff00ff0000000000ff7fff00ffffff00ff00ff0000000000ff7fff00ffffff'),
+    ('BC2', bcn.decode_bc2,
+     '0ff03cc35aa5966900f8ff07e4e4e4e4',
+     'ff0000ff00ffff00aa55550055aaaaffff0000cc00ffff33aa55553355aaaacc'
+     'ff0000aa00ffff55aa55555555aaaaaaff00006600ffff99aa55559955aaaa66'),
+    ('BC3 eight alphas', bcn.decode_bc3,
+     'd20e88c6fa88c6fa00f8ff07e4e4e4e4',
+     'ff0000d200ffff0eaa5555b655aaaa9aff00007e00ffff62aa55554655aaaa2a'
+     'ff0000d200ffff0eaa5555b655aaaa9aff00007e00ffff62aa55554655aaaa2a'),
+    # The color endpoints are swapped, which BC3 still decodes with four
+    # colors while texture2ddecoder switches to three.
+    ('BC3 six alphas, swapped colors', bcn.decode_bc3,
+     '14dc773905773905ff0700f81b1b1b1b',
+     'aa5555ff55aaaa00ff0000b400ffff8caa55556455aaaa3cff0000dc00ffff14'
+     'aa5555ff55aaaa00ff0000b400ffff8caa55556455aaaa3cff0000dc00ffff14'),
+    ('BC4 eight values', bcn.decode_bc4,
+     'd20e88c6fa88c6fa',
+     'd20000ff0e0000ffb60000ff9a0000ff7e0000ff620000ff460000ff2a0000ff'
+     'd20000ff0e0000ffb60000ff9a0000ff7e0000ff620000ff460000ff2a0000ff'),
+    ('BC4 six values', bcn.decode_bc4,
+     '14dca8ce78a8ce78',
+     '140000ffb40000ff3c0000ffff0000ff8c0000ffdc0000ff000000ff640000ff'
+     '140000ffb40000ff3c0000ffff0000ff8c0000ffdc0000ff000000ff640000ff'),
+    ('BC5', bcn.decode_bc5,
+     'd20e88c6fa88c6fa14dca8ce78a8ce78',
+     'd21400ff0eb400ffb63c00ff9aff00ff7e8c00ff62dc00ff460000ff2a6400ff'
+     'd21400ff0eb400ffb63c00ff9aff00ff7e8c00ff62dc00ff460000ff2a6400ff'),
+]
+
+SNORM_BLOCKS = [
+    ('BC4 eight values', bcn.decode_bc4,
+     '46ba88c6fa88c6fa',
+     [(70,), (-70,), (50,), (30,), (10,), (-10,), (-30,), (-50,)] * 2),
+    # -128 is clamped to -127.
+    ('BC4 clamped endpoints', bcn.decode_bc4,
+     '808088c6fa88c6fa',
+     [(-127,)] * 7 + [(127,)] + [(-127,)] * 7 + [(127,)]),
+    ('BC5 eight and six values', bcn.decode_bc5,
+     '46ba88c6fa88c6fa9c64a8ce78a8ce78',
+     [(70, -100), (-70, 60), (50, -60), (30, 127), (10, 20), (-10, 100),
+      (-30, -127), (-50, -20)] * 2),
+]
+"""Signed blocks with the expected channel values times 127."""
+
+
+def _block(hex_block):
+    return numpy.frombuffer(bytes.fromhex(hex_block),
+                            dtype=numpy.uint8).reshape(1, 1, -1)
+
+
+@pytest.mark.parametrize('name, decode, block, expected', UNORM_BLOCKS,
+                         ids=[case[0] for case in UNORM_BLOCKS])
+def test_decode_unorm(name, decode, block, expected):
+    texels = decode(_block(block))
+    assert texels.shape == (4, 4, 4) and texels.dtype == numpy.uint8
+    numpy.testing.assert_array_equal(
+        texels, numpy.frombuffer(bytes.fromhex(expected),
+                                 dtype=numpy.uint8).reshape(4, 4, 4))
+
+
+@pytest.mark.parametrize('name, decode, block, expected', SNORM_BLOCKS,
+                         ids=[case[0] for case in SNORM_BLOCKS])
+def test_decode_snorm(name, decode, block, expected):
+    texels = decode(_block(block), signed=True)
+    assert texels.shape == (4, 4, 4) and texels.dtype == numpy.float32
+    channels = len(expected[0])
+    numpy.testing.assert_allclose(
+        texels[..., :channels].reshape(16, channels),
+        numpy.array(expected) / 127, rtol=1e-6)
+    numpy.testing.assert_array_equal(texels[..., channels:3], 0)
+    numpy.testing.assert_array_equal(texels[..., 3], 1)
+
+
+def test_gx2_decoders():
+    block = _block(SNORM_BLOCKS[2][2])
+    numpy.testing.assert_array_equal(
+        bcn.GX2_DECODERS[GX2SurfaceFormat.T_BC5_SNORM](block),
+        bcn.decode_bc5(block, signed=True))
+    block = _block(UNORM_BLOCKS[0][2])
+    numpy.testing.assert_array_equal(
+        bcn.GX2_DECODERS[GX2SurfaceFormat.T_BC1_SRGB](block),
+        bcn.decode_bc1(block))
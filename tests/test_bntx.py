@@ -0,0 +1,87 @@
+import numpy
+import pytest
+
+from bfrespy import bcn
+from bfrespy.switch import swizzle
+from bfrespy.switch.bntx import (BntxFile, SurfaceFormatType,
+                                 SurfaceFormatVariant, decode_textures)
+from synthetic_bfres import bntx
+
+_BC1_UNORM = 0x1A01
+_RGBA8_SRGB = 0x0B06
+
+
+def _random_bytes(size, seed=0):
+    return numpy.random.default_rng(seed).integers(
+        0, 256, size, dtype=numpy.uint8).tobytes()
+
+
+def test_bntx_file():
+    # A 16x16 BC1 texture has 4x4 blocks in its first level and 2x2 in its
+    # second, each in a single GOB of 512 bytes.
+    bc1 = _random_bytes(1024)
+    rgba8 = _random_bytes(2 * 512, seed=1)
+    data = bntx([('wall', 16, 16, _BC1_UNORM, 2, 1, 4, bc1),
+                 ('decal', 4, 4, _RGBA8_SRGB, 1, 2, 0, rgba8)])
+    bntx_file = BntxFile(data)
+    assert bntx_file.name == 'textures'
+    assert bntx_file.target_platform == 'NX  '
+    assert list(bntx_file.textures.keys()) == ['wall', 'decal']
+
+    wall = bntx_file.textures['wall']
+    assert (wall.width, wall.height, wall.mipcount) == (16, 16, 2)
+    assert wall.format_type is SurfaceFormatType.BC1
+    assert wall.format_variant is SurfaceFormatVariant.UNORM
+    assert (wall.block_width, wall.bytes_per_block) == (4, 8)
+    assert wall.block_height_log2 == 4
+    assert wall.channel_sources == (2, 3, 4, 5)
+    assert wall.mip_offsets == (0, 512)
+
+    # The stored data is a view of the container.
+    level = wall.get_swizzled_data(0, 1)
+    assert isinstance(level, memoryview) and level.readonly
+    assert level == bc1[512:]
+    assert wall.get_swizzled_data() == bc1
+    with pytest.raises(IndexError):
+        wall.get_swizzled_data(0, 2)
+
+    blocks = wall.get_deswizzled_data(0, 1)
+    numpy.testing.assert_array_equal(
+        blocks, swizzle.deswizzle_block_linear(bc1[512:], 2, 2, 8, 0))
+    numpy.testing.assert_array_equal(wall.get_decoded_data(0, 1),
+                                     bcn.decode_bc1(blocks))
+
+    decal = bntx_file.textures['decal']
+    assert decal.format_variant is SurfaceFormatVariant.SRGB
+    assert decal.array_length == 2
+    assert decal.get_swizzled_data(1, 0) == rgba8[512:]
+    numpy.testing.assert_array_equal(
+        decal.get_decoded_data(1, 0),
+        swizzle.deswizzle_block_linear(rgba8[512:], 4, 4, 4, 0))
+
+
+def test_bntx_unsupported_format():
+    texture = BntxFile(bntx([('r5g6b5', 4, 4, 0x0701, 1, 1, 0,
+                              bytes(512))])).textures['r5g6b5']
+    with pytest.raises(NotImplementedError):
+        texture.get_decoded_data()
+
+
+@pytest.mark.parametrize('backend', ['thread', 'process'])
+def test_decode_textures(backend):
+    # Textures of different files may share their name.
+    textures = [
+        BntxFile(bntx([('albedo', 8, 8, _BC1_UNORM, 2, 2, 4,
+                        _random_bytes(2048, seed))])).textures['albedo']
+        for seed in range(2)
+    ] + [BntxFile(bntx([('albedo', 4, 4, _RGBA8_SRGB, 1, 1, 0,
+                         _random_bytes(512, 2))])).textures['albedo']]
+    results = decode_textures(textures, jobs=2, backend=backend,
+                              memory_budget=1)
+    assert [len(levels) for levels in results] == [2, 2, 1]
+    for texture, levels in zip(textures, results):
+        for miplevel, images in enumerate(levels):
+            assert images.shape[0] == texture.array_length
+            for arraylevel, image in enumerate(images):
+                numpy.testing.assert_array_equal(
+                    image, texture.get_decoded_data(arraylevel, miplevel))
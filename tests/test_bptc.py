@@ -0,0 +1,140 @@
+"""Checks the BPTC decoders against reference blocks.
+
+The expected BC7 texels are RGBA8 values on which bcdec and
+texture2ddecoder agree, the expected BC6H texels are the RGB half float bit
+patterns decoded by bcdec.
+"""
+import numpy
+import pytest
+
+from bfrespy import bptc
+
+BC7_BLOCKS = [
+    ('mode 0',
+     '77b6b6aa0774601f861caed1ceb21342',
+     '44bfbeff905fe4ff601707ff5a2b78ff6990d1ffb531f7ff520000ff5a2490ff'
+     '44bfbeff6990d1ffb5a531ff5a1da9ff31d6b5ff56a8c8ff520000ff5a3261ff'),
+    ('mode 1',
+     '62d676aa2597e0677cd2a41671701cf8',
+     '5b90a3ff5e8ba8ff9f3fa4ffa274b3ff5b90a3ff5e8ba8ff6480b4ffa274b3ff'
+     '58959dff6975bfff5b90a3ffa7c6caff5b90a3ff58959dff6975bfff6c70c5ff'),
+    ('mode 2',
+     'f416e688769d8d29130079fe229977db',
+     '5ad600ffa3d100ffe73194ffb13176ffa3d100ffb13176ffd77690ffef9c5aff'
+     '7dd300ff423139ffbd4fc9ffd77690ff7dd300ffc6ce00ff783157ffb13176ff'),
+    ('mode 3',
+     '58c18604bb55bd297385dd199eac8456',
+     '6cb9a7ff86d484ff60acb8ff6cb9a7ffa29a82ff6cb9a7ff6cb9a7ff6cb9a7ff'
+     '0836baff53679fff60acb8ff7ac795ffa29a82ff53679fff53679fff6cb9a7ff'),
+    ('mode 4',
+     '30be0267183e7fad0bddc2bbf72ed59d',
+     'e02641dfe37363adcf7363add54d53c5db4d53c5cf2641dfd52641dfcf7363ad'
+     'd22641dfd52641dfd70031f7dd4d53c5d54d53c5db7363adcf4d53c5d72641df'),
+    ('mode 5',
+     '600c20714ab276f417c2cd5fc38f5169',
+     '6793693a1d9d8c5f1d894818fd894818fd93693afd8948181d9d8c5fb4a7ad81'
+     '679d8c5f1d93693a679d8c5f67a7ad8167a7ad81b4a7ad81b49d8c5f679d8c5f'),
+    ('mode 6',
+     '4031c166a45d8cf01146bffcfe663fed',
+     'c56d698db96f6592797a51af93765aa3098d2fe13b853ecb2f873bd0098d2fe1'
+     '158b33dc098d2fe1797a51af797a51af098d2fe19f745d9e238937d5158b33dc'),
+    ('mode 7',
+     '80a21b96adb52fb7468257690978fb04',
+     '755de7049ad353aa755de704b6df34aeb6df34ae1859b2799ad353aa565cd62a'
+     '1859b2797dc673a61859b27961ba92a2b6df34ae565cd62ab6df34ae755de704'),
+    ('mode 4 rotation 1, 3-bit color indices',
+     'b03d63974b5c22cc59bac21b5ce497e6',
+     'c7bab7eac7c6ceefb77329cec78a57d7a6bab7eab7c6ceefa67329ce96afa0e6'
+     'c7966fdc96966fdca67329cec7a388e1b7bab7ea968a57d7b7bab7eab77329ce'),
+    ('mode 4 rotation 3',
+     '70ee268baedf1b8670ba75da04417932',
+     '734afa42bdb5f8bd734afa42734af842bdb5f8bd734afa42734afa428b6dfb6a'
+     '734afa42a592fb95bdb5f8bd734af9428b6df76abdb5f9bd8b6df96abdb5fabd'),
+    ('mode 5 rotation 2',
+     'a09afaf71477482e4d37d1bddad06bd8',
+     '707ba29a7062a29aaf7b5d73af4b5d73eb921c4eaf925d73707ba29aaf4b5d73'
+     '344be3bfaf625d73af625d73eb7b1c4eaf925d73eb621c4e707ba29a704ba29a'),
+]
+"""Blocks of every mode, including rotations and the index selection of
+mode 4. Modes 0, 1, 3, 6 and 7 use p-bits.
+"""
+
+BC6H_BLOCKS = [
+    ('mode 1, transformed, 2 regions', False,
+     '14ab25a7aa6e55168fc038b13d2fd48b',
+     '5729844785292729b447b929572984478529242a62479c28c2281948272ac228'
+     '1948272ad6295a488927242a62479c2862287948902a5c2ab3465d29902a0d46'
+     '142a0a2ab4474028f0290748e527422a05470129762a6046b8295c2ab3465d29'),
+    ('mode 11, transformed, 1 region', False,
+     'e7e5befd6d961334b14047384eb5204d',
+     '606f1936686c7d78083d0871606f1936686cac729b38146e3175863a5c6fac72'
+     '9b38146ef8751d3bc16fe5710438b06d037bf43e5072ac729b38146e73733239'
+     '796e7d78083d0871606f1936686c1f716d374b6d0b7a373ed271ac729b38146e'),
+    ('mode 10, untransformed, 2 regions', False,
+     '3e8b95d6b7cb26fabb3bd2f747e7d046',
+     '6831485448545d5d1b4cb25c684e1231d042684e1231d04298699869b8659869'
+     '9869b8654e394757bb56534744248d3698699869b865e3519a605c5e1c49455d'
+     'a35b683148544854ca599963d060ca599963d0604e394757bb563541465a2f59'),
+    ('mode 11, untransformed, 1 region', False,
+     'e3d6cab6f684faae07c13651b95a73c4',
+     '03473f3f216838541a311468285074351868662096684568cd39634d2d680347'
+     '3f3f2168285074351868e23ef34728689c2d725a396877243c6442688728e25f'
+     '3e68e23ef347286803473f3f2168bd35bd513168f24299432468662096684568'),
+    ('mode 1, transformed, 2 regions', True,
+     '30a3e6a7fd96c9498e4633583eed8425',
+     '2d44798c05c97b46038a5fcadf45cf8989c80944ca8ad6ca0044628a48cbb646'
+     '168a0ecb53474b8ae5cc2444108c76c90044628a48cbea46288aabcb7b46038a'
+     '5fca1b44a78be7c92d44798c05c97b46038a5fca1346e08925c92444108c76c9'),
+    ('mode 11, transformed, 1 region', True,
+     '078f4f660551acc53377449657662074',
+     '49ed1e1245a9beec6d0f42abb6eb580a06afb6eb580a06af80ec3b0e25ac80ec'
+     '3b0e25acf4eb8a0b23ae3aebf407ccb0b6eb580a06af42ec090d08adf4eb8a0b'
+     '23aef4eb8a0b23ae87ed501362a8fcec9f1060aa80ec3b0e25acb6eb580a06af'),
+    ('mode 10, untransformed, 2 regions', True,
+     '3efeb0d53d7ab249fa3eee2fc3e92c36',
+     '7696cea78792908ddfa4a374908d0199c15d908db0a8ff7bffa2dec36aa98710'
+     '7f2fad3410bcfffb30d7908ddfa4a37487afeedf4dc0ff036f13ca1d7696cea7'
+     '879287107f2fad34ffa2dec36aa98988a088e706ff036f13ca1d87afeedf4dc0'),
+    ('mode 11, untransformed, 1 region', True,
+     '238e1570cd9fcefbea9eac8db15e74a5',
+     'df116e98718d03005ed9596d03005ed9596d160abcb41528220461ca0351cc07'
+     '0fbdd3374d020ad19b5deb0b13ae7d1ba819e003f7c2f705b8c36b4403005ed9'
+     '596ddf116e98718db413c591099ac00d6aa7e50edf116e98718dcc070fbdd337'),
+]
+"""Blocks of modes with and without transformed endpoints, for both the
+unsigned and the signed variant.
+"""
+
+
+def _block(hex_block):
+    return numpy.frombuffer(bytes.fromhex(hex_block),
+                            dtype=numpy.uint8).reshape(1, 1, 16)
+
+
+@pytest.mark.parametrize('name, block, expected', BC7_BLOCKS,
+                         ids=[case[0] for case in BC7_BLOCKS])
+def test_decode_bc7(name, block, expected):
+    texels = bptc.decode_bc7(_block(block))
+    assert texels.shape == (4, 4, 4) and texels.dtype == numpy.uint8
+    numpy.testing.assert_array_equal(
+        texels, numpy.frombuffer(bytes.fromhex(expected),
+                                 dtype=numpy.uint8).reshape(4, 4, 4))
+
+
+@pytest.mark.parametrize(
+    'name, signed, block, expected', BC6H_BLOCKS,
+    ids=[f"{case[0]}, {'signed' if (case[1]) else 'unsigned'}"
+         for case in BC6H_BLOCKS])
+def test_decode_bc6h(name, signed, block, expected):
+    texels = bptc.decode_bc6h(_block(block), signed=signed)
+    assert texels.shape == (4, 4, 4) and texels.dtype == numpy.float32
+    numpy.testing.assert_array_equal(
+        texels[..., :3].astype(numpy.float16).view('<u2'),
+        numpy.frombuffer(bytes.fromhex(expected),
+                         dtype='<u2').reshape(4, 4, 3))
+    numpy.testing.assert_array_equal(texels[..., 3], 1)
+
+
+def test_decode_bc7_reserved_mode():
+    texels = bptc.decode_bc7(numpy.zeros((1, 1, 16), dtype=numpy.uint8))
+    numpy.testing.assert_array_equal(texels, 0)
@@ -0,0 +1,56 @@
+import numpy
+import pytest
+
+from bfrespy.common import AnimCurve, AnimCurveType, ResDict, sample_frames
+
+
+def test_resdict_int_keys():
+    dict_ = ResDict()
+    dict_.append('a', 1)
+    dict_.append('b', 2)
+    dict_[1] = 3
+    assert dict_[0] == 1
+    assert dict_[1] == 3
+    assert dict_['b'] == 3
+    with pytest.raises(IndexError):
+        dict_[2]
+    with pytest.raises(IndexError):
+        dict_[-1] = 4
+
+
+def test_resdict_rename():
+    dict_ = ResDict()
+    for key in 'abc':
+        dict_.append(key, key.upper())
+    dict_.rename('b', 'd')
+    assert list(dict_.keys()) == ['a', 'd', 'c']
+    assert dict_['d'] == 'B'
+    assert 'b' not in dict_
+    with pytest.raises(ValueError):
+        dict_.rename('a', 'c')
+
+    nodes = list(dict_)
+    nodes[2].key = 'a'
+    # The first occurrence of a duplicate key is found.
+    assert dict_.key_index('a') == 0
+    assert 'c' not in dict_
+    nodes[0].key = 'e'
+    assert dict_.key_index('a') == 2
+    assert dict_.key_index('e') == 0
+
+
+def test_curve_resample_matches_evaluate():
+    rng = numpy.random.default_rng(0)
+    curve = AnimCurve()
+    curve.curve_type = AnimCurveType.CUBIC
+    curve.frames = numpy.arange(0, 100, 4, dtype=numpy.float32)
+    curve.keys = rng.standard_normal((len(curve.frames), 4)) \
+        .astype(numpy.float32)
+    curve.scale = 2
+    curve.offs = 1
+    full = curve.evaluate(sample_frames(0, 96, 60))
+    for start, end in ((0, 10), (18, 41), (50.5, 96)):
+        window = curve.resample(start, end, 60)
+        first = int(start * 2)
+        numpy.testing.assert_allclose(window, full[first:first + len(window)],
+                                      rtol=1e-6)
@@ -0,0 +1,27 @@
+from types import SimpleNamespace
+
+import numpy
+
+from bfrespy.curve_fit import reduce_baked
+from bfrespy.skeletal_anim import BoneAnim
+
+
+def test_reduce_baked_round_trip():
+    frames = numpy.arange(31, dtype=numpy.float32)
+    baked = numpy.empty((len(frames), 1, BoneAnim.CHANNEL_COUNT),
+                        dtype=numpy.float32)
+    baked[:] = (2, 2, 2, 0, 0, 0, 1, 0, 0, 0)
+    baked[:, 0, 4] = numpy.sin(frames / 10)  # Rotate Y
+    baked[:, 0, 8] = frames * 0.5  # Translate Y
+
+    curves, base, report = reduce_baked(baked, tolerance=1e-4)
+    assert sorted(curve.anim_data_offset for curve in curves[0]) == [0x14,
+                                                                     0x24]
+    assert report.key_count_after < report.key_count_before
+
+    bone_anim = BoneAnim()
+    bone_anim.curves = curves[0]
+    bone_anim.base_data = SimpleNamespace(
+        scale=base[0, 0:3], rotate=base[0, 3:7], translate=base[0, 7:10])
+    numpy.testing.assert_allclose(bone_anim.bake(frames), baked[:, 0],
+                                  atol=1e-3)
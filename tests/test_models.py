@@ -0,0 +1,71 @@
+import io
+import struct
+
+import pytest
+
+from bfrespy.gx2 import GX2AttribFormat, GX2IndexFormat, GX2PrimitiveType
+from bfrespy.models.shape import Mesh
+from bfrespy.models.vertex_buffer_attrib import VertexAttrib
+from synthetic_bfres import BfresWriter
+
+
+def _mesh(primitive_type, index_format):
+    # Mesh.load stores the raw Switch values the same way, but also needs
+    # the buffer info of a whole file.
+    mesh = Mesh()
+    mesh._primitive_type = int(primitive_type)
+    mesh._index_format = int(index_format)
+    return mesh
+
+
+def _attrib(format_):
+    writer = BfresWriter()
+    offs = writer.add('Q', writer.string('_p0'))
+    # The format is stored big endian.
+    writer.add_bytes(struct.pack('>H', format_)
+                     + struct.pack('<2xHH', 12, 1), align=1)
+
+    def load(loader):
+        loader.seek(offs, io.SEEK_SET)
+        attrib = VertexAttrib()
+        attrib.load(loader)
+        return attrib
+    return writer.res_file().load_deferred(load)
+
+
+def test_mesh_formats():
+    mesh = _mesh(Mesh.SwitchPrimitiveType.LINE_STRIP,
+                 Mesh.SwitchIndexFormat.UINT32)
+    assert mesh.primitive_type is GX2PrimitiveType.LINE_STRIP
+    assert mesh.index_format is GX2IndexFormat.UINT32_LITTLE_ENDIAN
+    assert mesh.format_size == 4
+    # The converted values are kept.
+    assert mesh.primitive_type is GX2PrimitiveType.LINE_STRIP
+
+    mesh.primitive_type = GX2PrimitiveType.POINTS
+    mesh.index_format = GX2IndexFormat.UINT16
+    assert mesh.primitive_type is GX2PrimitiveType.POINTS
+    assert mesh.format_size == 2
+
+
+def test_mesh_invalid_formats():
+    # Invalid values only raise once they are accessed.
+    mesh = _mesh(Mesh.SwitchPrimitiveType.PATCHES, 7)
+    with pytest.raises(ValueError):
+        mesh.primitive_type
+    with pytest.raises(ValueError):
+        mesh.index_format
+
+
+def test_vertex_attrib_format():
+    attrib = _attrib(VertexAttrib.SwitchAttribFormat.FORMAT_16_16_SINGLE)
+    assert attrib.name == '_p0'
+    assert attrib.offset == 12
+    assert attrib.buffer_idx == 1
+    assert attrib.format_ is GX2AttribFormat.FORMAT_16_16_SINGLE
+
+    attrib.format_ = GX2AttribFormat.FORMAT_8_8_8_8_UNORM
+    assert attrib.format_ is GX2AttribFormat.FORMAT_8_8_8_8_UNORM
+
+    with pytest.raises(ValueError):
+        _attrib(0xFFFF).format_
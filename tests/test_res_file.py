@@ -0,0 +1,145 @@
+import io
+import mmap
+import struct
+
+import pytest
+
+from bfrespy import ResFile
+from bfrespy.common import ResDict
+from bfrespy.switch.res_file_parser import ResFileParser
+from synthetic_bfres import BfresWriter, bntx
+
+_STRING_ID_OFFS = 0x1F8
+
+
+def _empty_file(string_id):
+    """Returns a version 9 Switch Bfres without any sections, holding the
+    string_id where a string offset would be.
+    """
+    data = bytearray(0x200)
+    struct.pack_into('<4sII', data, 0, b'FRES', 0x20202020, 0x00090000)
+    data[12:14] = b'\xFF\xFE'
+    struct.pack_into('<Q', data, _STRING_ID_OFFS, string_id)
+    return ResFile(io.BytesIO(bytes(data)))
+
+
+def _load_string(loader):
+    loader.seek(_STRING_ID_OFFS, io.SEEK_SET)
+    return loader.load_string()
+
+
+def test_deferred_loads_use_own_string_cache():
+    first = _empty_file(1234)
+    first._string_cache[1234] = "first"
+    second = _empty_file(1234)
+    second._string_cache[1234] = "second"
+    # Opening another file must not change the strings of earlier ones.
+    assert first.load_deferred(_load_string) == "first"
+    assert second.load_deferred(_load_string) == "second"
+
+
+_KEYS = ['mat0', 'mat1', 'mat10', 'Mat1', 'body', 'body_a', 'face', 'a',
+         'a' * 9, 'skin_ALB.0', 'skin_ALB.1', 'skin_NRM.0']
+
+
+def test_resdict_search():
+    writer = BfresWriter()
+    dict_offs = writer.res_dict(_KEYS)
+    empty_offs = writer.res_dict([])
+
+    def search(loader):
+        found = [ResDict.search(loader, key, dict_offs) for key in _KEYS]
+        absent = [ResDict.search(loader, key, dict_offs)
+                  for key in ('', 'mat', 'mat2', 'body_', 'ody', 'a' * 8,
+                              'skin_ALB.', 'skin_NRM.1', 'x')]
+        return found, absent, ResDict.search(loader, 'mat0', empty_offs)
+
+    found, absent, empty = writer.res_file().load_deferred(search)
+    assert found == list(range(len(_KEYS)))
+    assert absent == [-1] * len(absent)
+    assert empty == -1
+
+
+@pytest.mark.parametrize('section, find, signature', [
+    ('models', 'find_model', b'FMDL'),
+    ('skeletal_anims', 'find_skeletal_anim', b'FSKA'),
+    ('material_anims', 'find_material_anim', b'FMAA'),
+    ('bone_visibility_anims', 'find_bone_visibility_anim', b'FVIS'),
+    ('shape_anims', 'find_shape_anim', b'FSHA'),
+    ('scene_anims', 'find_scene_anim', b'FSCN'),
+])
+def test_find_section(section, find, signature):
+    _, header_offs, sizes = ResFileParser._SECTIONS[section]
+    writer = BfresWriter()
+    # Only the signature and name of each value are set. Scene animations
+    # keep a header block before their name.
+    name_offs = 16 if (signature == b'FSCN') else 8
+    names = ['first', 'second', 'third_a', 'third_b']
+    values = bytearray(sizes[1] * len(names))
+    for i, name in enumerate(names):
+        struct.pack_into(f'<4s{name_offs - 4}xQ', values, i * sizes[1],
+                         signature, writer.string(name))
+    writer.section(header_offs[1], writer.add_bytes(bytes(values)), names)
+
+    res_file = writer.res_file(lazy=True)
+    for name in names:
+        assert getattr(res_file, find)(name).name == name
+    assert getattr(res_file, find)('third') is None
+    assert section not in res_file.__dict__
+    # Once loaded, the dictionary agrees with the search.
+    assert list(getattr(res_file, section).keys()) == names
+    assert getattr(res_file, find)('second').name == 'second'
+
+
+def _external_files_file():
+    writer = BfresWriter()
+    readme = writer.add_bytes(b'Hello, world')
+    textures = writer.add_bytes(bntx([('albedo', 4, 4, 0x0B01, 1, 1, 0,
+                                       bytes(range(256)) * 2)]), align=512)
+    values = writer.add('QI4xQI4x', readme, 12, textures,
+                        len(writer.data) - textures)
+    writer.section(0xB8, values, ['readme.txt', 'textures.bntx'])
+    return bytes(writer.data)
+
+
+def _check_external_files(res_file):
+    readme = res_file.external_files['readme.txt']
+    data = readme.data
+    # The data is a view of the file data, not a copy of it.
+    assert isinstance(data, memoryview) and data.readonly
+    assert data.obj is res_file._data
+    assert data == b'Hello, world'
+
+    stream = readme.get_stream()
+    assert not stream.writable()
+    assert stream.read(5) == b'Hello'
+    assert stream.getbuffer().obj is res_file._data
+    stream = readme.get_stream(writeable=True)
+    assert isinstance(stream, io.BytesIO)
+    stream.write(b'Bye')
+    assert data == b'Hello, world'
+
+    texture = res_file.textures['albedo']
+    assert texture.get_swizzled_data(0, 0).obj is res_file._data
+    assert texture.get_swizzled_data(0, 0)[:4] == bytes(range(4))
+
+
+def test_external_files():
+    res_file = ResFile(io.BytesIO(_external_files_file()))
+    assert isinstance(res_file._data, bytes)
+    _check_external_files(res_file)
+
+    readme = res_file.external_files['readme.txt']
+    readme.data = b'Replaced'
+    assert readme.get_stream().read() == b'Replaced'
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_external_files_mapped(tmp_path, lazy):
+    path = tmp_path / 'external.bfres'
+    path.write_bytes(_external_files_file())
+    with open(path, 'rb') as f:
+        res_file = ResFile(f, lazy)
+    assert isinstance(res_file._data, mmap.mmap)
+    # Sections are still loaded after the file is closed.
+    _check_external_files(res_file)
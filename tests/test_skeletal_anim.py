@@ -0,0 +1,68 @@
+import numpy
+
+from bfrespy.common import AnimCurve, AnimCurveType
+from bfrespy.skeletal_anim import BoneAnim, SkeletonAnim, bake_skeletal_anims
+
+
+def _constant_curve(anim_data_offset, value):
+    curve = AnimCurve()
+    curve.anim_data_offset = anim_data_offset
+    curve.offs = value
+    return curve
+
+
+def test_bake_curve_channels():
+    # BoneAnimData holds scale at 0x4, translate at 0x10 and rotate at 0x20.
+    offsets = {
+        0x04: 0, 0x08: 1, 0x0C: 2,
+        0x10: 7, 0x14: 8, 0x18: 9,
+        0x20: 3, 0x24: 4, 0x28: 5, 0x2C: 6,
+    }
+    bone_anim = BoneAnim()
+    bone_anim.curves = [_constant_curve(offs, 10 + channel)
+                        for offs, channel in offsets.items()]
+    baked = bone_anim.bake([0, 1])
+    assert baked.shape == (2, BoneAnim.CHANNEL_COUNT)
+    numpy.testing.assert_array_equal(
+        baked, numpy.tile(numpy.arange(10, 20, dtype=numpy.float32), (2, 1)))
+
+
+def test_bake_translate_curve():
+    bone_anim = BoneAnim()
+    bone_anim.curves = [_constant_curve(0x14, 5.0)]
+    baked = bone_anim.bake([0])
+    numpy.testing.assert_array_equal(baked[0], (1, 1, 1, 0, 0, 0, 1, 0, 5, 0))
+
+
+def _linear_curve(anim_data_offset, slope):
+    curve = AnimCurve()
+    curve.anim_data_offset = anim_data_offset
+    curve.curve_type = AnimCurveType.LINEAR
+    curve.frames = numpy.array([0, 10], dtype=numpy.float32)
+    curve.keys = numpy.array([[0, slope * 10], [slope * 10, 0]],
+                             dtype=numpy.float32)
+    return curve
+
+
+def test_bake_skeletal_anims_jobs():
+    anims = []
+    for i in range(3):
+        anim = SkeletonAnim()
+        anim.name = f'anim{i}'
+        anim.frame_cnt = 10 + i
+        for j in range(i + 1):
+            bone_anim = BoneAnim()
+            bone_anim.curves = [_linear_curve(0x10, i + j),
+                                _linear_curve(0x04, j + 1)]
+            anim.bone_anims.append(bone_anim)
+        anims.append(anim)
+    serial = bake_skeletal_anims(anims, jobs=1)
+    pooled = bake_skeletal_anims(anims, jobs=2)
+    assert list(pooled) == [anim.name for anim in anims]
+    for anim in anims:
+        assert pooled[anim.name].shape == (anim.frame_cnt + 1,
+                                           len(anim.bone_anims),
+                                           BoneAnim.CHANNEL_COUNT)
+        numpy.testing.assert_array_equal(pooled[anim.name],
+                                         serial[anim.name])
+    numpy.testing.assert_allclose(serial['anim2'][10, 2, 7], 40)
@@ -0,0 +1,52 @@
+import numpy
+import pytest
+
+from bfrespy.switch import swizzle
+
+
+def _gob_address(x, y, width, bpp, block_height_log2):
+    """Returns the address of byte x of row y in a block linear surface, one
+    byte at a time as the Tegra X1 lays them out.
+    """
+    block_height = 1 << block_height_log2
+    gobs_per_row = -(-width * bpp // 64)
+    block = ((y // (8 * block_height)) * gobs_per_row + x // 64) \
+        * 512 * block_height
+    gob = (y % (8 * block_height) // 8) * 512
+    return (block + gob + (x % 64 // 32) * 256 + (y % 8 // 2) * 64
+            + (x % 32 // 16) * 32 + (y % 2) * 16 + x % 16)
+
+
+@pytest.mark.parametrize('width, height, bpp, block_height_log2', [
+    (16, 16, 4, 4), (13, 7, 8, 2), (100, 60, 16, 3), (5, 3, 1, 0),
+    (70, 33, 2, 1),
+])
+def test_deswizzle_block_linear(width, height, bpp, block_height_log2):
+    size = swizzle.block_linear_size(width, height, bpp, block_height_log2)
+    data = numpy.random.default_rng(0).integers(0, 256, size,
+                                                dtype=numpy.uint8)
+    expected = numpy.empty((height, width * bpp), dtype=numpy.uint8)
+    for y in range(height):
+        for x in range(width * bpp):
+            expected[y, x] = data[_gob_address(x, y, width, bpp,
+                                               block_height_log2)]
+    texels = swizzle.deswizzle_block_linear(data.tobytes(), width, height,
+                                            bpp, block_height_log2)
+    numpy.testing.assert_array_equal(
+        texels, expected.reshape(height, width, bpp))
+    # Data which is too short reads as zeros.
+    short = swizzle.deswizzle_block_linear(data[:size // 2].tobytes(), width,
+                                           height, bpp, block_height_log2)
+    numpy.testing.assert_array_equal(short[texels != short], 0)
+
+
+def test_deswizzle_pitch_linear():
+    texels = swizzle.deswizzle_pitch_linear(bytes(range(64)) * 2, 3, 4, 2)
+    assert texels.shape == (4, 3, 2)
+    numpy.testing.assert_array_equal(texels[1, 0], (32, 33))
+
+
+def test_mip_block_height():
+    assert swizzle.mip_block_height_log2(256, 4) == 4
+    assert swizzle.mip_block_height_log2(64, 4) == 3
+    assert swizzle.mip_block_height_log2(4, 4) == 0
@@ -0,0 +1,93 @@
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+import pytest
+
+from bfrespy.texture_cache import TextureCache
+
+# A .npy file holds a 128 byte header before the data.
+_IMAGE_SIZE = 128 + 1000
+
+
+def _image(value):
+    return numpy.full((10, 25, 4), value, dtype=numpy.uint8)
+
+
+def _put(cache, key, value, mtime):
+    cache.put(key, _image(value))
+    # Give the files distinct times, as a coarse clock may not.
+    os.utime(cache._path(key), ns=(mtime, mtime))
+
+
+def test_put_get(tmp_path):
+    cache = TextureCache(tmp_path / 'cache')
+    key = cache.make_key(b'data', 0x1A01, 16, 16, 0)
+    assert key != cache.make_key(b'data', 0x1A01, 16, 16, 1)
+    assert cache.get(key) is None
+    cache.put(key, _image(7))
+    image = cache.get(key)
+    assert isinstance(image, numpy.memmap)
+    assert not image.flags.writeable
+    numpy.testing.assert_array_equal(image, _image(7))
+    assert os.listdir(cache.directory) == [key + '.npy']
+
+    cache.clear()
+    assert cache.get(key) is None
+    assert cache._size == 0
+
+
+def test_get_ignores_utime_errors(tmp_path, monkeypatch):
+    cache = TextureCache(tmp_path)
+    cache.put('key', _image(1))
+
+    def utime(*args, **kwargs):
+        raise PermissionError
+    monkeypatch.setattr(os, 'utime', utime)
+    numpy.testing.assert_array_equal(cache.get('key'), _image(1))
+
+
+def test_evict_least_recently_used(tmp_path):
+    cache = TextureCache(tmp_path, max_size=3 * _IMAGE_SIZE)
+    for i, key in enumerate('abc'):
+        _put(cache, key, i, (i + 1) * 10**9)
+    assert cache._size == 3 * _IMAGE_SIZE
+    # Reading an image makes it the most recently used.
+    assert cache.get('a') is not None
+
+    _put(cache, 'd', 3, 4 * 10**9)
+    assert cache.get('b') is None
+    assert cache._size == 3 * _IMAGE_SIZE
+    assert sorted(os.listdir(tmp_path)) == ['a.npy', 'c.npy', 'd.npy']
+
+    cache.evict(_IMAGE_SIZE)
+    assert sorted(os.listdir(tmp_path)) == ['a.npy']
+
+
+def test_put_from_threads(tmp_path):
+    cache = TextureCache(tmp_path, max_size=20 * _IMAGE_SIZE)
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda i: cache.put(str(i % 30), _image(i)),
+                      range(200)))
+    assert cache._size <= cache.max_size
+    assert cache._size == sum(size for _, _, size in cache._entries())
+
+
+def test_pickle(tmp_path):
+    cache = TextureCache(tmp_path, max_size=12345)
+    cache.put('key', _image(2))
+    copy = pickle.loads(pickle.dumps(cache))
+    assert (copy.directory, copy.max_size) == (cache.directory, 12345)
+    assert copy._size is None
+    numpy.testing.assert_array_equal(copy.get('key'), _image(2))
+    copy.put('other', _image(3))
+    assert copy._size == 2 * _IMAGE_SIZE
+
+
+@pytest.mark.parametrize('max_size', [0, _IMAGE_SIZE - 1])
+def test_put_too_large(tmp_path, max_size):
+    # Images larger than the cache are not stored.
+    cache = TextureCache(tmp_path, max_size=max_size)
+    cache.put('key', _image(0))
+    assert os.listdir(tmp_path) == []
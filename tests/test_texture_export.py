@@ -0,0 +1,78 @@
+import io
+
+import numpy
+import pytest
+
+from bfrespy.switch.bntx import BntxFile
+from bfrespy.switch.texture_export import (export_texture, write_dds,
+                                           write_ktx2)
+from synthetic_bfres import bntx
+
+
+def _texture(name, width, height, format_, data):
+    return BntxFile(bntx([(name, width, height, format_, 2, 1, 4,
+                           data)])).textures[name]
+
+
+def _levels(texture):
+    return b''.join(texture.get_deswizzled_data(0, miplevel).tobytes()
+                    for miplevel in range(texture.mipcount))
+
+
+def test_write_dds():
+    data = numpy.random.default_rng(0).integers(
+        0, 256, 1024, dtype=numpy.uint8).tobytes()
+    texture = _texture('wall', 8, 8, 0x1A01, data)
+    f = io.BytesIO()
+    write_dds(texture, f)
+    header = bytes.fromhex(
+        # Header with caps, height, width, pixel format, mip count and
+        # linear size, which is that of the first level.
+        '444453207c00000007100a000800000008000000200000000000000002000000'
+        + '00' * 44 +
+        # Pixel format pointing to the DX10 header.
+        '200000000400000044583130' + '00' * 20 +
+        # Complex mipmapped texture.
+        '0810400000000000000000000000000000000000'
+        # DXGI_FORMAT_BC1_UNORM, 2D, one array layer.
+        '4700000003000000000000000100000000000000')
+    assert f.getvalue() == header + _levels(texture)
+
+
+def test_write_ktx2():
+    data = numpy.random.default_rng(0).integers(
+        0, 256, 1024, dtype=numpy.uint8).tobytes()
+    texture = _texture('stone', 10, 6, 0x2D06, data)
+    f = io.BytesIO()
+    write_ktx2(texture, f)
+    header = bytes.fromhex(
+        'ab4b5458203230bb0d0a1a0a'
+        # VK_FORMAT_ASTC_4x4_SRGB_BLOCK, 10x6, two levels.
+        '9e000000010000000a00000006000000000000000000000001000000'
+        '0200000000000000'
+        # The data format descriptor follows the level index.
+        '800000002c000000' + '00' * 24 +
+        # The levels are stored from the smallest one, 16 byte aligned.
+        'd000000000000000' '6000000000000000' '6000000000000000'
+        'b000000000000000' '2000000000000000' '2000000000000000'
+        # ASTC 4x4 sRGB with one sample covering the 128 bit block.
+        '2c0000000000000002002800a201020003030000100000000000000000007f00'
+        '0000000000000000ffffffff' + '00' * 4)
+    levels = [texture.get_deswizzled_data(0, miplevel).tobytes()
+              for miplevel in range(2)]
+    assert f.getvalue() == header + levels[1] + levels[0]
+
+
+def test_export_texture(tmp_path):
+    texture = _texture('wall', 8, 8, 0x1A01, bytes(1024))
+    path = export_texture(texture, tmp_path / 'wall')
+    assert path == str(tmp_path / 'wall.dds')
+    f = io.BytesIO()
+    write_dds(texture, f)
+    with open(path, 'rb') as exported:
+        assert exported.read() == f.getvalue()
+
+    texture = _texture('r5g6b5', 8, 8, 0x0701, bytes(1024))
+    with pytest.raises(NotImplementedError):
+        export_texture(texture, tmp_path / 'r5g6b5')
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['wall.dds']